@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""Benchmark the workflow status generator against a local stub GitHub API."""
+
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import json
+from pathlib import Path
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable
+from urllib.request import Request, urlopen
+
+from generate_workflow_status import (
+    RENDERERS,
+    GitHubClient,
+    RetryScheduler,
+    StatusMatrix,
+    iter_inspected_repositories,
+    iter_managed_repositories,
+    iter_repositories,
+    write_rendered,
+)
+from github_stub_server import StubGitHubServer, SyntheticFleet
+
+ANSWERS_FILE = ".copier-answers.ci.yml"
+FLEET_OWNERS = {"athackst": "User", "althack": "Organization"}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the pooled GitHub client and the status generator."
+    )
+    parser.add_argument(
+        "--suite",
+        choices=("pool", "fleet"),
+        default="pool",
+        help=(
+            "pool compares per-request connections with the pooled client; fleet "
+            "runs the generator against synthetic fleets."
+        ),
+    )
+    parser.add_argument(
+        "--requests",
+        type=int,
+        default=500,
+        help="Requests issued by each benchmark mode.",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Concurrent requests issued by each benchmark mode.",
+    )
+    parser.add_argument(
+        "--fleet-sizes",
+        default="100,1000,5000",
+        help="Comma-separated total repository counts for the fleet suite.",
+    )
+    parser.add_argument(
+        "--workflows",
+        type=int,
+        default=20,
+        help="Workflow files per synthetic repository.",
+    )
+    parser.add_argument(
+        "--discovery",
+        action="append",
+        choices=("graphql", "rest"),
+        help="Discovery modes to benchmark; repeat to compare. Defaults to both.",
+    )
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def urlopen_request(base_url: str) -> Callable[[int], object]:
+    """Open a fresh connection per request, as the client did before pooling."""
+
+    def request(index: int) -> object:
+        with urlopen(
+            Request(
+                f"{base_url}/users/benchmark/repos?page={index}",
+                headers={"Accept": "application/vnd.github+json"},
+            )
+        ) as response:
+            return json.load(response)
+
+    return request
+
+
+def pooled_request(client: GitHubClient) -> Callable[[int], object]:
+    def request(index: int) -> object:
+        return client.get_json("/users/benchmark/repos", params={"page": index})
+
+    return request
+
+
+def run_mode(
+    name: str,
+    request: Callable[[int], object],
+    server: StubGitHubServer,
+    *,
+    requests: int,
+    concurrency: int,
+) -> dict[str, float | int | str]:
+    connections_before = server.connections
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(request, range(requests)))
+    elapsed = time.perf_counter() - started
+    return {
+        "mode": name,
+        "requests": requests,
+        "seconds": elapsed,
+        "requests_per_second": requests / elapsed if elapsed else 0.0,
+        "connections": server.connections - connections_before,
+    }
+
+
+def run_pool_suite(args: argparse.Namespace) -> None:
+    with StubGitHubServer() as server:
+        client = GitHubClient(
+            None,
+            api_base=server.base_url,
+            pool_size=args.concurrency,
+            scheduler=RetryScheduler(requests_per_second=0),
+        )
+        results = [
+            run_mode(
+                "urlopen per request",
+                urlopen_request(server.base_url),
+                server,
+                requests=args.requests,
+                concurrency=args.concurrency,
+            ),
+            run_mode(
+                "pooled client",
+                pooled_request(client),
+                server,
+                requests=args.requests,
+                concurrency=args.concurrency,
+            ),
+        ]
+        client.close()
+
+    print("| Mode | Requests | Seconds | Requests/sec | Connections |")
+    print("| --- | --- | --- | --- | --- |")
+    for result in results:
+        print(
+            f"| {result['mode']} | {result['requests']} | {result['seconds']:.3f} "
+            f"| {result['requests_per_second']:.1f} | {result['connections']} |"
+        )
+
+
+def peak_rss_mib() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_fleet_case(case: dict[str, Any]) -> dict[str, Any]:
+    """Run discovery, inspection and rendering once, in a fresh process."""
+    client = GitHubClient(
+        None,
+        api_base=case["api_base"],
+        pool_size=case["concurrency"],
+        scheduler=RetryScheduler(requests_per_second=0),
+    )
+    owners = case["owners"]
+    discovery_seconds = None
+    started = time.perf_counter()
+    if case["discovery"] == "graphql":
+        rows = list(
+            iter_managed_repositories(
+                owners,
+                client,
+                answers_file=ANSWERS_FILE,
+                page_size=30,
+                max_concurrency=case["concurrency"],
+            )
+        )
+    else:
+        repositories = list(
+            iter_repositories(owners, client, max_concurrency=case["concurrency"])
+        )
+        discovery_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        rows = list(
+            iter_inspected_repositories(
+                iter(repositories),
+                client,
+                answers_file=ANSWERS_FILE,
+                chunk_size=30,
+                max_chunk_size=100,
+                max_concurrency=case["concurrency"],
+            )
+        )
+    inspection_seconds = time.perf_counter() - started
+    client.close()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        started = time.perf_counter()
+        matrix = StatusMatrix.from_rows(rows, case["workflows"])
+        for name, renderer in RENDERERS.items():
+            write_rendered(Path(temp_dir) / f"workflow_status.{name}", renderer, matrix)
+        render_seconds = time.perf_counter() - started
+
+    totals = client.metrics.to_dict()["totals"]
+    return {
+        "rows": len(matrix),
+        "discovery_seconds": discovery_seconds,
+        "inspection_seconds": inspection_seconds,
+        "render_seconds": render_seconds,
+        "client_requests": totals["requests"],
+        "graphql_cost": totals["graphql_cost"],
+        "peak_rss_mib": peak_rss_mib(),
+    }
+
+
+def run_fleet_suite(args: argparse.Namespace) -> None:
+    sizes = [int(size) for size in args.fleet_sizes.split(",") if size.strip()]
+    modes = args.discovery or ["graphql", "rest"]
+    results = []
+    for size in sizes:
+        fleet = SyntheticFleet(
+            owners=FLEET_OWNERS,
+            repositories_per_owner=max(size // len(FLEET_OWNERS), 1),
+            workflows_per_repository=args.workflows,
+        )
+        for mode in modes:
+            with StubGitHubServer(
+                rest_handler=fleet.rest_handler,
+                graphql_handler=fleet.graphql_handler,
+            ) as server:
+                case = {
+                    "api_base": server.base_url,
+                    "owners": list(FLEET_OWNERS),
+                    "discovery": mode,
+                    "concurrency": args.concurrency,
+                    "workflows": list(fleet.workflows),
+                }
+                started = time.perf_counter()
+                # A child process keeps each case's peak RSS independent.
+                completed = subprocess.run(
+                    [sys.executable, __file__, "--case", json.dumps(case)],
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                )
+                wall_seconds = time.perf_counter() - started
+                result = json.loads(completed.stdout)
+                result.update(
+                    size=size,
+                    mode=mode,
+                    wall_seconds=wall_seconds,
+                    server_requests=server.requests,
+                )
+                results.append(result)
+
+    print(
+        "| Repositories | Discovery | Rows | Wall (s) | Discovery (s) "
+        "| Inspection (s) | Render (s) | Requests | GraphQL cost | Peak RSS (MiB) |"
+    )
+    print("| --- | --- | --- | --- | --- | --- | --- | --- | --- | --- |")
+    for result in results:
+        discovery = result["discovery_seconds"]
+        print(
+            f"| {result['size']} | {result['mode']} | {result['rows']} "
+            f"| {result['wall_seconds']:.2f} "
+            f"| {'-' if discovery is None else f'{discovery:.2f}'} "
+            f"| {result['inspection_seconds']:.2f} | {result['render_seconds']:.3f} "
+            f"| {result['server_requests']} | {result['graphql_cost']} "
+            f"| {result['peak_rss_mib']:.1f} |"
+        )
+
+
+def main() -> int:
+    args = parse_args()
+    if args.case:
+        print(json.dumps(run_fleet_case(json.loads(args.case))))
+    elif args.suite == "fleet":
+        run_fleet_suite(args)
+    else:
+        run_pool_suite(args)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -4,34 +4,93 @@
 from __future__ import annotations
 
 import argparse
-from dataclasses import dataclass
+from collections import OrderedDict, deque
+import csv
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+import gzip
+import hashlib
+import html
+import http.client
 import json
 import os
 from pathlib import Path
+import queue
+import random
+import re
 import sys
 import tempfile
+import threading
 import time
-from typing import Any
-from urllib.error import HTTPError, URLError
-from urllib.parse import quote, urlencode
-from urllib.request import Request, urlopen
+from typing import Any, Callable, Iterable, Iterator, TextIO
+from urllib.parse import parse_qs, quote, urlencode, urlsplit
 
 API_BASE = "https://api.github.com"
+DEFAULT_POOL_SIZE = 4
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_CACHE_MAX_BYTES = 50 * 1024 * 1024
+CACHED_RESPONSE_HEADERS = ("Link",)
+DEFAULT_MAX_WAIT = 600.0
+DEFAULT_REQUESTS_PER_SECOND = 10.0
+MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 60.0
+RUNS_PER_PAGE = 100
+FAILED_CONCLUSIONS = {"failure", "timed_out", "startup_failure"}
+RUN_SYMBOLS = {
+    "success": "✅",
+    "failure": "❌",
+    "timed_out": "❌",
+    "startup_failure": "❌",
+    "cancelled": "⚪",
+    "skipped": "⏭️",
+    "neutral": "⚪",
+    "action_required": "🟠",
+}
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+REVISION_CHUNK_SIZE = 100
+MAX_CHUNK_SIZE = 100
+TARGET_QUERY_SECONDS = 5.0
+SPLITTABLE_HTTP_STATUSES = {502, 503, 504}
+SPLITTABLE_GRAPHQL_MARKERS = (
+    "max_node_limit_exceeded",
+    "timeout",
+    "timed out",
+    "something went wrong while executing your query",
+)
+STATE_VERSION = 1
+CASSETTE_VERSION = 1
+REPLAY_SKIPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
 REPO_ROOT = Path(__file__).resolve().parents[2]
 DEFAULT_MANAGED_PATHS_FILE = REPO_ROOT / "copier_update_paths.txt"
 DEFAULT_OUTPUT_PATH = REPO_ROOT / "workflow_status.md"
+REPOSITORIES_PER_PAGE = 100
+LINK_LAST_RE = re.compile(r'<([^>]+)>\s*;\s*rel="last"')
+
+
+class QueryTooLargeError(RuntimeError):
+    """A GraphQL query failed in a way that a smaller query may avoid."""
+
+
+class RetryBudgetExceeded(RuntimeError):
+    """Waiting for a retry would run past the configured --max-wait budget."""
 
 
 @dataclass(frozen=True)
 class Repository:
     owner: str
     name: str
+    default_branch: str | None = field(default=None, compare=False)
 
     @property
     def full_name(self) -> str:
         return f"{self.owner}/{self.name}"
 
 
+InspectedRow = tuple[Repository, set[str]]
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Generate workflow_status.md for managed CI workflows."
@@ -62,11 +121,149 @@ def parse_args() -> argparse.Namespace:
         default=DEFAULT_OUTPUT_PATH,
         help="Markdown file to write.",
     )
+    parser.add_argument(
+        "--json-path",
+        type=Path,
+        help="Also write a machine-readable JSON index of the status matrix.",
+    )
+    parser.add_argument(
+        "--csv-path",
+        type=Path,
+        help="Also write the status matrix as CSV.",
+    )
+    parser.add_argument(
+        "--html-path",
+        type=Path,
+        help="Also write a static HTML page with filtering and lazy-loaded badges.",
+    )
+    parser.add_argument(
+        "--digest-path",
+        type=Path,
+        help=(
+            "JSON file of stable output digests; outputs whose digest is unchanged "
+            "are not rewritten, ignoring run URLs, timestamps and durations."
+        ),
+    )
+    parser.add_argument(
+        "--drift-path",
+        type=Path,
+        help=(
+            "Write a JSON index of repositories whose managed files differ from "
+            "the template, compared by blob oid in the inspection query."
+        ),
+    )
+    parser.add_argument(
+        "--template-oids-file",
+        type=Path,
+        help=(
+            "JSON object of extra accepted blob oids per managed path, e.g. "
+            "renderings for other Copier answers."
+        ),
+    )
+    parser.add_argument(
+        "--run-status",
+        action="store_true",
+        help=(
+            "Fetch the latest default-branch run of each managed workflow and "
+            "render its conclusion instead of badge images."
+        ),
+    )
+    parser.add_argument(
+        "--discovery",
+        choices=("graphql", "rest"),
+        default="graphql",
+        help=(
+            "graphql pages each owner's repositories and inspects them in one "
+            "query; rest lists repositories first and inspects them separately."
+        ),
+    )
     parser.add_argument(
         "--chunk-size",
         type=int,
         default=30,
-        help="Maximum repositories included in each GraphQL query.",
+        help=(
+            "Repositories included in the first GraphQL inspection query; later "
+            "queries grow or shrink from observed cost and latency."
+        ),
+    )
+    parser.add_argument(
+        "--max-chunk-size",
+        type=int,
+        default=MAX_CHUNK_SIZE,
+        help="Upper bound for the adaptive GraphQL inspection chunk size.",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=4,
+        help="Maximum concurrent GitHub API requests during repository discovery.",
+    )
+    parser.add_argument(
+        "--request-timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+        help="Per-request timeout in seconds for GitHub API calls.",
+    )
+    parser.add_argument(
+        "--max-wait",
+        type=float,
+        default=DEFAULT_MAX_WAIT,
+        help=(
+            "Seconds after start beyond which throttled requests fail instead of "
+            "waiting for a rate-limit reset."
+        ),
+    )
+    parser.add_argument(
+        "--requests-per-second",
+        type=float,
+        default=DEFAULT_REQUESTS_PER_SECOND,
+        help="Per-host request rate shared by all workers; 0 disables the limit.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        help="Directory for the conditional-request cache of REST responses.",
+    )
+    parser.add_argument(
+        "--cache-max-bytes",
+        type=int,
+        default=DEFAULT_CACHE_MAX_BYTES,
+        help="Size limit of the REST response cache before evicting old entries.",
+    )
+    parser.add_argument(
+        "--metrics-path",
+        type=Path,
+        help="Write per-endpoint request, latency and rate-limit metrics as JSON.",
+    )
+    parser.add_argument(
+        "--metrics-summary-path",
+        type=Path,
+        help="Append the metrics as a markdown table, e.g. $GITHUB_STEP_SUMMARY.",
+    )
+    parser.add_argument(
+        "--api-base",
+        default=API_BASE,
+        help="GitHub API base URL, e.g. a local stub server for benchmarks.",
+    )
+    replay = parser.add_mutually_exclusive_group()
+    replay.add_argument(
+        "--record-path",
+        type=Path,
+        help="Record every GitHub API exchange to this JSON cassette.",
+    )
+    replay.add_argument(
+        "--replay-path",
+        type=Path,
+        help="Serve GitHub API responses from a recorded cassette, offline.",
+    )
+    parser.add_argument(
+        "--state-file",
+        type=Path,
+        help=(
+            "JSON file holding the previous run's inspection results. When set, "
+            "only repositories whose HEAD changed are inspected again. Requires "
+            "--discovery rest."
+        ),
     )
     return parser.parse_args()
 
@@ -108,44 +305,771 @@ def retry_delay_seconds(headers: Any, body_text: str) -> int | None:
     return None
 
 
+@dataclass(frozen=True)
+class ApiResponse:
+    status: int
+    headers: Any
+    body: bytes
+
+    def text(self) -> str:
+        return self.body.decode("utf-8", errors="replace")
+
+
+class ConnectionPool:
+    """Keep-alive HTTP(S) connections to a single API host."""
+
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        size: int = DEFAULT_POOL_SIZE,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> None:
+        if size < 1:
+            raise ValueError("pool size must be greater than zero")
+        parts = urlsplit(base_url)
+        if parts.scheme not in {"http", "https"} or not parts.hostname:
+            raise ValueError(f"Unsupported API base URL: {base_url}")
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.base_path = parts.path.rstrip("/")
+        self.timeout = timeout
+        self.connections_opened = 0
+        self._idle: queue.LifoQueue[http.client.HTTPConnection] = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+
+    def _connect(self) -> http.client.HTTPConnection:
+        with self._lock:
+            self.connections_opened += 1
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(
+                self.host, self.port, timeout=self.timeout
+            )
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        body: bytes | None = None,
+        headers: dict[str, str],
+    ) -> ApiResponse:
+        with self._slots:
+            try:
+                connection, reused = self._idle.get_nowait(), True
+            except queue.Empty:
+                connection, reused = self._connect(), False
+            try:
+                response, data = self._send(connection, method, path, body, headers)
+            except (http.client.HTTPException, OSError):
+                connection.close()
+                if not reused:
+                    raise
+                # The server may have closed an idle keep-alive connection.
+                connection = self._connect()
+                try:
+                    response, data = self._send(
+                        connection, method, path, body, headers
+                    )
+                except (http.client.HTTPException, OSError):
+                    connection.close()
+                    raise
+            if response.will_close:
+                connection.close()
+            else:
+                self._idle.put(connection)
+
+        if (response.getheader("Content-Encoding") or "").lower() == "gzip":
+            data = gzip.decompress(data)
+        return ApiResponse(response.status, response.headers, data)
+
+    def _send(
+        self,
+        connection: http.client.HTTPConnection,
+        method: str,
+        path: str,
+        body: bytes | None,
+        headers: dict[str, str],
+    ) -> tuple[http.client.HTTPResponse, bytes]:
+        connection.request(
+            method,
+            f"{self.base_path}{path}",
+            body=body,
+            headers=headers,
+        )
+        response = connection.getresponse()
+        return response, response.read()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def replay_key(method: str, path: str, body: bytes | None) -> str:
+    """Identify a request independently of tokens and conditional headers."""
+    digest = hashlib.sha256(body or b"").hexdigest()
+    return f"{method} {path} {digest}"
+
+
+class RecordingTransport:
+    """Wrap a transport and save every exchange to a JSON cassette on close."""
+
+    def __init__(self, inner: ConnectionPool, path: Path) -> None:
+        self.inner = inner
+        self.path = path
+        self._interactions: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        body: bytes | None = None,
+        headers: dict[str, str],
+    ) -> ApiResponse:
+        response = self.inner.request(method, path, body=body, headers=headers)
+        interaction = {
+            "key": replay_key(method, path, body),
+            "status": response.status,
+            "headers": [
+                [name, value]
+                for name, value in response.headers.items()
+                if name.lower() not in REPLAY_SKIPPED_HEADERS
+            ],
+            "body": response.text(),
+        }
+        with self._lock:
+            self._interactions.append(interaction)
+        return response
+
+    def close(self) -> None:
+        self.inner.close()
+        with self._lock:
+            interactions = list(self._interactions)
+        write_atomic(
+            self.path,
+            json.dumps(
+                {"version": CASSETTE_VERSION, "interactions": interactions},
+                indent=2,
+            )
+            + "\n",
+        )
+
+
+class ReplayTransport:
+    """Serve recorded exchanges in order per request, without any network."""
+
+    def __init__(self, path: Path) -> None:
+        try:
+            cassette = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as error:
+            raise RuntimeError(f"Unable to read replay cassette {path}: {error}")
+        if cassette.get("version") != CASSETTE_VERSION:
+            raise RuntimeError(f"Unsupported replay cassette version in {path}")
+        self._responses: dict[str, deque[dict[str, Any]]] = {}
+        for interaction in cassette.get("interactions") or []:
+            self._responses.setdefault(interaction["key"], deque()).append(
+                interaction
+            )
+        self._lock = threading.Lock()
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        body: bytes | None = None,
+        headers: dict[str, str],
+    ) -> ApiResponse:
+        with self._lock:
+            recorded = self._responses.get(replay_key(method, path, body))
+            if not recorded:
+                raise RuntimeError(f"No recorded response for {method} {path}")
+            # Keep the last response so repeated identical requests still replay.
+            interaction = recorded.popleft() if len(recorded) > 1 else recorded[0]
+        response_headers = http.client.HTTPMessage()
+        for name, value in interaction["headers"]:
+            response_headers[name] = value
+        return ApiResponse(
+            interaction["status"],
+            response_headers,
+            interaction["body"].encode("utf-8"),
+        )
+
+    def close(self) -> None:
+        return
+
+
+class ResponseCache:
+    """On-disk cache of REST responses revalidated with ETag/Last-Modified.
+
+    Entry sizes are read from disk once, then kept in memory in least
+    recently used order, so stores only touch the directory to evict.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        *,
+        max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+    ) -> None:
+        if max_bytes < 1:
+            raise ValueError("cache-max-bytes must be greater than zero")
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        entries = []
+        for path in directory.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        self._sizes: OrderedDict[Path, int] = OrderedDict(
+            (path, size) for _mtime, size, path in sorted(entries)
+        )
+        self._total = sum(self._sizes.values())
+
+    def _entry_path(self, url: str) -> Path:
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.directory / f"{digest}.json"
+
+    def load(self, url: str) -> dict[str, Any] | None:
+        path = self._entry_path(url)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or entry.get("url") != url:
+            return None
+        return entry
+
+    def validators(self, entry: dict[str, Any] | None) -> dict[str, str]:
+        headers: dict[str, str] = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def revalidated(
+        self,
+        url: str,
+        entry: dict[str, Any],
+        headers: Any,
+    ) -> tuple[bytes, http.client.HTTPMessage]:
+        """Return the cached body for a 304 and mark the entry recently used."""
+        path = self._entry_path(url)
+        with self._lock:
+            self.hits += 1
+            if path in self._sizes:
+                self._sizes.move_to_end(path)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        merged = http.client.HTTPMessage()
+        for name, value in (entry.get("headers") or {}).items():
+            merged[name] = value
+        for name, value in headers.items():
+            del merged[name]
+            merged[name] = value
+        return entry.get("body", "").encode("utf-8"), merged
+
+    def store(self, url: str, headers: Any, body: bytes) -> None:
+        with self._lock:
+            self.misses += 1
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        entry = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "headers": {
+                name: headers[name]
+                for name in CACHED_RESPONSE_HEADERS
+                if headers.get(name)
+            },
+            "body": body.decode("utf-8"),
+        }
+        path = self._entry_path(url)
+        content = json.dumps(entry)
+        write_atomic(path, content)
+        size = len(content.encode("utf-8"))
+        with self._lock:
+            self._total += size - self._sizes.pop(path, 0)
+            self._sizes[path] = size
+            over_limit = self._total > self.max_bytes
+        if over_limit:
+            self.evict()
+
+    def evict(self) -> None:
+        """Delete least recently used entries until the cache fits its limit."""
+        with self._lock:
+            while self._total > self.max_bytes and self._sizes:
+                path, size = self._sizes.popitem(last=False)
+                path.unlink(missing_ok=True)
+                self._total -= size
+
+
+class TokenBucket:
+    """Reservation-based token bucket; callers sleep outside the lock."""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = clock()
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                self.capacity,
+                self._tokens + (now - self._updated) * self.rate,
+            )
+            self._updated = now
+            self._tokens -= 1
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if delay:
+            self._sleep(delay)
+
+
+class RetryScheduler:
+    """Backoff with jitter, a global wait deadline and per-host token buckets.
+
+    Only the worker thread that hit a throttle waits; other batches keep
+    running on their own threads and tokens. Waiting blocks that thread
+    rather than requeueing its request: the client calls wait() only once
+    no token has rate-limit headroom left, so any other ready request would
+    be rejected too, and a worker task (a whole batch or owner listing)
+    cannot be resumed halfway on another thread.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_wait: float | None = DEFAULT_MAX_WAIT,
+        requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+        base_delay: float = BACKOFF_BASE_SECONDS,
+        max_delay: float = BACKOFF_MAX_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        rng: random.Random | None = None,
+    ) -> None:
+        self.deadline = clock() + max_wait if max_wait is not None else None
+        self.requests_per_second = requests_per_second
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._clock = clock
+        self._sleep = sleep
+        self._rng = rng or random.Random()
+        self._buckets: dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def throttle(self, host: str) -> None:
+        if self.requests_per_second <= 0:
+            return
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(
+                    self.requests_per_second,
+                    max(self.requests_per_second, 1.0),
+                    clock=self._clock,
+                    sleep=self._sleep,
+                )
+                self._buckets[host] = bucket
+        bucket.acquire()
+
+    def backoff(self, attempt: int, server_delay: float | None = None) -> float:
+        ceiling = min(self.max_delay, self.base_delay * 2 ** max(attempt - 1, 0))
+        delay = self._rng.uniform(ceiling / 2, ceiling)
+        return max(delay, server_delay or 0.0)
+
+    def wait(self, delay: float, reason: str) -> None:
+        if self.deadline is not None and self._clock() + delay > self.deadline:
+            raise RetryBudgetExceeded(
+                f"{reason}; waiting {delay:.0f}s would exceed the --max-wait budget."
+            )
+        print(f"{reason}; retrying in {delay:.1f}s.", file=sys.stderr)
+        self._sleep(delay)
+
+
+def endpoint_name(method: str, url: str) -> str:
+    """Group request URLs by route so metrics do not grow with the fleet."""
+    segments = urlsplit(url).path.strip("/").split("/")
+    if segments[0] in {"users", "orgs"} and len(segments) > 1:
+        segments[1] = "{owner}"
+    elif segments[0] == "repos" and len(segments) > 2:
+        segments[1:3] = ["{owner}", "{repo}"]
+    return f"{method} /{'/'.join(segments)}"
+
+
+class RequestMetrics:
+    """Thread-safe per-endpoint request counters for a GitHubClient."""
+
+    TOTAL_KEYS = (
+        "requests",
+        "errors",
+        "not_modified",
+        "retries",
+        "bytes_sent",
+        "bytes_received",
+        "seconds",
+        "graphql_cost",
+    )
+
+    def __init__(self) -> None:
+        self._endpoints: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, endpoint: str) -> dict[str, Any]:
+        entry = self._endpoints.get(endpoint)
+        if entry is None:
+            entry = {key: 0 for key in self.TOTAL_KEYS}
+            entry["seconds"] = 0.0
+            entry["latency_ms"] = {
+                **{f"<={bucket}": 0 for bucket in LATENCY_BUCKETS_MS},
+                "+Inf": 0,
+            }
+            entry["rate_limit_remaining"] = None
+            self._endpoints[endpoint] = entry
+        return entry
+
+    def record_request(
+        self,
+        endpoint: str,
+        *,
+        status: int,
+        seconds: float,
+        bytes_sent: int,
+        bytes_received: int,
+        headers: Any,
+    ) -> None:
+        milliseconds = seconds * 1000
+        bucket = next(
+            (f"<={limit}" for limit in LATENCY_BUCKETS_MS if milliseconds <= limit),
+            "+Inf",
+        )
+        remaining = headers.get("X-RateLimit-Remaining") if headers else None
+        with self._lock:
+            entry = self._entry(endpoint)
+            entry["requests"] += 1
+            entry["errors"] += status >= 400
+            entry["not_modified"] += status == 304
+            entry["bytes_sent"] += bytes_sent
+            entry["bytes_received"] += bytes_received
+            entry["seconds"] += seconds
+            entry["latency_ms"][bucket] += 1
+            if remaining is not None and remaining.isdigit():
+                previous = entry["rate_limit_remaining"]
+                entry["rate_limit_remaining"] = (
+                    int(remaining)
+                    if previous is None
+                    else min(previous, int(remaining))
+                )
+
+    def record_retry(self, endpoint: str) -> None:
+        with self._lock:
+            self._entry(endpoint)["retries"] += 1
+
+    def record_cost(self, endpoint: str, cost: int) -> None:
+        with self._lock:
+            self._entry(endpoint)["graphql_cost"] += cost
+
+    def to_dict(self) -> dict[str, Any]:
+        with self._lock:
+            endpoints = {
+                name: {
+                    **entry,
+                    "seconds": round(entry["seconds"], 6),
+                    "latency_ms": dict(entry["latency_ms"]),
+                }
+                for name, entry in sorted(self._endpoints.items())
+            }
+        totals = {
+            key: sum(entry[key] for entry in endpoints.values())
+            for key in self.TOTAL_KEYS
+        }
+        totals["seconds"] = round(totals["seconds"], 6)
+        return {"endpoints": endpoints, "totals": totals}
+
+    def render_markdown(self) -> str:
+        metrics = self.to_dict()
+        lines = [
+            "## GitHub API usage",
+            "",
+            "| Endpoint | Requests | Errors | 304s | Retries | Bytes received "
+            "| Mean latency (ms) | GraphQL cost | Remaining budget |",
+            "| --- | --- | --- | --- | --- | --- | --- | --- | --- |",
+        ]
+        rows = [
+            *((f"`{name}`", entry) for name, entry in metrics["endpoints"].items()),
+            ("**Total**", metrics["totals"]),
+        ]
+        for label, entry in rows:
+            requests = entry["requests"]
+            mean = entry["seconds"] * 1000 / requests if requests else 0
+            remaining = entry.get("rate_limit_remaining")
+            lines.append(
+                f"| {label} | {entry['requests']} | {entry['errors']} "
+                f"| {entry['not_modified']} | {entry['retries']} "
+                f"| {entry['bytes_received']} | {mean:.0f} | {entry['graphql_cost']} "
+                f"| {'' if remaining is None else remaining} |"
+            )
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: Path) -> None:
+        write_atomic(path, json.dumps(self.to_dict(), indent=2) + "\n")
+
+    def append_summary(self, path: Path) -> None:
+        with path.open("a", encoding="utf-8") as summary:
+            summary.write(self.render_markdown())
+
+
+def is_rate_limited(status: int, headers: Any, body_text: str) -> bool:
+    if status not in {403, 429}:
+        return False
+    remaining = headers.get("X-RateLimit-Remaining") if headers else None
+    return remaining == "0" or "rate limit" in body_text.lower()
+
+
+class TokenPool:
+    """Track each token's rate-limit budget and pick the one with most headroom."""
+
+    def __init__(self, tokens: Iterable[str]) -> None:
+        self.tokens: list[str | None] = list(dict.fromkeys(tokens)) or [None]
+        self._remaining: dict[tuple[str | None, str], int] = {}
+        self._reset_at: dict[tuple[str | None, str], float] = {}
+        self._blocked_until: dict[tuple[str | None, str], float] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def authenticated(self) -> bool:
+        return self.tokens != [None]
+
+    def _headroom(self, key: tuple[str | None, str], now: float) -> float:
+        if self._reset_at.get(key, 0.0) <= now:
+            # Unknown or already reset budgets are tried before known ones.
+            return float("inf")
+        return self._remaining.get(key, 0)
+
+    def has_headroom(self, resource: str) -> bool:
+        now = time.time()
+        with self._lock:
+            return any(
+                self._blocked_until.get((token, resource), 0.0) <= now
+                for token in self.tokens
+            )
+
+    def select(self, resource: str) -> str | None:
+        now = time.time()
+        with self._lock:
+            available = [
+                token
+                for token in self.tokens
+                if self._blocked_until.get((token, resource), 0.0) <= now
+            ] or sorted(
+                self.tokens,
+                key=lambda token: self._blocked_until.get((token, resource), 0.0),
+            )[:1]
+            token = max(
+                available,
+                key=lambda token: self._headroom((token, resource), now),
+            )
+            key = (token, resource)
+            if key in self._remaining:
+                self._remaining[key] = max(self._remaining[key] - 1, 0)
+            return token
+
+    def update(self, token: str | None, resource: str, headers: Any) -> None:
+        if not headers:
+            return
+        resource = headers.get("X-RateLimit-Resource") or resource
+        try:
+            remaining = int(headers.get("X-RateLimit-Remaining"))
+            reset_at = float(headers.get("X-RateLimit-Reset"))
+        except (TypeError, ValueError):
+            return
+        with self._lock:
+            self._remaining[(token, resource)] = remaining
+            self._reset_at[(token, resource)] = reset_at
+
+    def exhaust(
+        self,
+        token: str | None,
+        resource: str,
+        headers: Any,
+        body_text: str,
+    ) -> None:
+        delay = retry_delay_seconds(headers, body_text) or 60
+        with self._lock:
+            self._remaining[(token, resource)] = 0
+            self._blocked_until[(token, resource)] = time.time() + delay
+
+
+def resolve_tokens(environ: dict[str, str]) -> list[str]:
+    tokens = [
+        token.strip()
+        for token in (environ.get("GITHUB_TOKENS") or "").split(",")
+        if token.strip()
+    ]
+    single = environ.get("GITHUB_TOKEN") or environ.get("GH_TOKEN")
+    if single:
+        tokens.append(single)
+    return list(dict.fromkeys(tokens))
+
+
 class GitHubClient:
-    def __init__(self, token: str | None) -> None:
-        self.token = token
+    def __init__(
+        self,
+        tokens: str | Iterable[str] | None,
+        *,
+        api_base: str = API_BASE,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: float = DEFAULT_TIMEOUT,
+        cache: ResponseCache | None = None,
+        scheduler: RetryScheduler | None = None,
+        metrics: RequestMetrics | None = None,
+        transport: ConnectionPool | RecordingTransport | ReplayTransport | None = None,
+    ) -> None:
+        if tokens is None or isinstance(tokens, str):
+            tokens = [tokens] if tokens else []
+        self.tokens = TokenPool(tokens)
+        self.api_base = api_base
+        self.host = urlsplit(api_base).netloc
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.cache = cache
+        self.scheduler = scheduler or RetryScheduler()
+        self.metrics = metrics or RequestMetrics()
+        self.pool = transport or ConnectionPool(
+            api_base, size=pool_size, timeout=timeout
+        )
 
-    def _headers(self, *, graphql: bool = False) -> dict[str, str]:
+    def _headers(
+        self,
+        token: str | None,
+        *,
+        graphql: bool = False,
+    ) -> dict[str, str]:
         headers = {
             "Accept": "application/vnd.github+json",
+            "Accept-Encoding": "gzip",
             "User-Agent": "workflow-status-generator",
             "X-GitHub-Api-Version": "2022-11-28",
         }
         if graphql:
             headers["Content-Type"] = "application/json"
-        if self.token:
-            headers["Authorization"] = f"Bearer {self.token}"
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
         return headers
 
+    def _request(
+        self,
+        method: str,
+        url: str,
+        *,
+        body: bytes | None = None,
+        headers: dict[str, str],
+    ) -> ApiResponse:
+        self.scheduler.throttle(self.host)
+        started = time.monotonic()
+        response = self.pool.request(method, url, body=body, headers=headers)
+        self.metrics.record_request(
+            endpoint_name(method, url),
+            status=response.status,
+            seconds=time.monotonic() - started,
+            bytes_sent=len(body or b""),
+            bytes_received=len(response.body),
+            headers=response.headers,
+        )
+        return response
+
     def get_json(
         self,
         path: str,
         *,
         params: dict[str, Any] | None = None,
     ) -> Any:
+        data, _headers = self.get_json_response(path, params=params)
+        return data
+
+    def get_json_response(
+        self,
+        path: str,
+        *,
+        params: dict[str, Any] | None = None,
+    ) -> tuple[Any, Any]:
         query = f"?{urlencode(params)}" if params else ""
-        request = Request(
-            f"{API_BASE}{path}{query}",
-            headers=self._headers(),
-        )
-        try:
-            with urlopen(request) as response:
-                return json.load(response)
-        except HTTPError as error:
-            raise RuntimeError(
-                f"GitHub API request failed for {path}: HTTP {error.code}"
-            ) from error
-        except URLError as error:
+        url = f"{path}{query}"
+        cached = self.cache.load(url) if self.cache else None
+        attempt = 0
+        while True:
+            token = self.tokens.select("core")
+            headers = self._headers(token)
+            if self.cache:
+                headers.update(self.cache.validators(cached))
+            try:
+                response = self._request("GET", url, headers=headers)
+            except (http.client.HTTPException, OSError) as error:
+                raise RuntimeError(
+                    f"GitHub API request failed for {path}: {error}"
+                ) from error
+            self.tokens.update(token, "core", response.headers)
+            body_text = response.text()
+            if is_rate_limited(response.status, response.headers, body_text):
+                self.tokens.exhaust(token, "core", response.headers, body_text)
+                if self.tokens.has_headroom("core"):
+                    self.metrics.record_retry(endpoint_name("GET", url))
+                    continue
+                attempt += 1
+                if attempt < MAX_ATTEMPTS:
+                    self.scheduler.wait(
+                        self.scheduler.backoff(
+                            attempt,
+                            retry_delay_seconds(response.headers, body_text),
+                        ),
+                        f"GitHub API rate limit hit for {path}",
+                    )
+                    self.metrics.record_retry(endpoint_name("GET", url))
+                    continue
+            break
+
+        if response.status == 304 and self.cache and cached:
+            body, response_headers = self.cache.revalidated(
+                url, cached, response.headers
+            )
+            return json.loads(body), response_headers
+        if response.status >= 400:
             raise RuntimeError(
-                f"GitHub API request failed for {path}: {error.reason}"
-            ) from error
+                f"GitHub API request failed for {path}: HTTP {response.status}"
+            )
+        if self.cache:
+            self.cache.store(url, response.headers, response.body)
+        return json.loads(response.body), response.headers
 
     def graphql(
         self,
@@ -154,52 +1078,48 @@ class GitHubClient:
         allow_token_fallback: bool = True,
     ) -> dict[str, Any]:
         payload = json.dumps({"query": query}).encode("utf-8")
-        max_attempts = 5
-        for attempt in range(1, max_attempts + 1):
-            request = Request(
-                f"{API_BASE}/graphql",
-                data=payload,
-                method="POST",
-                headers=self._headers(graphql=True),
-            )
+        attempt = 0
+        while attempt < MAX_ATTEMPTS:
+            token = self.tokens.select("graphql")
             try:
-                with urlopen(request) as response:
-                    response_body = response.read().decode("utf-8")
-                    parsed = json.loads(response_body)
-                    errors = parsed.get("errors") or []
-                    if errors:
-                        messages = "; ".join(
-                            error.get("message", "unknown GraphQL error")
-                            for error in errors
+                response = self._request(
+                    "POST",
+                    "/graphql",
+                    body=payload,
+                    headers=self._headers(token, graphql=True),
+                )
+            except (http.client.HTTPException, OSError) as error:
+                raise RuntimeError(
+                    f"Unable to query workflow metadata: {error}"
+                ) from error
+            self.tokens.update(token, "graphql", response.headers)
+
+            if response.status >= 400:
+                body_text = response.text()
+                if is_rate_limited(response.status, response.headers, body_text):
+                    self.tokens.exhaust(token, "graphql", response.headers, body_text)
+                    if self.tokens.has_headroom("graphql"):
+                        print(
+                            "Token rate limit exceeded; switching to the token with "
+                            "the most remaining budget.",
+                            file=sys.stderr,
                         )
-                        delay = retry_delay_seconds(response.headers, messages)
-                        if delay is not None and attempt < max_attempts:
-                            print(
-                                f"GraphQL rate limit hit; retrying in {delay}s "
-                                f"(attempt {attempt}/{max_attempts}).",
-                                file=sys.stderr,
-                            )
-                            time.sleep(delay)
-                            continue
-                        raise RuntimeError(f"GraphQL query failed: {messages}")
-
-                    data = parsed.get("data")
-                    return data if isinstance(data, dict) else {}
-            except HTTPError as error:
-                body_text = error.read().decode("utf-8", errors="replace")
-                delay = retry_delay_seconds(error.headers, body_text)
-                if delay is not None and attempt < max_attempts:
-                    print(
-                        f"Workflow metadata query throttled; retrying in {delay}s "
-                        f"(attempt {attempt}/{max_attempts}).",
-                        file=sys.stderr,
+                        self.metrics.record_retry("POST /graphql")
+                        continue
+                attempt += 1
+                delay = retry_delay_seconds(response.headers, body_text)
+                if delay is not None and attempt < MAX_ATTEMPTS:
+                    self.scheduler.wait(
+                        self.scheduler.backoff(attempt, delay),
+                        "Workflow metadata query throttled "
+                        f"(attempt {attempt}/{MAX_ATTEMPTS})",
                     )
-                    time.sleep(delay)
+                    self.metrics.record_retry("POST /graphql")
                     continue
                 if (
-                    self.token
+                    self.tokens.authenticated
                     and allow_token_fallback
-                    and error.code == 403
+                    and response.status == 403
                     and "rate limit" in body_text.lower()
                 ):
                     print(
@@ -207,71 +1127,616 @@ class GitHubClient:
                         "without authentication.",
                         file=sys.stderr,
                     )
-                    return GitHubClient(None).graphql(
+                    return GitHubClient(
+                        None,
+                        api_base=self.api_base,
+                        pool_size=self.pool_size,
+                        timeout=self.timeout,
+                        cache=self.cache,
+                        scheduler=self.scheduler,
+                        metrics=self.metrics,
+                        transport=self.pool,
+                    ).graphql(
                         query,
                         allow_token_fallback=False,
                     )
-                raise RuntimeError(
-                    f"Unable to query workflow metadata: HTTP {error.code}"
-                ) from error
-            except URLError as error:
-                raise RuntimeError(
-                    f"Unable to query workflow metadata: {error.reason}"
-                ) from error
+                error_type = (
+                    QueryTooLargeError
+                    if response.status in SPLITTABLE_HTTP_STATUSES
+                    else RuntimeError
+                )
+                raise error_type(
+                    f"Unable to query workflow metadata: HTTP {response.status}"
+                )
+
+            parsed = json.loads(response.body)
+            errors = parsed.get("errors") or []
+            if errors:
+                messages = "; ".join(
+                    error.get("message", "unknown GraphQL error") for error in errors
+                )
+                if "rate limit" in messages.lower():
+                    self.tokens.exhaust(token, "graphql", response.headers, messages)
+                    if self.tokens.has_headroom("graphql"):
+                        self.metrics.record_retry("POST /graphql")
+                        continue
+                attempt += 1
+                delay = retry_delay_seconds(response.headers, messages)
+                if delay is not None and attempt < MAX_ATTEMPTS:
+                    self.scheduler.wait(
+                        self.scheduler.backoff(attempt, delay),
+                        f"GraphQL rate limit hit (attempt {attempt}/{MAX_ATTEMPTS})",
+                    )
+                    self.metrics.record_retry("POST /graphql")
+                    continue
+                details = " ".join(
+                    f"{error.get('type', '')} {error.get('message', '')}"
+                    for error in errors
+                ).lower()
+                if any(marker in details for marker in SPLITTABLE_GRAPHQL_MARKERS):
+                    raise QueryTooLargeError(f"GraphQL query failed: {messages}")
+                raise RuntimeError(f"GraphQL query failed: {messages}")
+
+            data = parsed.get("data")
+            if not isinstance(data, dict):
+                return {}
+            cost = graphql_cost(data)
+            if cost is not None:
+                self.metrics.record_cost("POST /graphql", cost)
+            return data
 
         return {}
 
+    def close(self) -> None:
+        self.pool.close()
+
+
+def last_page_from_link(link_header: str | None) -> int | None:
+    if not link_header:
+        return None
+    match = LINK_LAST_RE.search(link_header)
+    if not match:
+        return None
+    pages = parse_qs(urlsplit(match.group(1)).query).get("page")
+    if not pages:
+        return None
+    try:
+        return int(pages[0])
+    except ValueError:
+        return None
+
+
+def owner_repositories_path(owner: str, client: GitHubClient) -> str:
+    owner_type = client.get_json(f"/users/{quote(owner)}").get("type")
+    if owner_type == "Organization":
+        return f"/orgs/{quote(owner)}/repos"
+    if owner_type == "User":
+        return f"/users/{quote(owner)}/repos"
+    raise ValueError(
+        f"Expected GitHub user or organization for {owner}, got: {owner_type}"
+    )
+
+
+def fetch_repository_page(
+    owner: str,
+    path: str,
+    page: int,
+    client: GitHubClient,
+) -> tuple[list[Any], int | None]:
+    items, headers = client.get_json_response(
+        path,
+        params={
+            "page": page,
+            "per_page": REPOSITORIES_PER_PAGE,
+        },
+    )
+    if not isinstance(items, list):
+        raise RuntimeError(f"Unexpected repository response for {owner}")
+    link_header = headers.get("Link") if headers else None
+    return items, last_page_from_link(link_header)
+
+
+def new_repositories(
+    owner: str,
+    items: list[Any],
+    seen: set[str],
+) -> Iterator[Repository]:
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        item_owner = (item.get("owner") or {}).get("login", owner)
+        if item_owner.lower() != owner.lower():
+            continue
+        if item.get("private") or item.get("fork") or item.get("archived"):
+            continue
+        name = item.get("name")
+        if not isinstance(name, str) or not name:
+            continue
+        default_branch = item.get("default_branch")
+        repository = Repository(
+            owner=item_owner,
+            name=name,
+            default_branch=default_branch if isinstance(default_branch, str) else None,
+        )
+        if repository.full_name.lower() in seen:
+            continue
+        seen.add(repository.full_name.lower())
+        yield repository
+
+
+def iter_repositories(
+    owners: list[str],
+    client: GitHubClient,
+    *,
+    max_concurrency: int = 1,
+) -> Iterator[Repository]:
+    """Yield public repositories as their REST listing pages arrive."""
+    if max_concurrency < 1:
+        raise ValueError("max-concurrency must be greater than zero")
+
+    seen: set[str] = set()
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        # Each pending future maps to (owner, listing path, page); page 0 is the
+        # owner type lookup that resolves the listing path.
+        pending: dict[Future[Any], tuple[str, str, int]] = {
+            executor.submit(owner_repositories_path, owner, client): (owner, "", 0)
+            for owner in owners
+        }
+        while pending:
+            done, _not_done = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                owner, path, page = pending.pop(future)
+                if page == 0:
+                    path = future.result()
+                    pending[
+                        executor.submit(fetch_repository_page, owner, path, 1, client)
+                    ] = (owner, path, 1)
+                    continue
+
+                items, last_page = future.result()
+                # Once the first page reveals the last page number every remaining
+                # page can be requested at once; otherwise page sequentially.
+                if page == 1 and last_page is not None:
+                    next_pages = range(2, last_page + 1)
+                elif last_page is None and len(items) == REPOSITORIES_PER_PAGE:
+                    next_pages = range(page + 1, page + 2)
+                else:
+                    next_pages = range(0)
+                for number in next_pages:
+                    pending[
+                        executor.submit(
+                            fetch_repository_page, owner, path, number, client
+                        )
+                    ] = (owner, path, number)
+                yield from new_repositories(owner, items, seen)
+
 
 def discover_repositories(
     owners: list[str],
     client: GitHubClient,
+    *,
+    max_concurrency: int = 1,
 ) -> list[Repository]:
-    repositories: dict[str, Repository] = {}
-    for owner in owners:
-        owner_type = client.get_json(f"/users/{quote(owner)}").get("type")
-        if owner_type == "Organization":
-            path = f"/orgs/{quote(owner)}/repos"
-        elif owner_type == "User":
-            path = f"/users/{quote(owner)}/repos"
-        else:
-            raise ValueError(
-                f"Expected GitHub user or organization for {owner}, got: {owner_type}"
+    return sorted(
+        iter_repositories(owners, client, max_concurrency=max_concurrency),
+        key=lambda repository: repository.full_name.lower(),
+    )
+
+
+class AdaptiveBatcher:
+    """Grow or shrink GraphQL batches from observed query cost and latency."""
+
+    def __init__(
+        self,
+        initial: int,
+        *,
+        maximum: int = MAX_CHUNK_SIZE,
+        target_seconds: float = TARGET_QUERY_SECONDS,
+    ) -> None:
+        if initial < 1:
+            raise ValueError("chunk-size must be greater than zero")
+        if maximum < 1:
+            raise ValueError("max-chunk-size must be greater than zero")
+        self.maximum = maximum
+        self.size = min(initial, maximum)
+        self.target_seconds = target_seconds
+        self._last_cost: tuple[int, float] | None = None
+        self._lock = threading.Lock()
+
+    def record_success(self, items: int, seconds: float, cost: int | None) -> None:
+        with self._lock:
+            if seconds > self.target_seconds:
+                # Shrink in proportion to how far the query overshot the target.
+                scaled = int(items * self.target_seconds / seconds)
+                self.size = max(1, min(self.size, scaled))
+                return
+            if cost is not None and items:
+                previous = self._last_cost
+                self._last_cost = (items, cost / items)
+                if (
+                    previous is not None
+                    and items > previous[0]
+                    and cost / items >= previous[1]
+                ):
+                    # A larger batch stopped lowering points per repository.
+                    self.size = min(self.size, previous[0])
+                    return
+            if items >= self.size:
+                self.size = min(self.maximum, max(self.size + 1, self.size * 3 // 2))
+
+    def record_failure(self, items: int) -> None:
+        with self._lock:
+            self.size = max(1, min(self.size, items // 2))
+
+
+def inspection_fields(answers_file: str) -> str:
+    """GraphQL selection reading the answers blob and workflows tree at HEAD."""
+    answers_expression = json.dumps(f"HEAD:{answers_file}")
+    return f"""answers: object(expression: {answers_expression}) {{
+      __typename
+    }}
+    workflows: object(expression: "HEAD:.github/workflows") {{
+      __typename
+      ... on Tree {{
+        entries {{
+          name
+          type
+        }}
+      }}
+    }}"""
+
+
+def parse_inspection(repo_data: Any) -> set[str] | None:
+    """Return workflow file names for a managed repository, None otherwise."""
+    if not isinstance(repo_data, dict):
+        return None
+    answers = repo_data.get("answers")
+    if not isinstance(answers, dict) or answers.get("__typename") != "Blob":
+        return None
+
+    workflow_files: set[str] = set()
+    workflows = repo_data.get("workflows")
+    if isinstance(workflows, dict) and workflows.get("__typename") == "Tree":
+        entries = workflows.get("entries")
+        if isinstance(entries, list):
+            for entry in entries:
+                if (
+                    isinstance(entry, dict)
+                    and entry.get("type") == "blob"
+                    and isinstance(entry.get("name"), str)
+                ):
+                    workflow_files.add(entry["name"])
+    return workflow_files
+
+
+def graphql_cost(data: dict[str, Any]) -> int | None:
+    rate_limit = data.get("rateLimit")
+    if isinstance(rate_limit, dict) and isinstance(rate_limit.get("cost"), int):
+        return rate_limit["cost"]
+    return None
+
+
+def git_blob_oid(content: bytes) -> str:
+    """Object id git assigns to a blob, as reported by GraphQL ``Blob.oid``."""
+    return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+
+def template_blob_oids(
+    paths: list[str],
+    *,
+    root: Path = REPO_ROOT,
+    extra_oids_file: Path | None = None,
+) -> dict[str, set[str]]:
+    """Accepted blob oids per managed path.
+
+    The rendered copies checked into this repository are the reference. An
+    optional JSON file of ``{path: [oid, ...]}`` adds oids rendered for other
+    answer combinations.
+    """
+    expected: dict[str, set[str]] = {}
+    for path in paths:
+        try:
+            expected[path] = {git_blob_oid((root / path).read_bytes())}
+        except FileNotFoundError:
+            continue
+    if extra_oids_file:
+        extra = json.loads(extra_oids_file.read_text(encoding="utf-8"))
+        if not isinstance(extra, dict):
+            raise ValueError(f"Expected a JSON object in {extra_oids_file}")
+        for path, oids in extra.items():
+            expected.setdefault(path, set()).update(oids)
+    return expected
+
+
+class DriftIndex:
+    """Fleet-wide index of managed files whose blob oid differs from the template.
+
+    Blob oids are requested in the inspection query itself, so no file content
+    is downloaded.
+    """
+
+    def __init__(self, paths: list[str], expected: dict[str, set[str]]) -> None:
+        self.paths = [path for path in paths if path in expected]
+        self.expected = expected
+        self.repositories: dict[str, dict[str, list[str]]] = {}
+        self._lock = threading.Lock()
+
+    def fields(self) -> str:
+        return "".join(
+            f"""
+    managed_{index}: object(expression: {json.dumps(f"HEAD:{path}")}) {{
+      oid
+    }}"""
+            for index, path in enumerate(self.paths)
+        )
+
+    def record(self, repository: Repository, repo_data: dict[str, Any]) -> None:
+        outdated: list[str] = []
+        missing: list[str] = []
+        for index, path in enumerate(self.paths):
+            blob = repo_data.get(f"managed_{index}")
+            oid = blob.get("oid") if isinstance(blob, dict) else None
+            if oid is None:
+                missing.append(path)
+            elif oid not in self.expected[path]:
+                outdated.append(path)
+        with self._lock:
+            self.repositories[repository.full_name] = {
+                "outdated": outdated,
+                "missing": missing,
+            }
+
+    def to_dict(self) -> dict[str, Any]:
+        with self._lock:
+            repositories = dict(self.repositories)
+        drifted = {
+            name: entry
+            for name, entry in sorted(
+                repositories.items(), key=lambda item: item[0].lower()
             )
+            if entry["outdated"]
+        }
+        return {
+            "version": 1,
+            "template_oids": {
+                path: sorted(self.expected[path]) for path in self.paths
+            },
+            "inspected": len(repositories),
+            "up_to_date": len(repositories) - len(drifted),
+            "outdated_by_path": {
+                path: sum(path in entry["outdated"] for entry in drifted.values())
+                for path in self.paths
+            },
+            "repositories": drifted,
+        }
 
-        page = 1
-        while True:
-            items = client.get_json(
-                path,
-                params={
-                    "page": page,
-                    "per_page": 100,
-                },
+    def write(self, path: Path) -> None:
+        write_atomic(path, json.dumps(self.to_dict(), indent=2) + "\n")
+
+
+def inspect_batch(
+    chunk: list[Repository],
+    client: GitHubClient,
+    *,
+    selection: str,
+    batcher: AdaptiveBatcher,
+    drift: DriftIndex | None = None,
+) -> list[InspectedRow]:
+    """Inspect one batch, splitting it in place when the query is too large."""
+    rows: list[InspectedRow] = []
+    retry_chunks: deque[list[Repository]] = deque([chunk] if chunk else [])
+    while retry_chunks:
+        chunk = retry_chunks.popleft()
+        fields = []
+        for index, repository in enumerate(chunk):
+            fields.append(
+                f"""
+  repo_{index}: repository(
+    owner: {json.dumps(repository.owner)}
+    name: {json.dumps(repository.name)}
+  ) {{
+    {selection}
+  }}"""
+            )
+        started = time.monotonic()
+        try:
+            data = client.graphql(
+                "query {\n"
+                + "\n".join(fields)
+                + "\n  rateLimit {\n    cost\n    remaining\n  }\n}"
             )
-            if not isinstance(items, list):
-                raise RuntimeError(f"Unexpected repository response for {owner}")
+        except QueryTooLargeError as error:
+            if len(chunk) == 1:
+                raise
+            batcher.record_failure(len(chunk))
+            middle = len(chunk) // 2
+            print(
+                f"{error}; splitting {len(chunk)} repositories into smaller queries.",
+                file=sys.stderr,
+            )
+            retry_chunks.extendleft([chunk[middle:], chunk[:middle]])
+            continue
+        batcher.record_success(
+            len(chunk),
+            time.monotonic() - started,
+            graphql_cost(data),
+        )
 
-            for item in items:
-                if not isinstance(item, dict):
-                    continue
-                item_owner = (item.get("owner") or {}).get("login", owner)
-                if item_owner.lower() != owner.lower():
-                    continue
-                if item.get("private") or item.get("fork") or item.get("archived"):
-                    continue
-                name = item.get("name")
-                if not isinstance(name, str) or not name:
-                    continue
-                repository = Repository(owner=item_owner, name=name)
-                repositories[repository.full_name.lower()] = repository
+        for index, repository in enumerate(chunk):
+            repo_data = data.get(f"repo_{index}")
+            workflow_files = parse_inspection(repo_data)
+            if workflow_files is not None:
+                rows.append((repository, workflow_files))
+                if drift is not None:
+                    drift.record(repository, repo_data)
+    return rows
 
-            if len(items) < 100:
-                break
-            page += 1
 
-    return sorted(
-        repositories.values(),
-        key=lambda repository: repository.full_name.lower(),
-    )
+def check_revisions(
+    chunk: list[Repository],
+    client: GitHubClient,
+    *,
+    state: InspectionState,
+) -> tuple[list[InspectedRow], list[tuple[Repository, str | None]]]:
+    """Reuse previous results for unchanged repositories; return the rest.
+
+    Returns the rows of unchanged managed repositories and the changed
+    repositories with their new revisions.
+    """
+    revisions = fetch_repository_revisions(chunk, client)
+    rows: list[InspectedRow] = []
+    changed: list[tuple[Repository, str | None]] = []
+    for repository in chunk:
+        revision = revisions.get(repository.full_name)
+        if state.changed(repository, revision):
+            changed.append((repository, revision))
+            continue
+        managed, workflow_files = state.previous_result(repository)
+        state.record(
+            repository,
+            revision,
+            managed=managed,
+            workflow_files=workflow_files,
+            inspected=False,
+        )
+        if managed:
+            rows.append((repository, workflow_files))
+    return rows, changed
+
+
+def inspect_changed_batch(
+    batch: list[tuple[Repository, str | None]],
+    client: GitHubClient,
+    *,
+    selection: str,
+    batcher: AdaptiveBatcher,
+    state: InspectionState,
+) -> list[InspectedRow]:
+    """Inspect changed repositories and record their new results."""
+    inspected = {
+        repository.full_name: workflow_files
+        for repository, workflow_files in inspect_batch(
+            [repository for repository, _revision in batch],
+            client,
+            selection=selection,
+            batcher=batcher,
+        )
+    }
+    rows: list[InspectedRow] = []
+    for repository, revision in batch:
+        managed = repository.full_name in inspected
+        workflow_files = inspected.get(repository.full_name, set())
+        state.record(
+            repository,
+            revision,
+            managed=managed,
+            workflow_files=workflow_files,
+            inspected=True,
+        )
+        if managed:
+            rows.append((repository, workflow_files))
+    return rows
+
+
+def iter_inspected_repositories(
+    repositories: Iterable[Repository],
+    client: GitHubClient,
+    *,
+    answers_file: str,
+    chunk_size: int,
+    max_chunk_size: int = MAX_CHUNK_SIZE,
+    max_concurrency: int = 1,
+    state: InspectionState | None = None,
+    drift: DriftIndex | None = None,
+) -> Iterator[InspectedRow]:
+    """Inspect repositories in batches as soon as each batch fills up.
+
+    Batches run concurrently and rows are yielded in submission order, so
+    inspection overlaps the discovery feeding ``repositories``. With a
+    state, revisions are first checked REVISION_CHUNK_SIZE repositories at a
+    time, and only the changed repositories, gathered across revision
+    chunks, are inspected in full-size batches.
+    """
+    if max_concurrency < 1:
+        raise ValueError("max-concurrency must be greater than zero")
+    if state is not None and drift is not None:
+        raise ValueError("drift detection needs a full inspection, not --state-file")
+    batcher = AdaptiveBatcher(chunk_size, maximum=max_chunk_size)
+    selection = inspection_fields(answers_file) + (drift.fields() if drift else "")
+    changed: list[tuple[Repository, str | None]] = []
+
+    def submit(batch: list[Repository]) -> tuple[bool, Future[Any]]:
+        if state is None:
+            return False, executor.submit(
+                inspect_batch,
+                batch,
+                client,
+                selection=selection,
+                batcher=batcher,
+                drift=drift,
+            )
+        return True, executor.submit(check_revisions, batch, client, state=state)
+
+    def submit_changed(flush: bool = False) -> None:
+        while changed and (flush or len(changed) >= batcher.size):
+            batch = changed[: batcher.size]
+            del changed[: batcher.size]
+            future = executor.submit(
+                inspect_changed_batch,
+                batch,
+                client,
+                selection=selection,
+                batcher=batcher,
+                state=state,
+            )
+            in_flight.append((False, future))
+            if not flush:
+                # One batch at a time lets the batcher grow between them.
+                return
+
+    def finish(entry: tuple[bool, Future[Any]]) -> list[InspectedRow]:
+        revision_check, future = entry
+        if not revision_check:
+            return future.result()
+        rows, newly_changed = future.result()
+        changed.extend(newly_changed)
+        submit_changed()
+        return rows
+
+    def batch_size() -> int:
+        return batcher.size if state is None else REVISION_CHUNK_SIZE
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        # Entries are (is a revision check, future).
+        in_flight: deque[tuple[bool, Future[Any]]] = deque()
+        batch: list[Repository] = []
+        for repository in repositories:
+            batch.append(repository)
+            if len(batch) < batch_size():
+                continue
+            in_flight.append(submit(batch))
+            batch = []
+            while len(in_flight) > max_concurrency or (
+                in_flight and in_flight[0][1].done()
+            ):
+                yield from finish(in_flight.popleft())
+        if batch:
+            in_flight.append(submit(batch))
+        while in_flight:
+            yield from finish(in_flight.popleft())
+            if not in_flight:
+                submit_changed(flush=True)
+
+
+def collect_rows(
+    rows: Iterable[InspectedRow],
+) -> tuple[list[Repository], dict[str, set[str]]]:
+    managed_repositories: list[Repository] = []
+    workflows_by_repo: dict[str, set[str]] = {}
+    for repository, workflow_files in rows:
+        managed_repositories.append(repository)
+        workflows_by_repo[repository.full_name] = workflow_files
+    return managed_repositories, workflows_by_repo
 
 
 def inspect_managed_repositories(
@@ -280,124 +1745,988 @@ def inspect_managed_repositories(
     *,
     answers_file: str,
     chunk_size: int,
+    max_chunk_size: int = MAX_CHUNK_SIZE,
 ) -> tuple[list[Repository], dict[str, set[str]]]:
-    if chunk_size < 1:
-        raise ValueError("chunk-size must be greater than zero")
+    return collect_rows(
+        iter_inspected_repositories(
+            repositories,
+            client,
+            answers_file=answers_file,
+            chunk_size=chunk_size,
+            max_chunk_size=max_chunk_size,
+        )
+    )
+
+
+def iter_owner_managed_repositories(
+    owner: str,
+    client: GitHubClient,
+    *,
+    answers_file: str,
+    page_size: int,
+    drift: DriftIndex | None = None,
+) -> Iterator[InspectedRow]:
+    """Page one owner's public repositories and inspect them in the same query."""
+    batcher = AdaptiveBatcher(page_size, maximum=REPOSITORIES_PER_PAGE)
+    selection = inspection_fields(answers_file) + (drift.fields() if drift else "")
+    cursor: str | None = None
+    while True:
+        after = f"\n      after: {json.dumps(cursor)}" if cursor else ""
+        query = f"""query {{
+  repositoryOwner(login: {json.dumps(owner)}) {{
+    repositories(
+      first: {batcher.size}{after}
+      isFork: false
+      isArchived: false
+      privacy: PUBLIC
+      ownerAffiliations: [OWNER]
+      orderBy: {{field: NAME, direction: ASC}}
+    ) {{
+      pageInfo {{
+        hasNextPage
+        endCursor
+      }}
+      nodes {{
+        name
+        owner {{
+          login
+        }}
+        defaultBranchRef {{
+          name
+        }}
+        {selection}
+      }}
+    }}
+  }}
+  rateLimit {{
+    cost
+    remaining
+  }}
+}}"""
+        requested = batcher.size
+        started = time.monotonic()
+        try:
+            data = client.graphql(query)
+        except QueryTooLargeError as error:
+            if requested == 1:
+                raise
+            batcher.record_failure(requested)
+            print(
+                f"{error}; retrying {owner} with {batcher.size} repositories per page.",
+                file=sys.stderr,
+            )
+            continue
+        batcher.record_success(
+            requested,
+            time.monotonic() - started,
+            graphql_cost(data),
+        )
+
+        repository_owner = data.get("repositoryOwner")
+        if not isinstance(repository_owner, dict):
+            raise ValueError(f"Expected GitHub user or organization for {owner}")
+        connection = repository_owner.get("repositories") or {}
+        for node in connection.get("nodes") or []:
+            if not isinstance(node, dict):
+                continue
+            node_owner = (node.get("owner") or {}).get("login", owner)
+            name = node.get("name")
+            if node_owner.lower() != owner.lower():
+                continue
+            if not isinstance(name, str) or not name:
+                continue
+            workflow_files = parse_inspection(node)
+            if workflow_files is not None:
+                branch = (node.get("defaultBranchRef") or {}).get("name")
+                repository = Repository(
+                    owner=node_owner,
+                    name=name,
+                    default_branch=branch if isinstance(branch, str) else None,
+                )
+                if drift is not None:
+                    drift.record(repository, node)
+                yield repository, workflow_files
+
+        page_info = connection.get("pageInfo") or {}
+        cursor = page_info.get("endCursor")
+        if not page_info.get("hasNextPage") or not cursor:
+            return
+
+
+def iter_managed_repositories(
+    owners: list[str],
+    client: GitHubClient,
+    *,
+    answers_file: str,
+    page_size: int = REPOSITORIES_PER_PAGE,
+    max_concurrency: int = 1,
+    drift: DriftIndex | None = None,
+) -> Iterator[InspectedRow]:
+    """Stream inspected rows from every owner's GraphQL cursor concurrently."""
+    if max_concurrency < 1:
+        raise ValueError("max-concurrency must be greater than zero")
+
+    finished = object()
+    rows: queue.Queue[Any] = queue.Queue(
+        maxsize=REPOSITORIES_PER_PAGE * max_concurrency
+    )
+    stop = threading.Event()
+
+    def put(item: Any) -> None:
+        while not stop.is_set():
+            try:
+                rows.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def produce(owner: str) -> None:
+        try:
+            for row in iter_owner_managed_repositories(
+                owner,
+                client,
+                answers_file=answers_file,
+                page_size=page_size,
+                drift=drift,
+            ):
+                if stop.is_set():
+                    return
+                put(row)
+        finally:
+            put(finished)
+
+    seen: set[str] = set()
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        producers = [executor.submit(produce, owner) for owner in owners]
+        try:
+            remaining = len(producers)
+            while remaining:
+                item = rows.get()
+                if item is finished:
+                    remaining -= 1
+                    continue
+                key = item[0].full_name.lower()
+                if key not in seen:
+                    seen.add(key)
+                    yield item
+        finally:
+            stop.set()
+        for producer in producers:
+            producer.result()
 
-    managed_repositories: list[Repository] = []
-    workflows_by_repo: dict[str, set[str]] = {}
-    answers_expression = json.dumps(f"HEAD:{answers_file}")
 
+def discover_managed_repositories(
+    owners: list[str],
+    client: GitHubClient,
+    *,
+    answers_file: str,
+    page_size: int = REPOSITORIES_PER_PAGE,
+    max_concurrency: int = 1,
+) -> tuple[list[Repository], dict[str, set[str]]]:
+    """Discover and inspect repositories with one cursor-driven GraphQL stream."""
+    return collect_rows(
+        sorted(
+            iter_managed_repositories(
+                owners,
+                client,
+                answers_file=answers_file,
+                page_size=page_size,
+                max_concurrency=max_concurrency,
+            ),
+            key=lambda row: row[0].full_name.lower(),
+        )
+    )
+
+
+def fetch_repository_revisions(
+    repositories: list[Repository],
+    client: GitHubClient,
+    *,
+    chunk_size: int = REVISION_CHUNK_SIZE,
+) -> dict[str, str]:
+    """Return a cheap change marker (HEAD oid or pushedAt) per repository."""
+    revisions: dict[str, str] = {}
     for start in range(0, len(repositories), chunk_size):
         chunk = repositories[start : start + chunk_size]
-        fields = []
-        for index, repository in enumerate(chunk):
-            fields.append(
-                f"""
+        fields = [
+            f"""
   repo_{index}: repository(
     owner: {json.dumps(repository.owner)}
     name: {json.dumps(repository.name)}
   ) {{
-    answers: object(expression: {answers_expression}) {{
-      __typename
-    }}
-    workflows: object(expression: "HEAD:.github/workflows") {{
-      __typename
-      ... on Tree {{
-        entries {{
-          name
-          type
-        }}
+    pushedAt
+    defaultBranchRef {{
+      target {{
+        oid
       }}
     }}
   }}"""
-            )
+            for index, repository in enumerate(chunk)
+        ]
         data = client.graphql("query {\n" + "\n".join(fields) + "\n}")
 
         for index, repository in enumerate(chunk):
             repo_data = data.get(f"repo_{index}")
             if not isinstance(repo_data, dict):
                 continue
-            answers = repo_data.get("answers")
-            if not isinstance(answers, dict) or answers.get("__typename") != "Blob":
-                continue
+            target = (repo_data.get("defaultBranchRef") or {}).get("target") or {}
+            if isinstance(target.get("oid"), str):
+                revisions[repository.full_name] = target["oid"]
+            elif isinstance(repo_data.get("pushedAt"), str):
+                revisions[repository.full_name] = f"pushed:{repo_data['pushedAt']}"
+    return revisions
 
-            workflow_files: set[str] = set()
-            workflows = repo_data.get("workflows")
-            if isinstance(workflows, dict) and workflows.get("__typename") == "Tree":
-                entries = workflows.get("entries")
-                if isinstance(entries, list):
-                    for entry in entries:
-                        if (
-                            isinstance(entry, dict)
-                            and entry.get("type") == "blob"
-                            and isinstance(entry.get("name"), str)
-                        ):
-                            workflow_files.add(entry["name"])
-
-            managed_repositories.append(repository)
-            workflows_by_repo[repository.full_name] = workflow_files
 
-    return managed_repositories, workflows_by_repo
+def load_inspection_state(path: Path, answers_file: str) -> dict[str, dict[str, Any]]:
+    try:
+        state = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as error:
+        print(f"Ignoring unreadable state file {path}: {error}", file=sys.stderr)
+        return {}
+    if (
+        not isinstance(state, dict)
+        or state.get("version") != STATE_VERSION
+        or state.get("answers_file") != answers_file
+        or not isinstance(state.get("repositories"), dict)
+    ):
+        return {}
+    return state["repositories"]
+
+
+def save_inspection_state(
+    path: Path,
+    answers_file: str,
+    repositories: dict[str, dict[str, Any]],
+) -> None:
+    write_atomic(
+        path,
+        json.dumps(
+            {
+                "version": STATE_VERSION,
+                "answers_file": answers_file,
+                "repositories": repositories,
+            },
+            indent=2,
+            sort_keys=True,
+        )
+        + "\n",
+    )
+
+
+class InspectionState:
+    """Previous and current per-repository results for incremental runs."""
+
+    def __init__(self, path: Path, answers_file: str) -> None:
+        self.path = path
+        self.answers_file = answers_file
+        self.previous = load_inspection_state(path, answers_file)
+        self.current: dict[str, dict[str, Any]] = {}
+        self.checked = 0
+        self.inspected = 0
+        self._lock = threading.Lock()
+
+    def changed(self, repository: Repository, revision: str | None) -> bool:
+        previous = self.previous.get(repository.full_name) or {}
+        return revision is None or previous.get("revision") != revision
+
+    def previous_result(self, repository: Repository) -> tuple[bool, set[str]]:
+        previous = self.previous[repository.full_name]
+        return bool(previous.get("managed")), set(previous.get("workflows") or [])
+
+    def record(
+        self,
+        repository: Repository,
+        revision: str | None,
+        *,
+        managed: bool,
+        workflow_files: set[str],
+        inspected: bool,
+    ) -> None:
+        with self._lock:
+            self.checked += 1
+            self.inspected += int(inspected)
+            if revision is not None:
+                self.current[repository.full_name] = {
+                    "revision": revision,
+                    "managed": managed,
+                    "workflows": sorted(workflow_files),
+                }
+
+    def save(self) -> None:
+        save_inspection_state(self.path, self.answers_file, self.current)
+        print(
+            f"Inspected {self.inspected} of {self.checked} repositories changed "
+            "since the previous run.",
+            file=sys.stderr,
+        )
+
+
+def inspect_managed_repositories_incremental(
+    repositories: list[Repository],
+    client: GitHubClient,
+    *,
+    answers_file: str,
+    chunk_size: int,
+    max_chunk_size: int = MAX_CHUNK_SIZE,
+    state_path: Path,
+) -> tuple[list[Repository], dict[str, set[str]]]:
+    state = InspectionState(state_path, answers_file)
+    # Unchanged repositories are yielded before changed ones are inspected.
+    result = collect_rows(
+        sorted(
+            iter_inspected_repositories(
+                repositories,
+                client,
+                answers_file=answers_file,
+                chunk_size=chunk_size,
+                max_chunk_size=max_chunk_size,
+                state=state,
+            ),
+            key=lambda row: row[0].full_name.lower(),
+        )
+    )
+    state.save()
+    return result
+
+
+@dataclass(frozen=True)
+class WorkflowRun:
+    conclusion: str | None
+    status: str
+    started_at: str | None
+    updated_at: str | None
+    url: str
+
+    @property
+    def failed(self) -> bool:
+        return self.conclusion in FAILED_CONCLUSIONS
+
+    @property
+    def duration_seconds(self) -> int | None:
+        if self.status != "completed" or not self.started_at or not self.updated_at:
+            return None
+        try:
+            started = datetime.fromisoformat(self.started_at.replace("Z", "+00:00"))
+            updated = datetime.fromisoformat(self.updated_at.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        return max(int((updated - started).total_seconds()), 0)
+
+    def without_volatile(self) -> WorkflowRun:
+        """Drop the fields that change on every rerun of an unchanged outcome."""
+        return replace(self, started_at=None, updated_at=None, url="")
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "conclusion": self.conclusion,
+            "status": self.status,
+            "started_at": self.started_at,
+            "updated_at": self.updated_at,
+            "duration_seconds": self.duration_seconds,
+            "url": self.url,
+        }
+
+
+def parse_workflow_run(item: Any) -> WorkflowRun | None:
+    if not isinstance(item, dict) or not isinstance(item.get("html_url"), str):
+        return None
+    return WorkflowRun(
+        conclusion=item.get("conclusion"),
+        status=item.get("status") or "unknown",
+        started_at=item.get("run_started_at") or item.get("created_at"),
+        updated_at=item.get("updated_at"),
+        url=item["html_url"],
+    )
+
+
+def run_workflow_file(item: Any) -> str | None:
+    path = item.get("path") if isinstance(item, dict) else None
+    if not isinstance(path, str):
+        return None
+    # Runs of reusable or dynamic workflows report "path@ref".
+    return Path(path.split("@", 1)[0]).name
+
+
+def fetch_latest_runs(
+    repository: Repository,
+    workflow_files: set[str],
+    client: GitHubClient,
+) -> dict[str, WorkflowRun]:
+    """Return the newest default-branch run of each workflow file.
+
+    One listing of recent runs usually covers every workflow; only workflows
+    missing from it cost a per-workflow request.
+    """
+    params: dict[str, Any] = {
+        "per_page": RUNS_PER_PAGE,
+        "exclude_pull_requests": "true",
+    }
+    if repository.default_branch:
+        params["branch"] = repository.default_branch
+    base = f"/repos/{quote(repository.owner)}/{quote(repository.name)}/actions"
+    data = client.get_json(f"{base}/runs", params=params)
+    runs: dict[str, WorkflowRun] = {}
+    items = data.get("workflow_runs") if isinstance(data, dict) else None
+    for item in items or []:
+        workflow_file = run_workflow_file(item)
+        if workflow_file in workflow_files and workflow_file not in runs:
+            run = parse_workflow_run(item)
+            if run is not None:
+                runs[workflow_file] = run
+    for workflow_file in sorted(workflow_files - runs.keys()):
+        data = client.get_json(
+            f"{base}/workflows/{quote(workflow_file)}/runs",
+            params={**params, "per_page": 1},
+        )
+        items = data.get("workflow_runs") if isinstance(data, dict) else None
+        run = parse_workflow_run(items[0]) if items else None
+        if run is not None:
+            runs[workflow_file] = run
+    return runs
+
+
+def fetch_workflow_runs(
+    matrix: StatusMatrix,
+    client: GitHubClient,
+    *,
+    max_concurrency: int = 1,
+) -> None:
+    """Fill matrix.runs with the latest run of every present managed workflow."""
+    if max_concurrency < 1:
+        raise ValueError("max-concurrency must be greater than zero")
+
+    def fetch(row: int) -> tuple[int, dict[str, WorkflowRun]]:
+        repository = matrix.repositories[row]
+        try:
+            return row, fetch_latest_runs(
+                repository,
+                matrix.files(matrix.masks[row]),
+                client,
+            )
+        except RuntimeError as error:
+            print(
+                f"Skipping workflow runs for {repository.full_name}: {error}",
+                file=sys.stderr,
+            )
+            return row, {}
+
+    columns = {name: column for column, name in enumerate(matrix.workflow_files)}
+    rows = [row for row, mask in enumerate(matrix.masks) if mask]
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        for row, runs in executor.map(fetch, rows):
+            for workflow_file, run in runs.items():
+                matrix.runs[(row, columns[workflow_file])] = run
+    matrix.has_runs = True
+
+
+def load_managed_paths(path: Path) -> list[str]:
+    return [line.strip() for line in path.read_text().splitlines() if line.strip()]
 
 
 def load_managed_workflows(path: Path) -> list[str]:
     return [
-        line.strip()
-        for line in path.read_text().splitlines()
-        if line.strip().startswith(".github/workflows/")
+        managed_path
+        for managed_path in load_managed_paths(path)
+        if managed_path.startswith(".github/workflows/")
     ]
 
 
-def render_status(
-    repositories: list[Repository],
-    workflows_by_repo: dict[str, set[str]],
+def render_header(
+    repository_count: int,
     managed_workflows: list[str],
+    *,
+    run_status: bool = False,
 ) -> str:
     header_labels = [Path(path).stem for path in managed_workflows]
+    shown = (
+        "the latest default-branch run of each managed workflow"
+        if run_status
+        else "live status badges for the managed workflows"
+    )
     lines = [
         "# Workflow Status",
         "",
-        "Public repositories using this CI template, with live status badges for "
-        "the managed workflows listed in `copier_update_paths.txt`.",
+        f"Public repositories using this CI template, with {shown} "
+        "listed in `copier_update_paths.txt`.",
         "",
-        f"- Repositories shown: {len(repositories)}",
+        f"- Repositories shown: {repository_count}",
         f"- Managed workflows shown: {len(managed_workflows)}",
         "",
         "| Repository | " + " | ".join(header_labels) + " |",
         "| " + " | ".join(["---"] * (len(header_labels) + 1)) + " |",
     ]
+    return "\n".join(lines) + "\n"
 
-    for repository in repositories:
-        remote_workflow_files = workflows_by_repo.get(repository.full_name, set())
-        row = [
-            f"[`{repository.full_name}`]"
-            f"(https://github.com/{repository.full_name})"
-        ]
-        for workflow_path in managed_workflows:
-            workflow_file = Path(workflow_path).name
-            workflow_name = Path(workflow_path).stem
-            if workflow_file in remote_workflow_files:
-                row.append(
-                    f"[![{workflow_name}]"
-                    f"(https://github.com/{repository.full_name}/actions/workflows/"
-                    f"{workflow_file}/badge.svg)]"
-                    f"(https://github.com/{repository.full_name}/actions/workflows/"
-                    f"{workflow_file})"
-                )
-            else:
-                row.append("-")
-        lines.append("| " + " | ".join(row) + " |")
 
-    lines.extend(
-        [
-            "",
+def format_duration(seconds: int | None) -> str:
+    if seconds is None:
+        return "-"
+    minutes, seconds = divmod(seconds, 60)
+    return f"{minutes}m {seconds:02d}s" if minutes else f"{seconds}s"
+
+
+def render_run(run: WorkflowRun | None) -> str:
+    if run is None:
+        return "❔"
+    state = run.conclusion or run.status
+    symbol = RUN_SYMBOLS.get(run.conclusion or "", "🟡")
+    title = f"{state}, {format_duration(run.duration_seconds)}, {run.updated_at}"
+    return f'[{symbol}]({run.url} "{title}")'
+
+
+def render_row(
+    repository: Repository,
+    remote_workflow_files: set[str],
+    managed_workflows: list[str],
+    runs: dict[str, WorkflowRun] | None = None,
+) -> str:
+    row = [
+        f"[`{repository.full_name}`]"
+        f"(https://github.com/{repository.full_name})"
+    ]
+    for workflow_path in managed_workflows:
+        workflow_file = Path(workflow_path).name
+        workflow_name = Path(workflow_path).stem
+        if runs is not None and workflow_file in remote_workflow_files:
+            row.append(render_run(runs.get(workflow_file)))
+        elif workflow_file in remote_workflow_files:
+            row.append(
+                f"[![{workflow_name}]"
+                f"(https://github.com/{repository.full_name}/actions/workflows/"
+                f"{workflow_file}/badge.svg)]"
+                f"(https://github.com/{repository.full_name}/actions/workflows/"
+                f"{workflow_file})"
+            )
+        else:
+            row.append("-")
+    return "| " + " | ".join(row) + " |\n"
+
+
+def render_footer(health: list[dict[str, Any]] | None = None) -> str:
+    if health is None:
+        return (
+            "\n"
             "> Badges may appear as missing if a workflow has not been added to a "
-            "repository yet or has never run on `main`.",
-            "",
+            "repository yet or has never run on `main`.\n"
+        )
+    lines = [
+        "",
+        "> ❔ marks a managed workflow that has never run on the default branch.",
+        "",
+        "## Workflow health",
+        "",
+        "| Workflow | Repositories | Completed runs | Failures | Failure rate "
+        "| Median duration |",
+        "| --- | --- | --- | --- | --- | --- |",
+    ]
+    for entry in health:
+        rate = entry["failure_rate"]
+        lines.append(
+            f"| {entry['name']} | {entry['repositories']} | {entry['completed']} "
+            f"| {entry['failures']} | {'-' if rate is None else f'{rate:.0%}'} "
+            f"| {format_duration(entry['median_duration_seconds'])} |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def render_status(
+    repositories: list[Repository],
+    workflows_by_repo: dict[str, set[str]],
+    managed_workflows: list[str],
+) -> str:
+    return (
+        render_header(len(repositories), managed_workflows)
+        + "".join(
+            render_row(
+                repository,
+                workflows_by_repo.get(repository.full_name, set()),
+                managed_workflows,
+            )
+            for repository in repositories
+        )
+        + render_footer()
+    )
+
+
+class StatusMatrix:
+    """Repositories x managed workflows, stored as one bitset per repository."""
+
+    def __init__(self, managed_workflows: list[str]) -> None:
+        self.workflows = list(managed_workflows)
+        self.workflow_files = [Path(path).name for path in self.workflows]
+        self._bits = {
+            name: 1 << column for column, name in enumerate(self.workflow_files)
+        }
+        self.repositories: list[Repository] = []
+        self.masks: list[int] = []
+        self.runs: dict[tuple[int, int], WorkflowRun] = {}
+        self.has_runs = False
+
+    @classmethod
+    def from_rows(
+        cls,
+        rows: Iterable[InspectedRow],
+        managed_workflows: list[str],
+    ) -> StatusMatrix:
+        matrix = cls(managed_workflows)
+        for repository, workflow_files in rows:
+            matrix.add(repository, workflow_files)
+        matrix.sort()
+        return matrix
+
+    def add(self, repository: Repository, workflow_files: Iterable[str]) -> None:
+        mask = 0
+        for name in workflow_files:
+            mask |= self._bits.get(name, 0)
+        self.repositories.append(repository)
+        self.masks.append(mask)
+
+    def sort(self) -> None:
+        order = sorted(
+            range(len(self.repositories)),
+            key=lambda row: self.repositories[row].full_name.lower(),
+        )
+        self.repositories = [self.repositories[row] for row in order]
+        self.masks = [self.masks[row] for row in order]
+
+    def __len__(self) -> int:
+        return len(self.repositories)
+
+    def __iter__(self) -> Iterator[tuple[Repository, int]]:
+        return zip(self.repositories, self.masks)
+
+    @property
+    def complete_mask(self) -> int:
+        return (1 << len(self.workflows)) - 1
+
+    def files(self, mask: int) -> set[str]:
+        return {
+            name
+            for column, name in enumerate(self.workflow_files)
+            if mask >> column & 1
+        }
+
+    def column_counts(self) -> list[int]:
+        return [
+            sum(mask >> column & 1 for mask in self.masks)
+            for column in range(len(self.workflows))
         ]
+
+    def without_volatile(self) -> StatusMatrix:
+        stable = StatusMatrix(self.workflows)
+        stable.repositories = self.repositories
+        stable.masks = self.masks
+        stable.has_runs = self.has_runs
+        stable.runs = {key: run.without_volatile() for key, run in self.runs.items()}
+        return stable
+
+    def row_runs(self, row: int) -> dict[str, WorkflowRun] | None:
+        if not self.has_runs:
+            return None
+        return {
+            name: self.runs[(row, column)]
+            for column, name in enumerate(self.workflow_files)
+            if (row, column) in self.runs
+        }
+
+    def workflow_health(self) -> list[dict[str, Any]]:
+        """Fleet-wide failure rate and median duration per managed workflow."""
+        health = []
+        for column, (path, count) in enumerate(
+            zip(self.workflows, self.column_counts())
+        ):
+            runs = [
+                self.runs[(row, column)]
+                for row in range(len(self))
+                if (row, column) in self.runs
+            ]
+            completed = [run for run in runs if run.status == "completed"]
+            failures = sum(run.failed for run in completed)
+            durations = sorted(
+                run.duration_seconds
+                for run in completed
+                if run.duration_seconds is not None
+            )
+            health.append(
+                {
+                    "name": Path(path).stem,
+                    "repositories": count,
+                    "completed": len(completed),
+                    "failures": failures,
+                    "failure_rate": failures / len(completed) if completed else None,
+                    "median_duration_seconds": (
+                        durations[len(durations) // 2] if durations else None
+                    ),
+                }
+            )
+        return health
+
+
+def render_markdown(matrix: StatusMatrix, output: TextIO) -> None:
+    output.write(
+        render_header(len(matrix), matrix.workflows, run_status=matrix.has_runs)
     )
-    return "\n".join(lines)
+    for row, (repository, mask) in enumerate(matrix):
+        output.write(
+            render_row(
+                repository,
+                matrix.files(mask),
+                matrix.workflows,
+                matrix.row_runs(row),
+            )
+        )
+    output.write(render_footer(matrix.workflow_health() if matrix.has_runs else None))
+
+
+def render_json_index(matrix: StatusMatrix, output: TextIO) -> None:
+    """Machine-readable index for dashboards; bit N of mask is workflows[N]."""
+    index = {
+        "version": 1,
+        "workflows": [
+            {"name": Path(path).stem, "file": name, "path": path, "repositories": count}
+            for path, name, count in zip(
+                matrix.workflows,
+                matrix.workflow_files,
+                matrix.column_counts(),
+            )
+        ],
+        "repositories": [
+            {
+                "full_name": repository.full_name,
+                "url": f"https://github.com/{repository.full_name}",
+                "mask": mask,
+                "workflows": sorted(matrix.files(mask)),
+            }
+            for repository, mask in matrix
+        ],
+    }
+    if matrix.has_runs:
+        for entry, health in zip(index["workflows"], matrix.workflow_health()):
+            entry.update(
+                completed_runs=health["completed"],
+                failures=health["failures"],
+                failure_rate=health["failure_rate"],
+                median_duration_seconds=health["median_duration_seconds"],
+            )
+        for row, entry in enumerate(index["repositories"]):
+            entry["runs"] = {
+                name: run.to_dict()
+                for name, run in sorted((matrix.row_runs(row) or {}).items())
+            }
+    json.dump(index, output, indent=2)
+    output.write("\n")
+
+
+def render_csv(matrix: StatusMatrix, output: TextIO) -> None:
+    writer = csv.writer(output, lineterminator="\n")
+    writer.writerow(["repository", *(Path(path).stem for path in matrix.workflows)])
+    for repository, mask in matrix:
+        writer.writerow(
+            [
+                repository.full_name,
+                *(mask >> column & 1 for column in range(len(matrix.workflows))),
+            ]
+        )
+
+
+HTML_SCRIPT = """<script>
+const filter = document.getElementById("filter");
+const missing = document.getElementById("missing");
+function applyFilters() {
+  const text = filter.value.trim().toLowerCase();
+  const column = missing.value;
+  for (const row of document.querySelectorAll("#status tbody tr")) {
+    const mask = BigInt(row.dataset.mask);
+    const lacking = column === ""
+      || (column === "any"
+        ? mask !== BigInt(row.dataset.complete)
+        : ((mask >> BigInt(column)) & 1n) === 0n);
+    row.hidden = !(row.dataset.name.includes(text) && lacking);
+  }
+}
+filter.addEventListener("input", applyFilters);
+missing.addEventListener("change", applyFilters);
+</script>
+"""
+
+
+def render_html(matrix: StatusMatrix, output: TextIO) -> None:
+    """Static page with client-side filtering and lazily loaded badges."""
+    labels = [Path(path).stem for path in matrix.workflows]
+    options = "".join(
+        f'<option value="{column}">{html.escape(label)}</option>'
+        for column, label in enumerate(labels)
+    )
+    output.write(
+        "<!DOCTYPE html>\n"
+        '<html lang="en">\n<head>\n<meta charset="utf-8">\n'
+        '<meta name="viewport" content="width=device-width, initial-scale=1">\n'
+        "<title>Workflow Status</title>\n"
+        "<style>body{font-family:sans-serif}td,th{padding:2px 6px;"
+        "text-align:left}</style>\n</head>\n<body>\n<h1>Workflow Status</h1>\n"
+        f"<p>Repositories shown: {len(matrix)}. "
+        f"Managed workflows shown: {len(matrix.workflows)}.</p>\n"
+        '<p><input id="filter" type="search" placeholder="Filter repositories"> '
+        '<label>Missing <select id="missing"><option value="">-</option>'
+        f'<option value="any">any workflow</option>{options}</select></label></p>\n'
+        '<table id="status">\n<thead><tr><th>Repository</th>'
+        + "".join(f"<th>{html.escape(label)}</th>" for label in labels)
+        + "</tr></thead>\n<tbody>\n"
+    )
+    for row, (repository, mask) in enumerate(matrix):
+        url = html.escape(f"https://github.com/{repository.full_name}", quote=True)
+        cells = [f'<td><a href="{url}">{html.escape(repository.full_name)}</a></td>']
+        runs = matrix.row_runs(row)
+        for column, (label, name) in enumerate(zip(labels, matrix.workflow_files)):
+            run = runs.get(name) if runs is not None else None
+            if mask >> column & 1 and runs is not None and run is None:
+                cells.append('<td title="no runs">❔</td>')
+            elif mask >> column & 1 and run is not None:
+                state = html.escape(run.conclusion or run.status)
+                cells.append(
+                    f'<td class="{state}" title="{state}, '
+                    f'{format_duration(run.duration_seconds)}">'
+                    f'<a href="{html.escape(run.url, quote=True)}">'
+                    f'{RUN_SYMBOLS.get(run.conclusion or "", "🟡")}</a></td>'
+                )
+            elif mask >> column & 1:
+                workflow_url = f"{url}/actions/workflows/{html.escape(name)}"
+                cells.append(
+                    f'<td><a href="{workflow_url}"><img loading="lazy" '
+                    f'decoding="async" src="{workflow_url}/badge.svg" '
+                    f'alt="{html.escape(label)}"></a></td>'
+                )
+            else:
+                cells.append("<td>-</td>")
+        output.write(
+            f'<tr data-name="{html.escape(repository.full_name.lower())}" '
+            f'data-mask="{mask}" data-complete="{matrix.complete_mask}">'
+            + "".join(cells)
+            + "</tr>\n"
+        )
+    output.write("</tbody>\n</table>\n" + HTML_SCRIPT + "</body>\n</html>\n")
+
+
+Renderer = Callable[[StatusMatrix, TextIO], None]
+RENDERERS: dict[str, Renderer] = {
+    "markdown": render_markdown,
+    "json": render_json_index,
+    "csv": render_csv,
+    "html": render_html,
+}
+
+
+class HashingWriter:
+    """Text sink that hashes everything written, optionally passing it on."""
+
+    def __init__(self, target: TextIO | None = None) -> None:
+        self.target = target
+        self._hash = hashlib.sha256()
+
+    def write(self, text: str) -> int:
+        self._hash.update(text.encode("utf-8"))
+        if self.target is not None:
+            self.target.write(text)
+        return len(text)
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+
+def render_to_temporary(
+    path: Path, renderer: Renderer, matrix: StatusMatrix
+) -> tuple[Path, str]:
+    """Stream one rendering next to path; return the file and its SHA-256."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        mode="w",
+        encoding="utf-8",
+        newline="",
+        dir=path.parent,
+        prefix=f".{path.name}.",
+        delete=False,
+    ) as output:
+        writer = HashingWriter(output)
+        renderer(matrix, writer)
+        temporary_path = Path(output.name)
+    return temporary_path, writer.hexdigest()
+
+
+def write_rendered(path: Path, renderer: Renderer, matrix: StatusMatrix) -> None:
+    """Stream one rendering of the matrix to disk and replace path atomically."""
+    temporary_path, _digest = render_to_temporary(path, renderer, matrix)
+    temporary_path.replace(path)
+
+
+def file_digest(path: Path) -> str | None:
+    """SHA-256 of a file read in chunks, or None if it does not exist."""
+    digest = hashlib.sha256()
+    try:
+        with path.open("rb") as existing:
+            for chunk in iter(lambda: existing.read(1 << 16), b""):
+                digest.update(chunk)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+
+def stable_digest(renderer: Renderer, matrix: StatusMatrix) -> str:
+    """Hash the rendering with run URLs, timestamps and durations excluded."""
+    writer = HashingWriter()
+    renderer(matrix.without_volatile(), writer)
+    return writer.hexdigest()
+
+
+def load_digests(path: Path) -> dict[str, str]:
+    try:
+        digests = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as error:
+        print(f"Ignoring unreadable digest file {path}: {error}", file=sys.stderr)
+        return {}
+    return digests if isinstance(digests, dict) else {}
+
+
+def write_if_changed(
+    path: Path,
+    renderer: Renderer,
+    matrix: StatusMatrix,
+    digests: dict[str, str] | None = None,
+) -> bool:
+    """Write path only if its content changed; return whether it was written.
+
+    With a digest map, a document whose only differences are volatile run
+    details is left alone without being rendered. Otherwise the document is
+    streamed to a temporary file while it is hashed, and the file replaces
+    path only if the hashes differ.
+    """
+    key = path.as_posix()
+    digest = stable_digest(renderer, matrix) if digests is not None else None
+    if digest is not None and digests.get(key) == digest and path.exists():
+        return False
+    temporary_path, content_digest = render_to_temporary(path, renderer, matrix)
+    changed = file_digest(path) != content_digest
+    if changed:
+        temporary_path.replace(path)
+    else:
+        temporary_path.unlink()
+    if digests is not None:
+        digests[key] = digest
+    return changed
+
+
+def write_status(
+    path: Path,
+    rows: Iterable[InspectedRow],
+    managed_workflows: list[str],
+) -> int:
+    """Collect rows into a sorted StatusMatrix and write the markdown page."""
+    matrix = StatusMatrix.from_rows(rows, managed_workflows)
+    write_rendered(path, render_markdown, matrix)
+    return len(matrix)
 
 
 def write_atomic(path: Path, content: str) -> None:
@@ -414,34 +2743,137 @@ def write_atomic(path: Path, content: str) -> None:
     temporary_path.replace(path)
 
 
+def create_client(args: argparse.Namespace) -> GitHubClient:
+    if (args.record_path or args.replay_path) and args.cache_dir:
+        raise ValueError("--cache-dir cannot be combined with recording or replay")
+    transport: RecordingTransport | ReplayTransport | None = None
+    if args.replay_path:
+        transport = ReplayTransport(args.replay_path)
+    elif args.record_path:
+        transport = RecordingTransport(
+            ConnectionPool(
+                args.api_base,
+                size=args.max_concurrency,
+                timeout=args.request_timeout,
+            ),
+            args.record_path,
+        )
+    return GitHubClient(
+        resolve_tokens(dict(os.environ)),
+        api_base=args.api_base,
+        pool_size=args.max_concurrency,
+        timeout=args.request_timeout,
+        cache=(
+            ResponseCache(args.cache_dir, max_bytes=args.cache_max_bytes)
+            if args.cache_dir
+            else None
+        ),
+        scheduler=RetryScheduler(
+            max_wait=args.max_wait,
+            requests_per_second=0 if args.replay_path else args.requests_per_second,
+        ),
+        transport=transport,
+    )
+
+
 def main() -> int:
     args = parse_args()
+    try:
+        client = create_client(args)
+    except (RuntimeError, ValueError) as error:
+        print(str(error), file=sys.stderr)
+        return 1
+    cache = client.cache
     try:
         owners = resolve_owners(
             args.owner,
         )
-        token = os.getenv("GITHUB_TOKEN") or os.getenv("GH_TOKEN")
-        client = GitHubClient(token)
-        repositories = discover_repositories(owners, client)
-        managed_repositories, workflows_by_repo = inspect_managed_repositories(
-            repositories,
-            client,
-            answers_file=args.answers_file,
-            chunk_size=args.chunk_size,
-        )
         managed_workflows = load_managed_workflows(args.managed_paths_file)
-        write_atomic(
-            args.output_path,
-            render_status(
-                managed_repositories,
-                workflows_by_repo,
-                managed_workflows,
-            ),
-        )
+        drift = None
+        if args.drift_path:
+            managed_paths = load_managed_paths(args.managed_paths_file)
+            drift = DriftIndex(
+                managed_paths,
+                template_blob_oids(
+                    managed_paths,
+                    extra_oids_file=args.template_oids_file,
+                ),
+            )
+        state = None
+        if args.discovery == "graphql":
+            if args.state_file:
+                raise ValueError("--state-file requires --discovery rest")
+            rows = iter_managed_repositories(
+                owners,
+                client,
+                answers_file=args.answers_file,
+                page_size=min(args.chunk_size, REPOSITORIES_PER_PAGE),
+                max_concurrency=args.max_concurrency,
+                drift=drift,
+            )
+        else:
+            if args.state_file:
+                state = InspectionState(args.state_file, args.answers_file)
+            rows = iter_inspected_repositories(
+                iter_repositories(
+                    owners,
+                    client,
+                    max_concurrency=args.max_concurrency,
+                ),
+                client,
+                answers_file=args.answers_file,
+                chunk_size=args.chunk_size,
+                max_chunk_size=args.max_chunk_size,
+                max_concurrency=args.max_concurrency,
+                state=state,
+                drift=drift,
+            )
+        matrix = StatusMatrix.from_rows(rows, managed_workflows)
+        if args.run_status:
+            fetch_workflow_runs(
+                matrix,
+                client,
+                max_concurrency=args.max_concurrency,
+            )
+        outputs = {
+            "markdown": args.output_path,
+            "json": args.json_path,
+            "csv": args.csv_path,
+            "html": args.html_path,
+        }
+        digests = load_digests(args.digest_path) if args.digest_path else None
+        loaded_digests = dict(digests) if digests is not None else None
+        changed = False
+        for name, path in outputs.items():
+            if path:
+                changed |= write_if_changed(path, RENDERERS[name], matrix, digests)
+        if args.digest_path and digests != loaded_digests:
+            write_atomic(
+                args.digest_path,
+                json.dumps(digests, indent=2, sort_keys=True) + "\n",
+            )
+        print(f"changed={'true' if changed else 'false'}")
+        if drift is not None:
+            drift.write(args.drift_path)
+        if state:
+            state.save()
     except (RuntimeError, ValueError) as error:
         print(str(error), file=sys.stderr)
-        return 1
-    return 0
+        status = 1
+    else:
+        status = 0
+    finally:
+        client.close()
+    if args.metrics_path:
+        client.metrics.write(args.metrics_path)
+    if args.metrics_summary_path:
+        client.metrics.append_summary(args.metrics_summary_path)
+    if cache:
+        print(
+            f"REST response cache: {cache.hits} hits, {cache.misses} misses.",
+            file=sys.stderr,
+        )
+    return status
 
 
 if __name__ == "__main__":
@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""Local stand-in for the GitHub API used by tests and benchmarks."""
+
+from __future__ import annotations
+
+import base64
+from dataclasses import dataclass
+import gzip
+import hashlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import math
+import random
+import re
+import threading
+from email.message import Message
+from typing import Any, Callable
+from urllib.parse import parse_qs, unquote, urlsplit
+
+StubResponse = tuple[int, dict[str, str], Any]
+RestHandler = Callable[[str, dict[str, list[str]], Message], StubResponse]
+GraphQLHandler = Callable[[str, Message], StubResponse]
+
+REPOSITORY_ALIAS_RE = re.compile(
+    r'(repo_\d+): repository\(\s*owner: ("(?:[^"\\]|\\.)*")'
+    r'\s*name: ("(?:[^"\\]|\\.)*")\s*\)'
+)
+REPOSITORY_OWNER_RE = re.compile(r'repositoryOwner\(login: ("(?:[^"\\]|\\.)*")\)')
+FIRST_RE = re.compile(r"\bfirst: (\d+)")
+AFTER_RE = re.compile(r'\bafter: ("(?:[^"\\]|\\.)*")')
+MANAGED_OBJECT_RE = re.compile(
+    r'(managed_\d+): object\(expression: "HEAD:((?:[^"\\]|\\.)*)"\)'
+)
+ANSWERS_EXPRESSION_RE = re.compile(
+    r'answers: object\(expression: "HEAD:((?:[^"\\]|\\.)*)"\)'
+)
+
+
+def default_rest_handler(
+    path: str,
+    params: dict[str, list[str]],
+    headers: Message,
+) -> StubResponse:
+    return 200, {}, {"path": path, "params": params}
+
+
+def default_graphql_handler(query: str, headers: Message) -> StubResponse:
+    return 200, {}, {"data": {}}
+
+
+@dataclass(frozen=True)
+class SyntheticRepository:
+    owner: str
+    name: str
+    fork: bool
+    archived: bool
+    managed: bool
+    workflows: tuple[str, ...]
+
+    @property
+    def oid(self) -> str:
+        return hashlib.sha1(f"{self.owner}/{self.name}".encode()).hexdigest()
+
+    def run_kind(self, workflow: str) -> int:
+        """0-7: 0 fails, 6 is missing from recent runs, 7 never ran."""
+        digest = hashlib.sha1(f"{self.owner}/{self.name}/{workflow}".encode())
+        return digest.digest()[0] % 8
+
+    def file_oid(self, path: str, template_oid: str) -> str | None:
+        """Template oid for most files; 1 in 8 drifted and 1 in 8 missing."""
+        digest = hashlib.sha1(f"{self.owner}/{self.name}:{path}".encode()).digest()
+        if digest[0] % 8 == 0:
+            return hashlib.sha1(digest).hexdigest()
+        if digest[0] % 8 == 1:
+            return None
+        return template_oid
+
+    def run(self, workflow: str) -> dict[str, Any]:
+        kind = self.run_kind(workflow)
+        return {
+            "path": f".github/workflows/{workflow}",
+            "head_branch": "main",
+            "status": "completed",
+            "conclusion": "failure" if kind == 0 else "success",
+            "run_started_at": "2024-01-01T00:00:00Z",
+            "updated_at": f"2024-01-01T00:0{kind}:30Z",
+            "html_url": (
+                f"https://github.com/{self.owner}/{self.name}/actions/runs/{kind}"
+            ),
+        }
+
+
+class SyntheticFleet:
+    """Deterministic fleet of repositories served over REST and GraphQL.
+
+    The handlers understand the queries issued by generate_workflow_status.py:
+    owner lookups and repository listings over REST, and aliased repository
+    inspections, revision lookups and paged repositoryOwner queries over
+    GraphQL.
+    """
+
+    def __init__(
+        self,
+        *,
+        owners: dict[str, str] | None = None,
+        repositories_per_owner: int = 100,
+        workflows_per_repository: int = 20,
+        managed_ratio: float = 0.8,
+        inactive_ratio: float = 0.05,
+        answers_file: str = ".copier-answers.ci.yml",
+        template_oids: dict[str, str] | None = None,
+        seed: int = 0,
+    ) -> None:
+        self.owners = owners or {"athackst": "User"}
+        self.answers_file = answers_file
+        self.template_oids = template_oids or {}
+        self.workflows = tuple(
+            f"workflow_{index:02d}.yml" for index in range(workflows_per_repository)
+        )
+        rng = random.Random(seed)
+        self.repositories: dict[str, list[SyntheticRepository]] = {}
+        self._by_name: dict[tuple[str, str], SyntheticRepository] = {}
+        for owner in self.owners:
+            repositories = []
+            for index in range(repositories_per_owner):
+                managed = rng.random() < managed_ratio
+                inactive = rng.random() < inactive_ratio
+                repository = SyntheticRepository(
+                    owner=owner,
+                    name=f"repo-{index:05d}",
+                    fork=inactive and index % 2 == 0,
+                    archived=inactive and index % 2 == 1,
+                    managed=managed,
+                    workflows=tuple(
+                        name for name in self.workflows if rng.random() < 0.9
+                    ),
+                )
+                repositories.append(repository)
+                self._by_name[(owner.lower(), repository.name.lower())] = repository
+            self.repositories[owner] = repositories
+        self._remaining = 5000
+        self._lock = threading.Lock()
+
+    @property
+    def managed_repositories(self) -> list[SyntheticRepository]:
+        return [
+            repository
+            for repositories in self.repositories.values()
+            for repository in repositories
+            if repository.managed and not repository.fork and not repository.archived
+        ]
+
+    def _rate_limit_headers(self, cost: int, resource: str) -> dict[str, str]:
+        with self._lock:
+            # Refill instead of throttling so long benchmark runs keep going.
+            self._remaining = max(self._remaining - cost, 0) or 5000
+            remaining = self._remaining
+        return {
+            "X-RateLimit-Limit": "5000",
+            "X-RateLimit-Remaining": str(remaining),
+            "X-RateLimit-Reset": "4102444800",
+            "X-RateLimit-Resource": resource,
+        }
+
+    def _owner(self, login: str) -> str | None:
+        return next(
+            (owner for owner in self.owners if owner.lower() == login.lower()),
+            None,
+        )
+
+    def rest_handler(
+        self,
+        path: str,
+        params: dict[str, list[str]],
+        headers: Message,
+    ) -> StubResponse:
+        parts = [unquote(part) for part in path.strip("/").split("/")]
+        owner = self._owner(parts[1]) if len(parts) > 1 else None
+        if owner is None:
+            return 404, {}, {"message": "Not Found"}
+        rate_headers = self._rate_limit_headers(1, "core")
+        if parts[0] == "repos":
+            return self._runs_response(owner, parts[2:], rate_headers)
+        if len(parts) == 2 and parts[0] == "users":
+            return 200, rate_headers, {"login": owner, "type": self.owners[owner]}
+        if len(parts) != 3 or parts[2] != "repos":
+            return 404, rate_headers, {"message": "Not Found"}
+
+        per_page = int((params.get("per_page") or ["30"])[0])
+        page = int((params.get("page") or ["1"])[0])
+        repositories = self.repositories[owner]
+        last_page = max(math.ceil(len(repositories) / per_page), 1)
+        items = [
+            {
+                "name": repository.name,
+                "full_name": f"{owner}/{repository.name}",
+                "owner": {"login": owner},
+                "private": False,
+                "fork": repository.fork,
+                "archived": repository.archived,
+                "default_branch": "main",
+            }
+            for repository in repositories[(page - 1) * per_page : page * per_page]
+        ]
+        response_headers = {
+            **rate_headers,
+            "ETag": '"' + hashlib.sha1(json.dumps(items).encode()).hexdigest() + '"',
+        }
+        if last_page > 1:
+            response_headers["Link"] = (
+                f'<{path}?per_page={per_page}&page={last_page}>; rel="last"'
+            )
+        return 200, response_headers, items
+
+    def _runs_response(
+        self,
+        owner: str,
+        parts: list[str],
+        rate_headers: dict[str, str],
+    ) -> StubResponse:
+        repository = self._by_name.get((owner.lower(), parts[0].lower()))
+        if repository is None:
+            return 404, rate_headers, {"message": "Not Found"}
+        if parts[1:] == ["actions", "runs"]:
+            workflows = [
+                name for name in repository.workflows if repository.run_kind(name) < 6
+            ]
+        elif len(parts) == 5 and parts[1:3] == ["actions", "workflows"]:
+            workflows = [parts[3]] if repository.run_kind(parts[3]) < 7 else []
+        else:
+            return 404, rate_headers, {"message": "Not Found"}
+        runs = [repository.run(name) for name in workflows]
+        return 200, rate_headers, {"total_count": len(runs), "workflow_runs": runs}
+
+    def _inspection(self, repository: SyntheticRepository) -> dict[str, Any]:
+        return {
+            "answers": {"__typename": "Blob"} if repository.managed else None,
+            "workflows": {
+                "__typename": "Tree",
+                "entries": [
+                    {"name": name, "type": "blob"} for name in repository.workflows
+                ],
+            },
+        }
+
+    def _node(self, repository: SyntheticRepository, query: str) -> dict[str, Any]:
+        node: dict[str, Any] = {
+            "name": repository.name,
+            "owner": {"login": repository.owner},
+            "defaultBranchRef": {"name": "main"},
+        }
+        if "pushedAt" in query:
+            node["pushedAt"] = "2024-01-01T00:00:00Z"
+            node["defaultBranchRef"]["target"] = {"oid": repository.oid}
+        for alias, path in MANAGED_OBJECT_RE.findall(query):
+            template_oid = self.template_oids.get(path)
+            oid = repository.file_oid(path, template_oid) if template_oid else None
+            node[alias] = {"oid": oid} if oid else None
+        answers = ANSWERS_EXPRESSION_RE.search(query)
+        if answers:
+            node.update(self._inspection(repository))
+            if answers.group(1) != self.answers_file:
+                node["answers"] = None
+        return node
+
+    def graphql_handler(self, query: str, headers: Message) -> StubResponse:
+        data: dict[str, Any] = {}
+        nodes = 0
+        owner_match = REPOSITORY_OWNER_RE.search(query)
+        if owner_match:
+            owner = self._owner(json.loads(owner_match.group(1)))
+            first_match = FIRST_RE.search(query)
+            first = int(first_match.group(1)) if first_match else 100
+            if first > 100:
+                return 200, {}, {
+                    "errors": [
+                        {"type": "MAX_NODE_LIMIT_EXCEEDED", "message": "too many"}
+                    ]
+                }
+            after = AFTER_RE.search(query)
+            offset = (
+                int(base64.b64decode(json.loads(after.group(1))).decode())
+                if after
+                else 0
+            )
+            repositories = [
+                repository
+                for repository in self.repositories.get(owner or "", [])
+                if not repository.fork and not repository.archived
+            ]
+            page = repositories[offset : offset + first]
+            end = offset + len(page)
+            nodes = len(page)
+            data["repositoryOwner"] = (
+                {
+                    "repositories": {
+                        "pageInfo": {
+                            "hasNextPage": end < len(repositories),
+                            "endCursor": base64.b64encode(str(end).encode()).decode(),
+                        },
+                        "nodes": [self._node(repository, query) for repository in page],
+                    }
+                }
+                if owner
+                else None
+            )
+        for alias, owner_literal, name_literal in REPOSITORY_ALIAS_RE.findall(query):
+            nodes += 1
+            repository = self._by_name.get(
+                (json.loads(owner_literal).lower(), json.loads(name_literal).lower())
+            )
+            data[alias] = self._node(repository, query) if repository else None
+
+        # Approximate GitHub's node-count based cost: one point per 100 nodes.
+        cost = max(1, math.ceil(nodes / 100))
+        rate_headers = self._rate_limit_headers(cost, "graphql")
+        if "rateLimit" in query:
+            data["rateLimit"] = {
+                "cost": cost,
+                "remaining": int(rate_headers["X-RateLimit-Remaining"]),
+            }
+        return 200, rate_headers, {"data": data}
+
+
+class StubGitHubRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: StubGitHubServer
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.record_connection()
+
+    def log_message(self, format: str, *args: Any) -> None:
+        return
+
+    def do_GET(self) -> None:
+        parts = urlsplit(self.path)
+        status, headers, payload = self.server.rest_handler(
+            parts.path,
+            parse_qs(parts.query),
+            self.headers,
+        )
+        self._respond(status, headers, payload)
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        status, headers, payload = self.server.graphql_handler(
+            body.get("query", ""),
+            self.headers,
+        )
+        self._respond(status, headers, payload)
+
+    def _respond(self, status: int, headers: dict[str, str], payload: Any) -> None:
+        self.server.record_request()
+        etag = headers.get("ETag")
+        if status == 200 and etag and self.headers.get("If-None-Match") == etag:
+            self.server.record_not_modified()
+            status, payload = 304, None
+        body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        if body and "gzip" in (self.headers.get("Accept-Encoding") or ""):
+            body = gzip.compress(body)
+            headers = {**headers, "Content-Encoding": "gzip"}
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StubGitHubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        *,
+        rest_handler: RestHandler = default_rest_handler,
+        graphql_handler: GraphQLHandler = default_graphql_handler,
+    ) -> None:
+        super().__init__(("127.0.0.1", 0), StubGitHubRequestHandler)
+        self.rest_handler = rest_handler
+        self.graphql_handler = graphql_handler
+        self.connections = 0
+        self.requests = 0
+        self.not_modified = 0
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def record_connection(self) -> None:
+        with self._lock:
+            self.connections += 1
+
+    def record_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def record_not_modified(self) -> None:
+        with self._lock:
+            self.not_modified += 1
+
+    def __enter__(self) -> StubGitHubServer:
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
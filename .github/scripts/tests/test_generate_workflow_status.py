@@ -1,8 +1,11 @@
+import io
 import json
+import os
 from pathlib import Path
 from types import SimpleNamespace
 import sys
 import tempfile
+import time
 import unittest
 from unittest.mock import patch
 
@@ -10,22 +13,33 @@ SCRIPTS_DIR = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(SCRIPTS_DIR))
 
 import generate_workflow_status  # noqa: E402
+from github_stub_server import StubGitHubServer, SyntheticFleet  # noqa: E402
 
 
 class FakeClient:
-    def __init__(self, rest_responses=None, graphql_responses=None):
+    def __init__(self, rest_responses=None, graphql_responses=None, rest_headers=None):
         self.rest_responses = rest_responses or {}
+        self.rest_headers = rest_headers or {}
         self.graphql_responses = list(graphql_responses or [])
         self.graphql_queries = []
+        self.metrics = generate_workflow_status.RequestMetrics()
+        self.cache = None
 
     def get_json(self, path, *, params=None):
+        data, _headers = self.get_json_response(path, params=params)
+        return data
+
+    def get_json_response(self, path, *, params=None):
         key = (path, tuple(sorted((params or {}).items())))
-        return self.rest_responses[key]
+        return self.rest_responses[key], self.rest_headers.get(key, {})
 
     def graphql(self, query):
         self.graphql_queries.append(query)
         return self.graphql_responses.pop(0)
 
+    def close(self):
+        pass
+
 
 class GenerateWorkflowStatusTests(unittest.TestCase):
     def test_resolve_owners_deduplicates_cli_values(self):
@@ -121,6 +135,71 @@ class GenerateWorkflowStatusTests(unittest.TestCase):
             repositories,
         )
 
+    def test_discover_repositories_fetches_linked_pages_concurrently(self):
+        def page(owner, start, count):
+            return [
+                {"name": f"repo-{index:03d}", "owner": {"login": owner}}
+                for index in range(start, start + count)
+            ]
+
+        rest_responses = {
+            ("/users/PrimerPages", ()): {"type": "Organization"},
+            ("/users/athackst", ()): {"type": "User"},
+            (
+                "/users/athackst/repos",
+                (("page", 1), ("per_page", 100)),
+            ): [{"name": "solo", "owner": {"login": "athackst"}}],
+        }
+        rest_headers = {}
+        for number in range(1, 4):
+            key = ("/orgs/PrimerPages/repos", (("page", number), ("per_page", 100)))
+            rest_responses[key] = page(
+                "PrimerPages",
+                (number - 1) * 100,
+                100 if number < 3 else 5,
+            )
+        rest_headers[
+            ("/orgs/PrimerPages/repos", (("page", 1), ("per_page", 100)))
+        ] = {
+            "Link": (
+                '<https://api.github.com/organizations/1/repos?page=2&per_page=100>; '
+                'rel="next", '
+                '<https://api.github.com/organizations/1/repos?page=3&per_page=100>; '
+                'rel="last"'
+            )
+        }
+        client = FakeClient(rest_responses=rest_responses, rest_headers=rest_headers)
+
+        repositories = generate_workflow_status.discover_repositories(
+            ["PrimerPages", "athackst"],
+            client,
+            max_concurrency=4,
+        )
+
+        self.assertEqual(len(repositories), 206)
+        self.assertEqual(
+            repositories,
+            sorted(repositories, key=lambda repository: repository.full_name.lower()),
+        )
+        self.assertIn(
+            generate_workflow_status.Repository("PrimerPages", "repo-204"),
+            repositories,
+        )
+
+    def test_last_page_from_link_reads_last_relation(self):
+        self.assertEqual(
+            generate_workflow_status.last_page_from_link(
+                '<https://api.github.com/user/1/repos?per_page=100&page=7>; rel="last"'
+            ),
+            7,
+        )
+        self.assertIsNone(generate_workflow_status.last_page_from_link(None))
+        self.assertIsNone(
+            generate_workflow_status.last_page_from_link(
+                '<https://api.github.com/user/1/repos?page=2>; rel="next"'
+            )
+        )
+
     def test_inspect_managed_repositories_filters_answers_and_maps_workflows(self):
         repositories = [
             generate_workflow_status.Repository("athackst", "first"),
@@ -175,6 +254,400 @@ class GenerateWorkflowStatusTests(unittest.TestCase):
         self.assertEqual(len(client.graphql_queries), 2)
         self.assertIn("HEAD:.copier-answers.ci.yml", client.graphql_queries[0])
 
+    def test_discover_managed_repositories_pages_graphql_cursor(self):
+        managed_node = {
+            "answers": {"__typename": "Blob"},
+            "workflows": {
+                "__typename": "Tree",
+                "entries": [{"name": "ci_update.yml", "type": "blob"}],
+            },
+        }
+        client = FakeClient(
+            graphql_responses=[
+                {
+                    "repositoryOwner": {
+                        "repositories": {
+                            "pageInfo": {"hasNextPage": True, "endCursor": "c1"},
+                            "nodes": [
+                                {
+                                    "name": "Zeta",
+                                    "owner": {"login": "athackst"},
+                                    **managed_node,
+                                },
+                                {
+                                    "name": "unmanaged",
+                                    "owner": {"login": "athackst"},
+                                    "answers": None,
+                                    "workflows": None,
+                                },
+                            ],
+                        }
+                    },
+                    "rateLimit": {"cost": 1, "remaining": 4999},
+                },
+                {
+                    "repositoryOwner": {
+                        "repositories": {
+                            "pageInfo": {"hasNextPage": False, "endCursor": "c2"},
+                            "nodes": [
+                                {
+                                    "name": "alpha",
+                                    "owner": {"login": "athackst"},
+                                    **managed_node,
+                                },
+                                {
+                                    "name": "collaborator",
+                                    "owner": {"login": "someone-else"},
+                                    **managed_node,
+                                },
+                            ],
+                        }
+                    },
+                    "rateLimit": {"cost": 1, "remaining": 4998},
+                },
+            ]
+        )
+
+        managed, workflows = generate_workflow_status.discover_managed_repositories(
+            ["athackst"],
+            client,
+            answers_file=".copier-answers.ci.yml",
+            page_size=2,
+        )
+
+        self.assertEqual(
+            [repository.full_name for repository in managed],
+            ["athackst/alpha", "athackst/Zeta"],
+        )
+        self.assertEqual(workflows["athackst/Zeta"], {"ci_update.yml"})
+        self.assertEqual(len(client.graphql_queries), 2)
+        self.assertIn('repositoryOwner(login: "athackst")', client.graphql_queries[0])
+        self.assertNotIn("after:", client.graphql_queries[0])
+        self.assertIn('after: "c1"', client.graphql_queries[1])
+
+    def test_discover_managed_repositories_rejects_unknown_owner(self):
+        client = FakeClient(graphql_responses=[{"repositoryOwner": None}])
+        with self.assertRaisesRegex(ValueError, "Expected GitHub user or organization"):
+            generate_workflow_status.discover_managed_repositories(
+                ["missing"],
+                client,
+                answers_file=".copier-answers.ci.yml",
+            )
+
+    def test_inspect_managed_repositories_splits_chunks_that_time_out(self):
+        repositories = [
+            generate_workflow_status.Repository("athackst", f"repo-{index}")
+            for index in range(4)
+        ]
+        managed_response = {
+            "answers": {"__typename": "Blob"},
+            "workflows": {"__typename": "Tree", "entries": []},
+        }
+
+        class SplittingClient(FakeClient):
+            def graphql(self, query):
+                self.graphql_queries.append(query)
+                if query.count("repository(") > 2:
+                    raise generate_workflow_status.QueryTooLargeError("timeout")
+                return {
+                    f"repo_{index}": managed_response
+                    for index in range(query.count("repository("))
+                }
+
+        client = SplittingClient()
+        with patch("sys.stderr"):
+            managed, _workflows = (
+                generate_workflow_status.inspect_managed_repositories(
+                    repositories,
+                    client,
+                    answers_file=".copier-answers.ci.yml",
+                    chunk_size=4,
+                )
+            )
+
+        self.assertEqual(managed, repositories)
+        self.assertEqual(
+            [query.count("repository(") for query in client.graphql_queries],
+            [4, 2, 2],
+        )
+
+    def test_adaptive_batcher_grows_and_shrinks_from_cost_and_latency(self):
+        batcher = generate_workflow_status.AdaptiveBatcher(
+            10,
+            maximum=40,
+            target_seconds=2.0,
+        )
+        batcher.record_success(10, 0.5, 1)
+        self.assertEqual(batcher.size, 15)
+        batcher.record_success(15, 4.0, 1)
+        self.assertEqual(batcher.size, 7)
+        batcher.record_success(7, 0.5, 1)
+        self.assertEqual(batcher.size, 10)
+        batcher.record_success(10, 0.5, 2)
+        self.assertEqual(batcher.size, 7)
+        batcher.record_failure(7)
+        self.assertEqual(batcher.size, 3)
+        for _ in range(10):
+            batcher.record_success(batcher.size, 0.1, None)
+        self.assertEqual(batcher.size, 40)
+
+    def test_incremental_inspection_only_queries_changed_repositories(self):
+        repositories = [
+            generate_workflow_status.Repository("athackst", "changed"),
+            generate_workflow_status.Repository("athackst", "same"),
+            generate_workflow_status.Repository("athackst", "unmanaged"),
+        ]
+        client = FakeClient(
+            graphql_responses=[
+                {
+                    "repo_0": {"defaultBranchRef": {"target": {"oid": "new"}}},
+                    "repo_1": {"defaultBranchRef": {"target": {"oid": "same"}}},
+                    "repo_2": {"defaultBranchRef": {"target": {"oid": "other"}}},
+                },
+                {
+                    "repo_0": {
+                        "answers": {"__typename": "Blob"},
+                        "workflows": {
+                            "__typename": "Tree",
+                            "entries": [{"name": "site.yml", "type": "blob"}],
+                        },
+                    }
+                },
+            ]
+        )
+        with tempfile.TemporaryDirectory() as temp_dir:
+            state_path = Path(temp_dir) / "state.json"
+            generate_workflow_status.save_inspection_state(
+                state_path,
+                ".copier-answers.ci.yml",
+                {
+                    "athackst/changed": {
+                        "revision": "old",
+                        "managed": True,
+                        "workflows": ["ci_update.yml"],
+                    },
+                    "athackst/same": {
+                        "revision": "same",
+                        "managed": True,
+                        "workflows": ["ci_update.yml"],
+                    },
+                    "athackst/unmanaged": {
+                        "revision": "other",
+                        "managed": False,
+                        "workflows": [],
+                    },
+                },
+            )
+
+            managed, workflows = (
+                generate_workflow_status.inspect_managed_repositories_incremental(
+                    repositories,
+                    client,
+                    answers_file=".copier-answers.ci.yml",
+                    chunk_size=30,
+                    state_path=state_path,
+                )
+            )
+            state = json.loads(state_path.read_text())
+
+        self.assertEqual(
+            [repository.name for repository in managed],
+            ["changed", "same"],
+        )
+        self.assertEqual(workflows["athackst/changed"], {"site.yml"})
+        self.assertEqual(workflows["athackst/same"], {"ci_update.yml"})
+        self.assertEqual(len(client.graphql_queries), 2)
+        self.assertIn('name: "changed"', client.graphql_queries[1])
+        self.assertNotIn('name: "same"', client.graphql_queries[1])
+        self.assertEqual(
+            state["repositories"]["athackst/changed"],
+            {"managed": True, "revision": "new", "workflows": ["site.yml"]},
+        )
+
+    def test_github_client_reuses_pooled_connections_and_decodes_gzip(self):
+        def rest_handler(path, params, headers):
+            return 200, {}, {"path": path, "page": params["page"][0]}
+
+        def graphql_handler(query, headers):
+            return 200, {}, {"data": {"viewer": {"login": "athackst"}}}
+
+        with StubGitHubServer(
+            rest_handler=rest_handler,
+            graphql_handler=graphql_handler,
+        ) as server:
+            client = generate_workflow_status.GitHubClient(
+                "token",
+                api_base=server.base_url,
+                pool_size=1,
+            )
+            pages = [
+                client.get_json("/users/athackst/repos", params={"page": page})
+                for page in range(1, 4)
+            ]
+            data = client.graphql("query { viewer { login } }")
+            client.close()
+
+        self.assertEqual([page["page"] for page in pages], ["1", "2", "3"])
+        self.assertEqual(data, {"viewer": {"login": "athackst"}})
+        self.assertEqual(client.pool.connections_opened, 1)
+        self.assertEqual(server.connections, 1)
+        self.assertEqual(server.requests, 4)
+
+    def test_github_client_reports_http_errors(self):
+        with StubGitHubServer(
+            rest_handler=lambda path, params, headers: (
+                404,
+                {},
+                {"message": "Not Found"},
+            ),
+        ) as server:
+            client = generate_workflow_status.GitHubClient(
+                None,
+                api_base=server.base_url,
+            )
+            with self.assertRaisesRegex(RuntimeError, "HTTP 404"):
+                client.get_json("/users/missing")
+            client.close()
+
+    def test_response_cache_revalidates_with_etag_across_clients(self):
+        def rest_handler(path, params, headers):
+            response_headers = {"ETag": '"v1"', "Link": '<x?page=2>; rel="last"'}
+            return 200, response_headers, [{"name": "example"}]
+
+        with (
+            StubGitHubServer(rest_handler=rest_handler) as server,
+            tempfile.TemporaryDirectory() as cache_dir,
+        ):
+            cache = generate_workflow_status.ResponseCache(Path(cache_dir))
+            for _ in range(2):
+                client = generate_workflow_status.GitHubClient(
+                    "token",
+                    api_base=server.base_url,
+                    cache=cache,
+                )
+                data, headers = client.get_json_response(
+                    "/users/athackst/repos",
+                    params={"page": 1},
+                )
+                client.close()
+
+        self.assertEqual(server.not_modified, 1)
+        self.assertEqual(data, [{"name": "example"}])
+        self.assertEqual(headers.get("Link"), '<x?page=2>; rel="last"')
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_response_cache_evicts_least_recently_used_entries(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = generate_workflow_status.ResponseCache(
+                Path(cache_dir),
+                max_bytes=400,
+            )
+            body = json.dumps(["x" * 100]).encode("utf-8")
+            for index in range(3):
+                cache.store(f"/page/{index}", {"ETag": f'"{index}"'}, body)
+                entry_path = cache._entry_path(f"/page/{index}")
+                os.utime(entry_path, (index, index))
+                cache.evict()
+
+            self.assertIsNone(cache.load("/page/0"))
+            self.assertIsNotNone(cache.load("/page/2"))
+
+    def test_response_cache_tracks_sizes_without_rescanning(self):
+        body = json.dumps(["x" * 100]).encode("utf-8")
+        with tempfile.TemporaryDirectory() as cache_dir:
+            seeded = generate_workflow_status.ResponseCache(Path(cache_dir))
+            for index in range(3):
+                seeded.store(f"/page/{index}", {"ETag": f'"{index}"'}, body)
+                entry_path = seeded._entry_path(f"/page/{index}")
+                os.utime(entry_path, (10 - index, 10 - index))
+            entry_size = entry_path.stat().st_size
+
+            cache = generate_workflow_status.ResponseCache(
+                Path(cache_dir),
+                max_bytes=3 * entry_size,
+            )
+            with patch.object(Path, "glob", side_effect=AssertionError("rescan")):
+                cache.store("/page/3", {"ETag": '"3"'}, body)
+
+            # Entries are ordered by their age on disk, not by name.
+            self.assertIsNone(cache.load("/page/2"))
+            for index in (0, 1, 3):
+                self.assertIsNotNone(cache.load(f"/page/{index}"))
+
+    def test_token_pool_prefers_token_with_most_headroom(self):
+        pool = generate_workflow_status.TokenPool(["first", "second", "first"])
+        reset = str(int(time.time()) + 3600)
+
+        self.assertEqual(pool.tokens, ["first", "second"])
+        pool.update(
+            "first",
+            "core",
+            {"X-RateLimit-Remaining": "10", "X-RateLimit-Reset": reset},
+        )
+        pool.update(
+            "second",
+            "core",
+            {"X-RateLimit-Remaining": "4000", "X-RateLimit-Reset": reset},
+        )
+        pool.update(
+            "second",
+            "graphql",
+            {
+                "X-RateLimit-Remaining": "1",
+                "X-RateLimit-Reset": reset,
+                "X-RateLimit-Resource": "graphql",
+            },
+        )
+        pool.update(
+            "first",
+            "graphql",
+            {"X-RateLimit-Remaining": "900", "X-RateLimit-Reset": reset},
+        )
+
+        self.assertEqual(pool.select("core"), "second")
+        self.assertEqual(pool.select("graphql"), "first")
+        pool.exhaust("first", "graphql", {"Retry-After": "60"}, "")
+        self.assertEqual(pool.select("graphql"), "second")
+        pool.exhaust("second", "graphql", {"Retry-After": "60"}, "")
+        self.assertFalse(pool.has_headroom("graphql"))
+        self.assertTrue(pool.has_headroom("core"))
+
+    def test_resolve_tokens_combines_token_list_and_single_token(self):
+        self.assertEqual(
+            generate_workflow_status.resolve_tokens(
+                {"GITHUB_TOKENS": "one, two,,one", "GH_TOKEN": "three"}
+            ),
+            ["one", "two", "three"],
+        )
+
+    def test_github_client_switches_tokens_when_rate_limited(self):
+        seen_tokens = []
+
+        def graphql_handler(query, headers):
+            token = headers.get("Authorization", "").removeprefix("Bearer ")
+            seen_tokens.append(token)
+            if token == "exhausted":
+                return (
+                    403,
+                    {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "0"},
+                    {"message": "API rate limit exceeded"},
+                )
+            return 200, {"X-RateLimit-Remaining": "4999"}, {"data": {"ok": True}}
+
+        with StubGitHubServer(graphql_handler=graphql_handler) as server:
+            client = generate_workflow_status.GitHubClient(
+                ["exhausted", "fresh"],
+                api_base=server.base_url,
+            )
+            with patch("sys.stderr"):
+                first = client.graphql("query { ok }")
+            second = client.graphql("query { ok }")
+            client.close()
+
+        self.assertEqual(first, {"ok": True})
+        self.assertEqual(second, {"ok": True})
+        self.assertEqual(seen_tokens, ["exhausted", "fresh", "fresh"])
+
     def test_retry_delay_uses_headers_and_rate_limit_message(self):
         self.assertEqual(
             generate_workflow_status.retry_delay_seconds(
@@ -194,6 +667,535 @@ class GenerateWorkflowStatusTests(unittest.TestCase):
             generate_workflow_status.retry_delay_seconds({}, "Forbidden")
         )
 
+    def test_retry_scheduler_backs_off_with_jitter_within_budget(self):
+        now = [0.0]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        scheduler = generate_workflow_status.RetryScheduler(
+            max_wait=20.0,
+            base_delay=1.0,
+            max_delay=8.0,
+            clock=lambda: now[0],
+            sleep=sleep,
+        )
+        delays = [scheduler.backoff(attempt) for attempt in range(1, 6)]
+        for attempt, delay in enumerate(delays, start=1):
+            ceiling = min(8.0, 2 ** (attempt - 1))
+            self.assertGreaterEqual(delay, ceiling / 2)
+            self.assertLessEqual(delay, ceiling)
+        self.assertEqual(scheduler.backoff(1, server_delay=12), 12)
+
+        with patch("sys.stderr"):
+            scheduler.wait(12, "throttled")
+            with self.assertRaises(generate_workflow_status.RetryBudgetExceeded):
+                scheduler.wait(9, "throttled")
+        self.assertEqual(sleeps, [12])
+
+    def test_retry_scheduler_token_bucket_spaces_requests_per_host(self):
+        now = [0.0]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        scheduler = generate_workflow_status.RetryScheduler(
+            requests_per_second=2.0,
+            clock=lambda: now[0],
+            sleep=sleep,
+        )
+        for _ in range(4):
+            scheduler.throttle("api.github.com")
+        scheduler.throttle("uploads.github.com")
+
+        self.assertEqual(sleeps, [0.5, 0.5])
+
+    def test_github_client_retries_throttled_graphql_through_scheduler(self):
+        responses = [
+            (403, {"Retry-After": "3"}, {"message": "secondary rate limit"}),
+            (200, {}, {"data": {"ok": True}}),
+        ]
+        waits = []
+
+        def graphql_handler(query, headers):
+            return responses.pop(0)
+
+        scheduler = generate_workflow_status.RetryScheduler(
+            requests_per_second=0,
+            sleep=waits.append,
+        )
+        with StubGitHubServer(graphql_handler=graphql_handler) as server:
+            client = generate_workflow_status.GitHubClient(
+                None,
+                api_base=server.base_url,
+                scheduler=scheduler,
+            )
+            with patch("sys.stderr"):
+                data = client.graphql("query { ok }")
+            client.close()
+
+        self.assertEqual(data, {"ok": True})
+        self.assertEqual(len(waits), 1)
+        self.assertGreaterEqual(waits[0], 3)
+
+    def test_github_client_records_per_endpoint_metrics(self):
+        graphql_responses = [
+            (403, {"Retry-After": "1"}, {"message": "secondary rate limit"}),
+            (
+                200,
+                {"X-RateLimit-Remaining": "4990"},
+                {"data": {"rateLimit": {"cost": 3, "remaining": 4990}}},
+            ),
+        ]
+
+        def rest_handler(path, params, headers):
+            return 200, {"X-RateLimit-Remaining": "4999"}, [{"name": "repo"}]
+
+        def graphql_handler(query, headers):
+            return graphql_responses.pop(0)
+
+        with StubGitHubServer(
+            rest_handler=rest_handler,
+            graphql_handler=graphql_handler,
+        ) as server:
+            client = generate_workflow_status.GitHubClient(
+                "token",
+                api_base=server.base_url,
+                scheduler=generate_workflow_status.RetryScheduler(
+                    requests_per_second=0,
+                    sleep=lambda seconds: None,
+                ),
+            )
+            client.get_json("/users/athackst/repos", params={"page": 1})
+            client.get_json("/users/althack/repos", params={"page": 2})
+            with patch("sys.stderr"):
+                client.graphql("query { rateLimit { cost remaining } }")
+            client.close()
+
+        metrics = client.metrics.to_dict()
+        rest = metrics["endpoints"]["GET /users/{owner}/repos"]
+        graphql = metrics["endpoints"]["POST /graphql"]
+        self.assertEqual(rest["requests"], 2)
+        self.assertEqual(rest["rate_limit_remaining"], 4999)
+        self.assertEqual(sum(rest["latency_ms"].values()), 2)
+        self.assertEqual(graphql["requests"], 2)
+        self.assertEqual(graphql["errors"], 1)
+        self.assertEqual(graphql["retries"], 1)
+        self.assertEqual(graphql["graphql_cost"], 3)
+        self.assertEqual(metrics["totals"]["requests"], 4)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            metrics_path = Path(temp_dir) / "metrics.json"
+            summary_path = Path(temp_dir) / "summary.md"
+            summary_path.write_text("# Existing summary\n")
+            client.metrics.write(metrics_path)
+            client.metrics.append_summary(summary_path)
+            self.assertEqual(json.loads(metrics_path.read_text()), metrics)
+            summary = summary_path.read_text()
+
+        self.assertTrue(summary.startswith("# Existing summary\n"))
+        self.assertIn("| `POST /graphql` | 2 | 1 | 0 | 1 |", summary)
+        self.assertIn("| **Total** | 4 |", summary)
+
+    def test_synthetic_fleet_discovery_modes_agree(self):
+        fleet = SyntheticFleet(
+            owners={"athackst": "User", "althack": "Organization"},
+            repositories_per_owner=120,
+            workflows_per_repository=4,
+        )
+        owners = list(fleet.owners)
+        with StubGitHubServer(
+            rest_handler=fleet.rest_handler,
+            graphql_handler=fleet.graphql_handler,
+        ) as server:
+            client = generate_workflow_status.GitHubClient(
+                None,
+                api_base=server.base_url,
+                scheduler=generate_workflow_status.RetryScheduler(
+                    requests_per_second=0
+                ),
+            )
+            graphql_rows = list(
+                generate_workflow_status.iter_managed_repositories(
+                    owners,
+                    client,
+                    answers_file=fleet.answers_file,
+                    page_size=30,
+                    max_concurrency=2,
+                )
+            )
+            rest_rows = list(
+                generate_workflow_status.iter_inspected_repositories(
+                    generate_workflow_status.iter_repositories(
+                        owners, client, max_concurrency=2
+                    ),
+                    client,
+                    answers_file=fleet.answers_file,
+                    chunk_size=30,
+                    max_chunk_size=100,
+                    max_concurrency=2,
+                )
+            )
+            client.close()
+
+        expected = {
+            (f"{repository.owner}/{repository.name}", frozenset(repository.workflows))
+            for repository in fleet.managed_repositories
+        }
+
+        def as_set(rows):
+            return {
+                (repository.full_name, frozenset(files)) for repository, files in rows
+            }
+
+        self.assertEqual(as_set(graphql_rows), expected)
+        self.assertEqual(as_set(rest_rows), expected)
+        self.assertGreater(client.metrics.to_dict()["totals"]["graphql_cost"], 0)
+
+    def test_incremental_inspection_of_an_unchanged_fleet_is_cheaper(self):
+        fleet = SyntheticFleet(repositories_per_owner=300, workflows_per_repository=4)
+        owners = list(fleet.owners)
+
+        def run(server, state):
+            client = generate_workflow_status.GitHubClient(
+                None,
+                api_base=server.base_url,
+                scheduler=generate_workflow_status.RetryScheduler(
+                    requests_per_second=0
+                ),
+            )
+            rows = list(
+                generate_workflow_status.iter_inspected_repositories(
+                    generate_workflow_status.iter_repositories(
+                        owners, client, max_concurrency=2
+                    ),
+                    client,
+                    answers_file=fleet.answers_file,
+                    chunk_size=30,
+                    max_chunk_size=100,
+                    max_concurrency=2,
+                    state=state,
+                )
+            )
+            client.close()
+            if state is not None:
+                state.save()
+            requests = client.metrics.to_dict()["endpoints"]["POST /graphql"]
+            return {repository.full_name for repository, _files in rows}, requests[
+                "requests"
+            ]
+
+        with (
+            StubGitHubServer(
+                rest_handler=fleet.rest_handler,
+                graphql_handler=fleet.graphql_handler,
+            ) as server,
+            tempfile.TemporaryDirectory() as temp_dir,
+            patch("sys.stderr", io.StringIO()),
+        ):
+            state_path = Path(temp_dir) / "state.json"
+            full_rows, full_requests = run(server, None)
+            first_rows, first_requests = run(
+                server,
+                generate_workflow_status.InspectionState(
+                    state_path, fleet.answers_file
+                ),
+            )
+            unchanged_rows, unchanged_requests = run(
+                server,
+                generate_workflow_status.InspectionState(
+                    state_path, fleet.answers_file
+                ),
+            )
+
+        self.assertEqual(first_rows, full_rows)
+        self.assertEqual(unchanged_rows, full_rows)
+        self.assertGreater(first_requests, full_requests)
+        # With nothing changed, only the revision checks of 100 repositories
+        # each are sent.
+        listed = sum(
+            not repository.fork and not repository.archived
+            for repository in fleet.repositories["athackst"]
+        )
+        self.assertEqual(unchanged_requests, -(-listed // 100))
+        self.assertLess(unchanged_requests, full_requests)
+
+    def test_fetch_workflow_runs_renders_latest_runs_and_health(self):
+        fleet = SyntheticFleet(repositories_per_owner=40, workflows_per_repository=4)
+        managed_workflows = [f".github/workflows/{name}" for name in fleet.workflows]
+        run_requests = []
+
+        def rest_handler(path, params, headers):
+            if "/actions/" in path:
+                run_requests.append((path, params.get("branch")))
+            return fleet.rest_handler(path, params, headers)
+
+        with StubGitHubServer(
+            rest_handler=rest_handler,
+            graphql_handler=fleet.graphql_handler,
+        ) as server:
+            client = generate_workflow_status.GitHubClient(
+                None,
+                api_base=server.base_url,
+                scheduler=generate_workflow_status.RetryScheduler(
+                    requests_per_second=0
+                ),
+            )
+            matrix = generate_workflow_status.StatusMatrix.from_rows(
+                generate_workflow_status.iter_managed_repositories(
+                    ["athackst"],
+                    client,
+                    answers_file=fleet.answers_file,
+                    page_size=40,
+                    max_concurrency=1,
+                ),
+                managed_workflows,
+            )
+            generate_workflow_status.fetch_workflow_runs(
+                matrix, client, max_concurrency=4
+            )
+            client.close()
+
+        managed = fleet.managed_repositories
+        expected_runs = {
+            (f"{repository.owner}/{repository.name}", name): repository.run_kind(name)
+            for repository in managed
+            for name in repository.workflows
+            if repository.run_kind(name) < 7
+        }
+        actual_runs = {
+            (matrix.repositories[row].full_name, matrix.workflow_files[column]): run
+            for (row, column), run in matrix.runs.items()
+        }
+        self.assertEqual(actual_runs.keys(), expected_runs.keys())
+        for key, run in actual_runs.items():
+            self.assertEqual(run.failed, expected_runs[key] == 0)
+        fallbacks = sum(
+            repository.run_kind(name) >= 6
+            for repository in managed
+            for name in repository.workflows
+        )
+        self.assertEqual(len(run_requests), len(managed) + fallbacks)
+        self.assertTrue(all(branch == ["main"] for _path, branch in run_requests))
+
+        health = matrix.workflow_health()
+        self.assertEqual(
+            sum(entry["failures"] for entry in health),
+            sum(kind == 0 for kind in expected_runs.values()),
+        )
+        self.assertEqual(
+            sum(entry["completed"] for entry in health), len(expected_runs)
+        )
+
+        output = io.StringIO()
+        generate_workflow_status.render_markdown(matrix, output)
+        markdown = output.getvalue()
+        self.assertNotIn("badge.svg", markdown)
+        self.assertIn("latest default-branch run", markdown)
+        self.assertIn("## Workflow health", markdown)
+        self.assertIn('"failure, 30s, 2024-01-01T00:00:30Z"', markdown)
+
+        output = io.StringIO()
+        generate_workflow_status.render_json_index(matrix, output)
+        index = json.loads(output.getvalue())
+        self.assertIn("failure_rate", index["workflows"][0])
+        self.assertEqual(
+            sum(len(entry["runs"]) for entry in index["repositories"]),
+            len(expected_runs),
+        )
+
+    def test_write_if_changed_skips_outputs_differing_only_in_volatile_runs(self):
+        repository = generate_workflow_status.Repository("athackst", "example")
+
+        def matrix_with(conclusion, run_id, updated_at):
+            matrix = generate_workflow_status.StatusMatrix.from_rows(
+                [(repository, {"ci.yml"})],
+                [".github/workflows/ci.yml"],
+            )
+            matrix.runs[(0, 0)] = generate_workflow_status.WorkflowRun(
+                conclusion=conclusion,
+                status="completed",
+                started_at="2024-01-01T00:00:00Z",
+                updated_at=updated_at,
+                url=f"https://github.com/athackst/example/actions/runs/{run_id}",
+            )
+            matrix.has_runs = True
+            return matrix
+
+        renderer = generate_workflow_status.render_markdown
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "workflow_status.md"
+            digests = {}
+            first = matrix_with("success", 1, "2024-01-01T00:01:00Z")
+            self.assertTrue(
+                generate_workflow_status.write_if_changed(
+                    path, renderer, first, digests
+                )
+            )
+            written = path.read_text()
+            rerun = matrix_with("success", 2, "2024-01-02T00:03:00Z")
+            self.assertFalse(
+                generate_workflow_status.write_if_changed(
+                    path, renderer, rerun, digests
+                )
+            )
+            self.assertEqual(path.read_text(), written)
+            failed = matrix_with("failure", 3, "2024-01-03T00:01:00Z")
+            self.assertTrue(
+                generate_workflow_status.write_if_changed(
+                    path, renderer, failed, digests
+                )
+            )
+            self.assertIn("❌", path.read_text())
+
+            # Without stored digests, only a byte-identical file is skipped.
+            self.assertFalse(
+                generate_workflow_status.write_if_changed(path, renderer, failed)
+            )
+            self.assertEqual(list(Path(temp_dir).iterdir()), [path])
+            self.assertTrue(
+                generate_workflow_status.write_if_changed(path, renderer, rerun)
+            )
+
+    def test_drift_index_compares_blob_oids_in_both_discovery_modes(self):
+        paths = [".github/ci-config.yml", ".github/workflows/ci_update.yml"]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            (root / ".github" / "workflows").mkdir(parents=True)
+            (root / paths[0]).write_text("hello\n")
+            extra_oids = root / "oids.json"
+            extra_oids.write_text(json.dumps({paths[1]: ["1" * 40]}))
+            expected = generate_workflow_status.template_blob_oids(
+                paths,
+                root=root,
+                extra_oids_file=extra_oids,
+            )
+
+        self.assertEqual(
+            expected,
+            {
+                paths[0]: {"ce013625030ba8dba906f756967f9e9ca394464a"},
+                paths[1]: {"1" * 40},
+            },
+        )
+
+        fleet = SyntheticFleet(
+            repositories_per_owner=60,
+            workflows_per_repository=2,
+            template_oids={path: next(iter(oids)) for path, oids in expected.items()},
+        )
+        indexes = []
+        with StubGitHubServer(
+            rest_handler=fleet.rest_handler,
+            graphql_handler=fleet.graphql_handler,
+        ) as server:
+            client = generate_workflow_status.GitHubClient(
+                None,
+                api_base=server.base_url,
+                scheduler=generate_workflow_status.RetryScheduler(
+                    requests_per_second=0
+                ),
+            )
+            drift = generate_workflow_status.DriftIndex(paths, expected)
+            list(
+                generate_workflow_status.iter_managed_repositories(
+                    ["athackst"],
+                    client,
+                    answers_file=fleet.answers_file,
+                    page_size=25,
+                    drift=drift,
+                )
+            )
+            indexes.append(drift.to_dict())
+            drift = generate_workflow_status.DriftIndex(paths, expected)
+            list(
+                generate_workflow_status.iter_inspected_repositories(
+                    generate_workflow_status.iter_repositories(["athackst"], client),
+                    client,
+                    answers_file=fleet.answers_file,
+                    chunk_size=25,
+                    drift=drift,
+                )
+            )
+            indexes.append(drift.to_dict())
+            client.close()
+
+        outdated = {
+            f"{repository.owner}/{repository.name}": [
+                path
+                for path in paths
+                if repository.file_oid(path, "template") not in {None, "template"}
+            ]
+            for repository in fleet.managed_repositories
+        }
+        outdated = {name: files for name, files in outdated.items() if files}
+        self.assertEqual(indexes[0], indexes[1])
+        index = indexes[0]
+        self.assertEqual(index["inspected"], len(fleet.managed_repositories))
+        self.assertEqual(
+            {name: entry["outdated"] for name, entry in index["repositories"].items()},
+            outdated,
+        )
+        self.assertEqual(
+            index["up_to_date"], len(fleet.managed_repositories) - len(outdated)
+        )
+
+    def test_recorded_cassette_replays_discovery_offline(self):
+        fleet = SyntheticFleet(repositories_per_owner=50, workflows_per_repository=3)
+
+        def discover(client):
+            rows = generate_workflow_status.iter_managed_repositories(
+                ["athackst"],
+                client,
+                answers_file=fleet.answers_file,
+                page_size=20,
+                max_concurrency=1,
+            )
+            return sorted(
+                (repository.full_name, sorted(files)) for repository, files in rows
+            )
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cassette = Path(temp_dir) / "cassette.json"
+            with StubGitHubServer(
+                rest_handler=fleet.rest_handler,
+                graphql_handler=fleet.graphql_handler,
+            ) as server:
+                transport = generate_workflow_status.RecordingTransport(
+                    generate_workflow_status.ConnectionPool(server.base_url),
+                    cassette,
+                )
+                client = generate_workflow_status.GitHubClient(
+                    "secret-token",
+                    api_base=server.base_url,
+                    transport=transport,
+                )
+                recorded = discover(client)
+                client.close()
+                recorded_requests = server.requests
+
+            self.assertNotIn("secret-token", cassette.read_text())
+            client = generate_workflow_status.GitHubClient(
+                None,
+                api_base="http://127.0.0.1:9",
+                transport=generate_workflow_status.ReplayTransport(cassette),
+            )
+            replayed = discover(client)
+            with self.assertRaisesRegex(RuntimeError, "No recorded response"):
+                client.get_json("/users/unknown")
+            client.close()
+
+        self.assertEqual(replayed, recorded)
+        self.assertEqual(len(recorded), len(fleet.managed_repositories))
+        self.assertEqual(
+            client.metrics.to_dict()["totals"]["requests"],
+            recorded_requests,
+        )
+
     def test_render_status_shows_badges_and_missing_workflows(self):
         repositories = [
             generate_workflow_status.Repository("athackst", "example")
@@ -217,8 +1219,122 @@ class GenerateWorkflowStatusTests(unittest.TestCase):
         )
         self.assertIn(" | - |", output)
 
-    def test_main_generates_output_without_intermediate_repository_file(self):
-        repository = generate_workflow_status.Repository("athackst", "example")
+    def test_write_status_streams_rows_into_sorted_page(self):
+        rows = [
+            (generate_workflow_status.Repository("athackst", "zeta"), set()),
+            (
+                generate_workflow_status.Repository("PrimerPages", "site"),
+                {"ci_update.yml"},
+            ),
+            (generate_workflow_status.Repository("athackst", "Alpha"), set()),
+        ]
+        managed_workflows = [".github/workflows/ci_update.yml"]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = Path(temp_dir) / "workflow_status.md"
+            count = generate_workflow_status.write_status(
+                output_path,
+                iter(rows),
+                managed_workflows,
+            )
+            output = output_path.read_text()
+
+        ordered = sorted(rows, key=lambda row: row[0].full_name.lower())
+        self.assertEqual(count, 3)
+        self.assertEqual(
+            output,
+            generate_workflow_status.render_status(
+                [repository for repository, _workflows in ordered],
+                {repository.full_name: workflows for repository, workflows in ordered},
+                managed_workflows,
+            ),
+        )
+
+    def test_status_matrix_renders_json_csv_and_html_from_one_bitset(self):
+        managed_workflows = [
+            ".github/workflows/ci_update.yml",
+            ".github/workflows/site.yml",
+        ]
+        matrix = generate_workflow_status.StatusMatrix.from_rows(
+            [
+                (
+                    generate_workflow_status.Repository("athackst", "zeta"),
+                    {"ci_update.yml", "site.yml", "unmanaged.yml"},
+                ),
+                (
+                    generate_workflow_status.Repository("althack", "<alpha>"),
+                    {"site.yml"},
+                ),
+            ],
+            managed_workflows,
+        )
+
+        self.assertEqual(
+            [repository.full_name for repository in matrix.repositories],
+            ["althack/<alpha>", "athackst/zeta"],
+        )
+        self.assertEqual(matrix.masks, [0b10, 0b11])
+        self.assertEqual(matrix.column_counts(), [1, 2])
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            outputs = {}
+            for name, renderer in generate_workflow_status.RENDERERS.items():
+                path = temp_path / f"status.{name}"
+                generate_workflow_status.write_rendered(path, renderer, matrix)
+                outputs[name] = path.read_text()
+
+        index = json.loads(outputs["json"])
+        self.assertEqual(
+            index["workflows"][1],
+            {
+                "name": "site",
+                "file": "site.yml",
+                "path": ".github/workflows/site.yml",
+                "repositories": 2,
+            },
+        )
+        self.assertEqual(index["repositories"][0]["mask"], 2)
+        self.assertEqual(
+            index["repositories"][1]["workflows"],
+            ["ci_update.yml", "site.yml"],
+        )
+        self.assertEqual(
+            outputs["csv"],
+            "repository,ci_update,site\nalthack/<alpha>,0,1\nathackst/zeta,1,1\n",
+        )
+        self.assertIn('loading="lazy"', outputs["html"])
+        self.assertIn("althack/&lt;alpha&gt;", outputs["html"])
+        self.assertNotIn("<alpha>", outputs["html"])
+        self.assertIn('data-mask="3" data-complete="3"', outputs["html"])
+        self.assertIn('<option value="1">site</option>', outputs["html"])
+        self.assertEqual(
+            outputs["markdown"],
+            generate_workflow_status.render_status(
+                matrix.repositories,
+                {
+                    repository.full_name: matrix.files(mask)
+                    for repository, mask in matrix
+                },
+                managed_workflows,
+            ),
+        )
+
+    def test_main_rest_discovery_feeds_inspection_batches(self):
+        repositories = [
+            generate_workflow_status.Repository("athackst", f"repo-{index}")
+            for index in range(3)
+        ]
+        client = FakeClient(
+            graphql_responses=[
+                {
+                    "repo_0": {
+                        "answers": {"__typename": "Blob"},
+                        "workflows": None,
+                    }
+                },
+                {},
+            ]
+        )
         with tempfile.TemporaryDirectory() as temp_dir:
             temp_path = Path(temp_dir)
             managed_paths = temp_path / "copier_update_paths.txt"
@@ -229,28 +1345,118 @@ class GenerateWorkflowStatusTests(unittest.TestCase):
                 answers_file=".copier-answers.ci.yml",
                 managed_paths_file=managed_paths,
                 output_path=output_path,
-                chunk_size=30,
+                json_path=None,
+                csv_path=None,
+                html_path=None,
+                run_status=False,
+                drift_path=None,
+                template_oids_file=None,
+                digest_path=None,
+                chunk_size=2,
+                max_chunk_size=2,
+                max_concurrency=1,
+                request_timeout=30.0,
+                max_wait=600.0,
+                requests_per_second=10.0,
+                metrics_path=None,
+                metrics_summary_path=None,
+                api_base=generate_workflow_status.API_BASE,
+                record_path=None,
+                replay_path=None,
+                cache_dir=None,
+                cache_max_bytes=1024,
+                state_file=None,
+                discovery="rest",
             )
 
             with (
                 patch.object(generate_workflow_status, "parse_args", return_value=args),
                 patch.object(
                     generate_workflow_status,
-                    "discover_repositories",
-                    return_value=[repository],
+                    "GitHubClient",
+                    return_value=client,
                 ),
                 patch.object(
                     generate_workflow_status,
-                    "inspect_managed_repositories",
-                    return_value=([repository], {"athackst/example": {"ci_update.yml"}}),
+                    "iter_repositories",
+                    return_value=iter(repositories),
                 ),
-                patch.dict("os.environ", {"GITHUB_TOKEN": "token"}, clear=True),
+                patch.dict("os.environ", {}, clear=True),
             ):
                 status = generate_workflow_status.main()
 
             output = output_path.read_text()
 
         self.assertEqual(status, 0)
+        self.assertEqual(len(client.graphql_queries), 2)
+        self.assertIn("- Repositories shown: 1", output)
+        self.assertIn("athackst/repo-0", output)
+
+    def test_main_generates_output_without_intermediate_repository_file(self):
+        repository = generate_workflow_status.Repository("athackst", "example")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            managed_paths = temp_path / "copier_update_paths.txt"
+            output_path = temp_path / "workflow_status.md"
+            managed_paths.write_text(".github/workflows/ci_update.yml\n")
+            args = SimpleNamespace(
+                owner=["athackst"],
+                answers_file=".copier-answers.ci.yml",
+                managed_paths_file=managed_paths,
+                output_path=output_path,
+                json_path=None,
+                csv_path=None,
+                html_path=None,
+                run_status=False,
+                drift_path=None,
+                template_oids_file=None,
+                digest_path=temp_path / "digests.json",
+                chunk_size=30,
+                max_chunk_size=100,
+                max_concurrency=4,
+                request_timeout=30.0,
+                max_wait=600.0,
+                requests_per_second=10.0,
+                metrics_path=None,
+                metrics_summary_path=None,
+                api_base=generate_workflow_status.API_BASE,
+                record_path=None,
+                replay_path=None,
+                cache_dir=None,
+                cache_max_bytes=1024,
+                state_file=None,
+                discovery="graphql",
+            )
+
+            digest_path = temp_path / "digests.json"
+            results = []
+            for run in range(3):
+                if run == 2:
+                    # Digests of unchanged outputs are still saved.
+                    digest_path.unlink()
+                stdout = io.StringIO()
+                with (
+                    patch.object(
+                        generate_workflow_status, "parse_args", return_value=args
+                    ),
+                    patch.object(
+                        generate_workflow_status,
+                        "iter_managed_repositories",
+                        return_value=iter([(repository, {"ci_update.yml"})]),
+                    ),
+                    patch.dict("os.environ", {"GITHUB_TOKEN": "token"}, clear=True),
+                    patch("sys.stdout", stdout),
+                ):
+                    results.append((generate_workflow_status.main(), stdout.getvalue()))
+
+            output = output_path.read_text()
+            digests = json.loads(digest_path.read_text())
+
+        self.assertEqual(
+            results,
+            [(0, "changed=true\n"), (0, "changed=false\n"), (0, "changed=false\n")],
+        )
+        self.assertEqual(list(digests), [output_path.as_posix()])
         self.assertIn("athackst/example", output)
         self.assertIn("ci_update.yml/badge.svg", output)
 
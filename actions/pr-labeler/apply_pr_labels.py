@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+import argparse
+from contextlib import closing
+import json
+import os
+from pathlib import Path
+import subprocess
+import urllib.request
+from urllib.error import HTTPError, URLError
+
+from label_matcher import LabelMatcher
+
+API_BASE = "https://api.github.com"
+FILES_PAGE_SIZE = 100
+GIT_READ_SIZE = 64 * 1024
+
+
+class GitHubApiError(RuntimeError):
+    pass
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Label a pull request from a flattened labeler config."
+    )
+    parser.add_argument(
+        "--config-path",
+        required=True,
+        help="Path to the flattened label config YAML.",
+    )
+    parser.add_argument("--repo", required=True, help="Repository in owner/repo form.")
+    parser.add_argument("--pr-number", type=int, required=True)
+    parser.add_argument("--github-token", required=True)
+    parser.add_argument(
+        "--files-source",
+        choices=("api", "git"),
+        default="api",
+        help=(
+            "api pages through /pulls/{number}/files; git streams "
+            "`git diff --name-only -z` from a local checkout."
+        ),
+    )
+    parser.add_argument(
+        "--git-base",
+        help="Base revision for --files-source git, for example origin/main.",
+    )
+    parser.add_argument(
+        "--git-head",
+        default="HEAD",
+        help="Head revision for --files-source git.",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Report matching labels without adding them to the pull request.",
+    )
+    args = parser.parse_args()
+    if args.files_source == "git" and not args.git_base:
+        parser.error("--git-base is required with --files-source git")
+    return args
+
+
+def api(method, url, token, payload=None):
+    data = None
+    if payload is not None:
+        data = json.dumps(payload).encode("utf-8")
+    req = urllib.request.Request(
+        url,
+        data=data,
+        method=method,
+        headers={
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/vnd.github+json",
+            "User-Agent": "ci-pr-labeler",
+            "Content-Type": "application/json",
+        },
+    )
+    try:
+        with urllib.request.urlopen(req) as resp:
+            return json.loads(resp.read().decode("utf-8"))
+    except HTTPError as err:
+        body = err.read().decode("utf-8", errors="replace")
+        raise GitHubApiError(f"GitHub API error {err.code} for {method} {url}: {body}")
+    except URLError as err:
+        raise GitHubApiError(f"GitHub API request failed for {method} {url}: {err}")
+
+
+def iter_pull_request_files(repo, number, token):
+    page = 1
+    while True:
+        files = api(
+            "GET",
+            f"{API_BASE}/repos/{repo}/pulls/{number}/files"
+            f"?per_page={FILES_PAGE_SIZE}&page={page}",
+            token,
+        )
+        for changed in files:
+            yield changed["filename"]
+        if len(files) < FILES_PAGE_SIZE:
+            return
+        page += 1
+
+
+def iter_git_diff_files(base, head="HEAD", cwd=None):
+    """Stream the files changed between the merge base of base and head.
+
+    Names are read in chunks as git writes them; closing the generator early
+    stops git.
+    """
+    process = subprocess.Popen(
+        ["git", "diff", "--name-only", "-z", f"{base}...{head}"],
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+    )
+    try:
+        pending = b""
+        while True:
+            chunk = process.stdout.read1(GIT_READ_SIZE)
+            if not chunk:
+                break
+            *names, pending = (pending + chunk).split(b"\0")
+            for name in names:
+                yield os.fsdecode(name)
+        if pending:
+            yield os.fsdecode(pending)
+        if process.wait() != 0:
+            raise SystemExit(f"git diff failed for {base}...{head}")
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+
+
+def load_config(config_path):
+    import yaml
+
+    labels = yaml.safe_load(Path(config_path).read_text(encoding="utf-8")) or {}
+    if not isinstance(labels, dict):
+        raise SystemExit(f"Label configuration must be a mapping: {config_path}")
+    return labels
+
+
+def main() -> int:
+    args = parse_args()
+    matcher = LabelMatcher(load_config(args.config_path))
+
+    try:
+        pull_request = api(
+            "GET",
+            f"{API_BASE}/repos/{args.repo}/pulls/{args.pr_number}",
+            args.github_token,
+        )
+        if args.files_source == "git":
+            files = iter_git_diff_files(args.git_base, args.git_head)
+        else:
+            files = iter_pull_request_files(
+                args.repo, args.pr_number, args.github_token
+            )
+        evaluation = matcher.evaluation(
+            head_branch=pull_request["head"]["ref"],
+            base_branch=pull_request["base"]["ref"],
+        )
+        with closing(files):
+            evaluation.consume(files)
+        matched = evaluation.labels()
+        current = {label["name"] for label in pull_request.get("labels", [])}
+        new_labels = [label for label in matched if label not in current]
+        if new_labels and not args.dry_run:
+            api(
+                "POST",
+                f"{API_BASE}/repos/{args.repo}/issues/{args.pr_number}/labels",
+                args.github_token,
+                payload={"labels": new_labels},
+            )
+    except GitHubApiError as err:
+        raise SystemExit(str(err))
+
+    print(f"new-labels={','.join(new_labels)}")
+    print(f"all-labels={','.join(sorted(current | set(new_labels)))}")
+    print(f"files-evaluated={evaluation.files}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
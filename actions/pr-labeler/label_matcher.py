@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+"""Evaluate actions/labeler v5 style label configurations in Python.
+
+Every glob in the configuration is compiled once into a shared index. Each
+changed file is then matched against only the globs that could apply to it,
+bucketed by leading directory and extension. The per-glob match counts and
+per-group results gathered in that single pass answer all four
+changed-files matchers for every label, so labeling is linear in the
+number of changed files.
+
+Evaluation is incremental: after each file every undecided label is checked
+with three-valued logic, and reading stops once every label is decided.
+"""
+
+import re
+
+
+GLOB_MATCHERS = (
+    "any-glob-to-any-file",
+    "any-glob-to-all-files",
+    "all-globs-to-any-file",
+    "all-globs-to-all-files",
+)
+BRANCH_KEYS = ("head-branch", "base-branch")
+MATCH_KEYS = ("changed-files",) + BRANCH_KEYS
+GLOB_MAGIC = set("*?[{")
+
+
+def as_list(value):
+    return [value] if isinstance(value, str) else list(value)
+
+
+def expand_braces(pattern):
+    """Expand ``{a,b}`` alternatives the way minimatch does before matching."""
+    depth = 0
+    start = None
+    for index, char in enumerate(pattern):
+        if char == "\\":
+            continue
+        if char == "{":
+            if depth == 0:
+                start = index
+            depth += 1
+        elif char == "}" and depth:
+            depth -= 1
+            if depth == 0:
+                options = split_brace_options(pattern[start + 1 : index])
+                if len(options) < 2:
+                    continue
+                prefix, suffix = pattern[:start], pattern[index + 1 :]
+                return [
+                    expanded
+                    for option in options
+                    for expanded in expand_braces(prefix + option + suffix)
+                ]
+    return [pattern]
+
+
+def split_brace_options(body):
+    options = []
+    depth = 0
+    current = []
+    for char in body:
+        if char == "," and depth == 0:
+            options.append("".join(current))
+            current = []
+            continue
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+        current.append(char)
+    options.append("".join(current))
+    return options
+
+
+def glob_to_regex(pattern):
+    """Translate a brace-free glob to a regex; dot files match, as with ``dot``."""
+    segments = pattern.split("/")
+    parts = []
+    after_globstar = False
+    for index, segment in enumerate(segments):
+        if segment == "**":
+            if index == len(segments) - 1:
+                # "a/**" also matches "a" itself.
+                parts.append("(?:/.*)?" if index else ".*")
+            else:
+                # The globstar brings its own trailing separator.
+                parts.append("/(?:.*/)?" if index else "(?:.*/)?")
+            after_globstar = True
+            continue
+        if index and not after_globstar:
+            parts.append("/")
+        parts.append(segment_to_regex(segment))
+        after_globstar = False
+    return "".join(parts)
+
+
+def segment_to_regex(segment):
+    out = []
+    index = 0
+    while index < len(segment):
+        char = segment[index]
+        if char == "*":
+            while index + 1 < len(segment) and segment[index + 1] == "*":
+                index += 1
+            out.append("[^/]*")
+        elif char == "?":
+            out.append("[^/]")
+        elif char == "[":
+            end = segment.find("]", index + 2)
+            if end == -1:
+                out.append(re.escape(char))
+            else:
+                body = segment[index + 1 : end]
+                if body[:1] in ("!", "^"):
+                    body = "^" + body[1:]
+                out.append(f"[{body.replace(chr(92), chr(92) * 2)}]")
+                index = end
+        elif char == "\\" and index + 1 < len(segment):
+            index += 1
+            out.append(re.escape(segment[index]))
+        else:
+            out.append(re.escape(char))
+        index += 1
+    return "".join(out)
+
+
+def has_magic(text):
+    return any(char in GLOB_MAGIC for char in text)
+
+
+def bucket_key(pattern):
+    """Return where the index files a glob: by first segment, extension or always."""
+    segments = pattern.split("/")
+    if len(segments) > 1 and not has_magic(segments[0]):
+        return "prefix", segments[0]
+    last = segments[-1]
+    rest = last[1:]
+    if last.startswith("*") and "." in rest and not has_magic(rest):
+        return "ext", rest[rest.rindex(".") :]
+    return "always", None
+
+
+def file_ext(path):
+    name = path.rsplit("/", 1)[-1]
+    return name[name.rindex(".") :] if "." in name else None
+
+
+class GlobIndex:
+    """Compiled globs, bucketed so each file is tested only against candidates."""
+
+    def __init__(self):
+        self.globs = []
+        self.negated = []
+        self._ids = {}
+        self._regexes = []
+        self._prefix = {}
+        self._ext = {}
+        self._always = []
+
+    def add(self, pattern):
+        """Register a glob and return its id. Negated globs keep the positive form."""
+        if pattern in self._ids:
+            return self._ids[pattern]
+        negated = False
+        body = pattern
+        while body.startswith("!"):
+            negated = not negated
+            body = body[1:]
+        glob_id = len(self.globs)
+        self._ids[pattern] = glob_id
+        self.globs.append(pattern)
+        self.negated.append(negated)
+        alternatives = expand_braces(body)
+        self._regexes.append(
+            re.compile(
+                "|".join(f"(?:{glob_to_regex(option)})" for option in alternatives)
+            )
+        )
+        keys = {bucket_key(option) for option in alternatives}
+        if len(keys) != 1 or ("always", None) in keys:
+            self._always.append(glob_id)
+        else:
+            kind, key = keys.pop()
+            bucket = self._prefix if kind == "prefix" else self._ext
+            bucket.setdefault(key, []).append(glob_id)
+        return glob_id
+
+    def candidates(self, path):
+        """Return the ids of globs that could match ``path``."""
+        candidates = list(self._always)
+        candidates.extend(self._prefix.get(path.split("/", 1)[0], ()))
+        ext = file_ext(path)
+        if ext is not None:
+            candidates.extend(self._ext.get(ext, ()))
+        return candidates
+
+    def test(self, glob_id, path):
+        """Whether the positive form of one glob matches ``path``."""
+        return self._regexes[glob_id].fullmatch(path) is not None
+
+    def matches(self, path):
+        """Return the ids of globs whose positive form matches ``path``."""
+        return {
+            glob_id
+            for glob_id in self.candidates(path)
+            if self._regexes[glob_id].fullmatch(path)
+        }
+
+
+class LabelMatcher:
+    """A label configuration compiled into glob ids and condition trees.
+
+    Conditions follow actions/labeler v5:
+    - Top-level entries of a label are ANDed.
+    - A bare match key is added to the first ``any`` entry that precedes it,
+      or starts a new ``any`` entry if there is none.
+    - Items inside ``any`` are ORed; items inside ``all`` are ANDed.
+    - Keys such as ``description``, ``color`` and ``aliases`` are ignored.
+    A label without any match condition is never applied.
+    """
+
+    def __init__(self, config):
+        self.index = GlobIndex()
+        self.groups = []
+        self.file_groups = []
+        self.labels = {}
+        for label, rules in config.items():
+            tree = self.compile_label(rules or [])
+            if tree is not None:
+                self.labels[label] = tree
+
+    def compile_label(self, rules):
+        # As in labeler, where a bare key lands depends on the entry order.
+        groups = []
+        for rule in rules:
+            if not isinstance(rule, dict):
+                continue
+            for key, value in rule.items():
+                if key in ("any", "all"):
+                    groups.append((key, list(value or [])))
+                elif key in MATCH_KEYS:
+                    first_any = next(
+                        (items for mode, items in groups if mode == "any"), None
+                    )
+                    if first_any is None:
+                        groups.append(("any", [{key: value}]))
+                    else:
+                        first_any.append({key: value})
+        entries = [self.compile_group(mode, items) for mode, items in groups]
+        entries = [entry for entry in entries if entry is not None]
+        return ("and", entries) if entries else None
+
+    def compile_group(self, mode, items):
+        children = []
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            keys = []
+            for key, value in item.items():
+                if key in ("any", "all"):
+                    node = self.compile_group(key, value)
+                elif key == "changed-files":
+                    node = self.compile_changed_files(mode, value)
+                elif key in BRANCH_KEYS:
+                    node = (
+                        "branch",
+                        key,
+                        mode,
+                        [re.compile(regex) for regex in as_list(value)],
+                    )
+                else:
+                    continue
+                if node is not None:
+                    keys.append(node)
+            if keys:
+                children.append(("or" if mode == "any" else "and", keys))
+        if not children:
+            return None
+        return ("or" if mode == "any" else "and", children)
+
+    def compile_changed_files(self, mode, matchers):
+        children = []
+        for matcher in matchers:
+            keys = []
+            for kind in GLOB_MATCHERS:
+                if kind not in matcher:
+                    continue
+                glob_ids = tuple(
+                    self.index.add(glob) for glob in as_list(matcher[kind])
+                )
+                group = None
+                if kind == "all-globs-to-any-file":
+                    group = len(self.groups)
+                    self.groups.append(glob_ids)
+                elif kind == "any-glob-to-all-files":
+                    group = len(self.file_groups)
+                    self.file_groups.append(glob_ids)
+                keys.append(("files", kind, glob_ids, group))
+            if keys:
+                children.append(("or" if mode == "any" else "and", keys))
+        if not children:
+            return None
+        if mode == "all":
+            # labeler's checkAll fails changed-files when no files changed.
+            return ("and", [("has-files",)] + children)
+        return ("or", children)
+
+    def evaluate(self, files, head_branch=None, base_branch=None):
+        """Return the sorted labels whose conditions hold for a pull request.
+
+        ``files`` may be any iterable; it is not read further once every label
+        is decided.
+        """
+        evaluation = self.evaluation(head_branch=head_branch, base_branch=base_branch)
+        evaluation.consume(files)
+        return evaluation.labels()
+
+    def evaluation(self, head_branch=None, base_branch=None):
+        return LabelEvaluation(self, head_branch, base_branch)
+
+    def label_globs(self, label):
+        """Return the ids of every glob a label's conditions refer to."""
+        glob_ids = set()
+        nodes = [self.labels[label]]
+        while nodes:
+            node = nodes.pop()
+            if node[0] in ("and", "or"):
+                nodes.extend(node[1])
+            elif node[0] == "files":
+                glob_ids.update(node[2])
+        return glob_ids
+
+
+class LabelEvaluation:
+    """Per-glob match counts for one pull request, fed one file at a time."""
+
+    def __init__(self, matcher, head_branch, base_branch):
+        self.matcher = matcher
+        self.branches = {"head-branch": head_branch, "base-branch": base_branch}
+        self.files = 0
+        self.pending = dict(matcher.labels)
+        self.decided = {}
+        self.counts = [0] * len(matcher.index.globs)
+        self.groups_matched = [False] * len(matcher.groups)
+        self._groups_by_glob = {}
+        self._negated_groups = []
+        for group, glob_ids in enumerate(matcher.groups):
+            positive = [
+                glob_id for glob_id in glob_ids if not matcher.index.negated[glob_id]
+            ]
+            if positive:
+                self._groups_by_glob.setdefault(positive[0], []).append(group)
+            else:
+                self._negated_groups.append(group)
+        self.file_groups_missed = [False] * len(matcher.file_groups)
+
+    def add(self, path):
+        self.add_matches(self.matcher.index.matches(path))
+
+    def add_matches(self, matched):
+        """Record one file given the ids of the globs it matched."""
+        index = self.matcher.index
+        self.files += 1
+        for glob_id in matched:
+            self.counts[glob_id] += 1
+
+        groups = list(self._negated_groups)
+        for glob_id in matched:
+            groups.extend(self._groups_by_glob.get(glob_id, ()))
+        for group in groups:
+            if self.groups_matched[group]:
+                continue
+            self.groups_matched[group] = all(
+                (glob_id in matched) != index.negated[glob_id]
+                for glob_id in self.matcher.groups[group]
+            )
+
+        for group, glob_ids in enumerate(self.matcher.file_groups):
+            if self.file_groups_missed[group]:
+                continue
+            self.file_groups_missed[group] = not any(
+                (glob_id in matched) != index.negated[glob_id] for glob_id in glob_ids
+            )
+
+    def glob_any(self, glob_id):
+        """Whether the glob matches at least one file."""
+        if self.matcher.index.negated[glob_id]:
+            return self.counts[glob_id] < self.files
+        return self.counts[glob_id] > 0
+
+    def glob_all(self, glob_id):
+        """Whether the glob matches every file (vacuously true with no files)."""
+        if self.matcher.index.negated[glob_id]:
+            return self.counts[glob_id] == 0
+        return self.counts[glob_id] == self.files
+
+    @property
+    def done(self):
+        return not self.pending
+
+    def consume(self, files):
+        """Add files until they run out or every label is decided."""
+        self.update()
+        if self.done:
+            return
+        for path in files:
+            self.add(path)
+            self.update()
+            if self.done:
+                break
+
+    def update(self):
+        """Move labels whose outcome no further file can change to ``decided``."""
+        for label, tree in list(self.pending.items()):
+            outcome = self.state(tree)
+            if outcome is not None:
+                self.decided[label] = outcome
+                del self.pending[label]
+
+    def state(self, node):
+        """Three-valued check of a condition against the files seen so far.
+
+        Returns None while later files could still change the outcome.
+        """
+        kind = node[0]
+        if kind in ("and", "or"):
+            states = [self.state(child) for child in node[1]]
+            settled = kind == "or"
+            if settled in states:
+                return settled
+            return None if None in states else not settled
+        if kind == "branch":
+            return self.check(node)
+        if kind == "has-files":
+            return True if self.files else None
+        _kind, matcher, glob_ids, group = node
+        if matcher == "any-glob-to-any-file":
+            return True if any(self.glob_any(g) for g in glob_ids) else None
+        if matcher == "all-globs-to-any-file":
+            return True if self.groups_matched[group] else None
+        # One file outside the globs rules out "all files" for good.
+        if matcher == "any-glob-to-all-files":
+            return False if self.file_groups_missed[group] else None
+        violated = [not self.glob_all(glob_id) for glob_id in glob_ids]
+        return False if any(violated) else None
+
+    def check(self, node):
+        kind = node[0]
+        if kind == "and":
+            return all(self.check(child) for child in node[1])
+        if kind == "or":
+            return any(self.check(child) for child in node[1])
+        if kind == "branch":
+            _kind, key, mode, regexes = node
+            branch = self.branches[key]
+            if not branch:
+                return False
+            found = (regex.search(branch) is not None for regex in regexes)
+            return any(found) if mode == "any" else all(found)
+        if kind == "has-files":
+            return self.files > 0
+        _kind, matcher, glob_ids, group = node
+        if matcher == "any-glob-to-any-file":
+            return any(self.glob_any(glob_id) for glob_id in glob_ids)
+        if matcher == "any-glob-to-all-files":
+            return not self.file_groups_missed[group]
+        if matcher == "all-globs-to-all-files":
+            return all(self.glob_all(glob_id) for glob_id in glob_ids)
+        return self.groups_matched[group]
+
+    def labels(self):
+        """Final labels, treating the files seen so far as the complete list."""
+        return sorted(
+            label
+            for label, tree in self.matcher.labels.items()
+            if self.decided.get(label, False) or (
+                label in self.pending and self.check(tree)
+            )
+        )
@@ -1,10 +1,17 @@
 #!/usr/bin/env python3
 import argparse
+import hashlib
 import json
+import os
 from pathlib import Path
+import shutil
 
-import yaml
-from jsonschema import ValidationError, validate
+# yaml and jsonschema are imported where they are used, so a cache hit needs
+# neither of them installed.
+
+SCHEMA_PATH = Path(__file__).with_name("labeler.schema.json")
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
 
 
 def parse_args():
@@ -19,42 +26,177 @@ def parse_args():
 
     parser.add_argument(
         "--output-path",
-        required=True,
         help="Path to write flattened label config YAML.",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--cache-dir",
+        help=(
+            "Directory of flattened configs keyed by the SHA-256 of the config, "
+            "schema and this script. A hit skips parsing and validation."
+        ),
+    )
+    parser.add_argument(
+        "--print-digest",
+        action="store_true",
+        help="Print the cache digest for the config as digest=<sha256> and exit.",
+    )
+    parser.add_argument(
+        "--validator-cache-dir",
+        help=(
+            "Directory recording schema digests that already passed meta-schema "
+            "checks, so later runs can skip them."
+        ),
+    )
+    args = parser.parse_args()
+    if not args.print_digest and not args.output_path:
+        parser.error("--output-path is required")
+    return args
 
 
-def load_schema():
-    schema_path = Path(__file__).with_name("labeler.schema.json")
-    return json.loads(schema_path.read_text(encoding="utf-8"))
+def schema_digest(schema_text):
+    return hashlib.sha256(schema_text.encode("utf-8")).hexdigest()
 
 
-def main() -> int:
-    args = parse_args()
+def build_validator(digest, schema_text, cache_dir=None):
+    """Build the validator for a schema.
+
+    Checking the schema against its meta-schema dominates validator setup, so
+    a passing check is stamped in ``cache_dir`` by schema digest and skipped
+    on later runs.
+    """
+    from jsonschema.validators import validator_for
+
+    schema = json.loads(schema_text)
+    validator_class = validator_for(schema)
+    stamp = Path(cache_dir) / f"{digest}.checked" if cache_dir else None
+    if stamp is None or not stamp.exists():
+        validator_class.check_schema(schema)
+        if stamp is not None:
+            stamp.parent.mkdir(parents=True, exist_ok=True)
+            stamp.touch()
+    return validator_class(schema)
+
+
+def load_validator(schema_path=SCHEMA_PATH, cache_dir=None):
+    schema_text = Path(schema_path).read_text(encoding="utf-8")
+    return build_validator(
+        schema_digest(schema_text),
+        schema_text,
+        str(cache_dir) if cache_dir else None,
+    )
 
-    config_path = Path(args.config_path)
-    if not config_path.exists():
-        raise SystemExit(f"Config not found: {config_path}")
 
-    data = yaml.safe_load(config_path.read_text(encoding="utf-8")) or {}
+def validation_errors(labels, validator):
+    """Return every schema violation as a ``location: message`` string."""
+    errors = sorted(
+        validator.iter_errors(labels),
+        key=lambda err: [str(part) for part in err.absolute_path],
+    )
+    return [
+        f"{'.'.join(str(p) for p in err.absolute_path) or '<root>'}: {err.message}"
+        for err in errors
+    ]
+
+
+def load_labels(config_path, validator_cache_dir=None):
+    """Return the validated, flattened labels of a labeler or combined CI config."""
+    import yaml
+
+    data = yaml.safe_load(Path(config_path).read_text(encoding="utf-8")) or {}
     labels = data.get("labels")
     if not isinstance(labels, dict):
         labels = data
 
-    try:
-        validate(instance=labels, schema=load_schema())
-    except ValidationError as err:
-        location = ".".join(str(p) for p in err.absolute_path) or "<root>"
+    errors = validation_errors(labels, load_validator(cache_dir=validator_cache_dir))
+    if errors:
         raise SystemExit(
-            f"Labeler config schema validation failed at {location}: {err.message}"
+            "Labeler config schema validation failed:\n"
+            + "\n".join(f"  {error}" for error in errors)
         )
+    return labels
+
+
+def config_digest(config_path, schema_path=SCHEMA_PATH):
+    """Content address of a flattened config: its inputs and this script."""
+    digest = hashlib.sha256()
+    for path in (config_path, schema_path, Path(__file__)):
+        content = Path(path).read_bytes()
+        digest.update(f"{len(content)}:".encode("ascii"))
+        digest.update(content)
+    return digest.hexdigest()
+
+
+def load_manifest(cache_dir):
+    try:
+        manifest = json.loads((cache_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest.get("entries") or {}
+
+
+def cached_output(cache_dir, digest):
+    """Return the cached flattened config for a digest, if the manifest has it."""
+    entry = load_manifest(cache_dir).get(digest)
+    if not isinstance(entry, dict):
+        return None
+    path = cache_dir / entry.get("output", "")
+    return path if path.is_file() else None
+
+
+def store_output(cache_dir, digest, output_path):
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    cached_path = cache_dir / f"{digest}.yml"
+    shutil.copyfile(output_path, cached_path)
+    entries = load_manifest(cache_dir)
+    entries[digest] = {"output": cached_path.name}
+    temp_path = cache_dir / f"{MANIFEST_NAME}.tmp"
+    temp_path.write_text(
+        json.dumps(
+            {"version": MANIFEST_VERSION, "entries": entries},
+            indent=2,
+            sort_keys=True,
+        ),
+        encoding="utf-8",
+    )
+    os.replace(temp_path, cache_dir / MANIFEST_NAME)
+
+
+def main() -> int:
+    args = parse_args()
+
+    config_path = Path(args.config_path)
+    if not config_path.exists():
+        raise SystemExit(f"Config not found: {config_path}")
+
+    digest = None
+    cache_dir = Path(args.cache_dir) if args.cache_dir else None
+    if args.print_digest or cache_dir is not None:
+        digest = config_digest(config_path)
+    if args.print_digest:
+        print(f"digest={digest}")
+        return 0
 
     output_path = Path(args.output_path)
+    if cache_dir is not None:
+        cached_path = cached_output(cache_dir, digest)
+        if cached_path is not None:
+            shutil.copyfile(cached_path, output_path)
+            print("cache-hit=true")
+            print(f"config-path={output_path}")
+            return 0
+
+    import yaml
+
+    labels = load_labels(config_path, validator_cache_dir=args.validator_cache_dir)
     output_path.write_text(
         yaml.safe_dump(labels, sort_keys=False),
         encoding="utf-8",
     )
+    if cache_dir is not None:
+        store_output(cache_dir, digest, output_path)
+        print("cache-hit=false")
 
     print(f"config-path={output_path}")
     return 0
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""Replay git history through a labeler config to preview labels and timing.
+
+Each of the last N merges (or commits) of a local repository is labeled as if
+it were a pull request: the changed files are the diff against its first
+parent. For merges, the head branch is read from the merge subject. The
+report lists label assignments, per-label match time and the slowest globs.
+Commits are spread across worker processes.
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+import json
+import os
+from pathlib import Path
+import re
+import subprocess
+import time
+
+from apply_pr_labels import iter_git_diff_files
+from label_matcher import LabelMatcher
+from resolve_labeler_config import load_labels
+
+MERGE_SUBJECTS = (
+    re.compile(r"^Merge pull request #\d+ from [^/\s]+/(?P<branch>\S+)"),
+    re.compile(r"^Merge branch '(?P<branch>[^']+)'"),
+)
+CHUNK_SIZE = 16
+
+_matcher = None
+_options = None
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description=(
+            "Replay recent merges or commits through a labeler config and "
+            "report labels and match timing."
+        )
+    )
+    parser.add_argument(
+        "--config-path",
+        required=True,
+        help="Path to a labeler config or a combined CI config with a labels key.",
+    )
+    parser.add_argument(
+        "--repo-path", default=".", help="Local git repository to replay."
+    )
+    parser.add_argument(
+        "--count", type=int, default=100, help="Number of merges or commits."
+    )
+    parser.add_argument(
+        "--mode",
+        choices=("merges", "commits"),
+        default="merges",
+        help=(
+            "merges replays first-parent merge commits as pull requests; "
+            "commits replays every non-merge commit."
+        ),
+    )
+    parser.add_argument(
+        "--rev", default="HEAD", help="Revision whose history is replayed."
+    )
+    parser.add_argument(
+        "--base-branch",
+        help="Base branch for base-branch conditions. Defaults to the current branch.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes. 1 evaluates in this process.",
+    )
+    parser.add_argument(
+        "--top", type=int, default=10, help="Number of slowest globs to report."
+    )
+    parser.add_argument(
+        "--output-path", help="Also write per-commit results and timings as JSON."
+    )
+    parser.add_argument(
+        "--validator-cache-dir",
+        help="Directory for validator stamps, as in resolve_labeler_config.py.",
+    )
+    return parser.parse_args()
+
+
+def git(repo_path, *args):
+    result = subprocess.run(
+        ["git", *args],
+        cwd=repo_path,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"git {' '.join(args)} failed: {result.stderr.strip()}")
+    return result.stdout
+
+
+def head_branch_from_subject(subject):
+    for pattern in MERGE_SUBJECTS:
+        match = pattern.match(subject)
+        if match:
+            return match.group("branch")
+    return None
+
+
+def list_commits(repo_path, count, mode="merges", rev="HEAD"):
+    """Return the commits to replay, newest first. Root commits are skipped."""
+    selection = ["--merges", "--first-parent"] if mode == "merges" else ["--no-merges"]
+    output = git(
+        repo_path,
+        "log",
+        *selection,
+        f"--max-count={count}",
+        "--format=%H%x00%P%x00%s%x00",
+        rev,
+    )
+    fields = output.split("\0")
+    commits = []
+    for sha, parents, subject in zip(fields[0::3], fields[1::3], fields[2::3]):
+        sha = sha.strip()
+        parents = parents.split()
+        if not parents:
+            continue
+        commits.append(
+            {
+                "sha": sha,
+                "parent": parents[0],
+                "subject": subject,
+                "head_branch": (
+                    head_branch_from_subject(subject) if mode == "merges" else None
+                ),
+            }
+        )
+    return commits
+
+
+def init_worker(labels, repo_path, base_branch):
+    global _matcher, _options
+    _matcher = LabelMatcher(labels)
+    _options = (repo_path, base_branch)
+
+
+def simulate_commit(commit):
+    """Label one commit, timing each glob test along the way.
+
+    ``seconds`` covers matching only; time spent waiting on git is excluded.
+    """
+    repo_path, base_branch = _options
+    index = _matcher.index
+    glob_seconds = {}
+    started = time.perf_counter()
+    evaluation = _matcher.evaluation(
+        head_branch=commit["head_branch"], base_branch=base_branch
+    )
+    evaluation.update()
+    seconds = time.perf_counter() - started
+    files = iter_git_diff_files(commit["parent"], commit["sha"], cwd=repo_path)
+    with closing(files):
+        for path in () if evaluation.done else files:
+            started = time.perf_counter()
+            matched = set()
+            for glob_id in index.candidates(path):
+                tested = time.perf_counter()
+                if index.test(glob_id, path):
+                    matched.add(glob_id)
+                glob_seconds[glob_id] = (
+                    glob_seconds.get(glob_id, 0.0) + time.perf_counter() - tested
+                )
+            evaluation.add_matches(matched)
+            evaluation.update()
+            seconds += time.perf_counter() - started
+            if evaluation.done:
+                break
+    return {
+        **commit,
+        "labels": evaluation.labels(),
+        "files": evaluation.files,
+        "seconds": seconds,
+        "glob_seconds": glob_seconds,
+    }
+
+
+def simulate(labels, commits, repo_path=".", base_branch=None, jobs=1):
+    """Return the simulated result of each commit, in the order given."""
+    initargs = (labels, str(Path(repo_path).resolve()), base_branch)
+    if jobs <= 1 or len(commits) <= 1:
+        init_worker(*initargs)
+        return [simulate_commit(commit) for commit in commits]
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=init_worker, initargs=initargs
+    ) as executor:
+        return list(executor.map(simulate_commit, commits, chunksize=CHUNK_SIZE))
+
+
+def summarize(labels, results, top=10):
+    """Aggregate label counts, per-label match time and the slowest globs."""
+    matcher = LabelMatcher(labels)
+    glob_seconds = [0.0] * len(matcher.index.globs)
+    glob_files = [0] * len(matcher.index.globs)
+    label_counts = {label: 0 for label in matcher.labels}
+    for result in results:
+        for label in result["labels"]:
+            label_counts[label] += 1
+        for glob_id, seconds in result["glob_seconds"].items():
+            glob_seconds[glob_id] += seconds
+            glob_files[glob_id] += 1
+    label_seconds = {
+        label: sum(glob_seconds[glob_id] for glob_id in matcher.label_globs(label))
+        for label in matcher.labels
+    }
+    slowest = sorted(
+        range(len(glob_seconds)),
+        key=lambda glob_id: glob_seconds[glob_id],
+        reverse=True,
+    )[:top]
+    return {
+        "commits": len(results),
+        "files": sum(result["files"] for result in results),
+        "seconds": sum(result["seconds"] for result in results),
+        "labels": {
+            label: {"count": label_counts[label], "seconds": label_seconds[label]}
+            for label in matcher.labels
+        },
+        "slowest_globs": [
+            {
+                "glob": matcher.index.globs[glob_id],
+                "seconds": glob_seconds[glob_id],
+                "commits": glob_files[glob_id],
+            }
+            for glob_id in slowest
+            if glob_seconds[glob_id] > 0
+        ],
+    }
+
+
+def render_report(summary, results):
+    lines = [
+        "# Labeler simulation",
+        "",
+        f"- Commits: {summary['commits']}",
+        f"- Files evaluated: {summary['files']}",
+        f"- Matching time: {summary['seconds'] * 1000:.2f} ms",
+        "",
+        "## Labels",
+        "",
+        "| Label | Commits | Match time (ms) |",
+        "| --- | --- | --- |",
+    ]
+    ordered = sorted(
+        summary["labels"].items(), key=lambda item: (-item[1]["count"], item[0])
+    )
+    for label, stats in ordered:
+        lines.append(f"| {label} | {stats['count']} | {stats['seconds'] * 1000:.3f} |")
+    lines += [
+        "",
+        "## Slowest globs",
+        "",
+        "| Glob | Commits | Time (ms) |",
+        "| --- | --- | --- |",
+    ]
+    for entry in summary["slowest_globs"]:
+        lines.append(
+            f"| `{entry['glob']}` | {entry['commits']} | "
+            f"{entry['seconds'] * 1000:.3f} |"
+        )
+    lines += [
+        "",
+        "## Commits",
+        "",
+        "| Commit | Subject | Labels |",
+        "| --- | --- | --- |",
+    ]
+    for result in results:
+        subject = result["subject"].replace("|", "\\|")
+        lines.append(
+            f"| {result['sha'][:7]} | {subject} | {', '.join(result['labels'])} |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def main() -> int:
+    args = parse_args()
+    config_path = Path(args.config_path)
+    if not config_path.exists():
+        raise SystemExit(f"Config file not found: {config_path}")
+
+    labels = load_labels(config_path, validator_cache_dir=args.validator_cache_dir)
+    base_branch = args.base_branch
+    if base_branch is None:
+        base_branch = git(args.repo_path, "rev-parse", "--abbrev-ref", "HEAD").strip()
+    commits = list_commits(args.repo_path, args.count, mode=args.mode, rev=args.rev)
+    results = simulate(
+        labels,
+        commits,
+        repo_path=args.repo_path,
+        base_branch=base_branch,
+        jobs=args.jobs,
+    )
+    summary = summarize(labels, results, top=args.top)
+    records = [
+        {key: value for key, value in result.items() if key != "glob_seconds"}
+        for result in results
+    ]
+    print(render_report(summary, results), end="")
+
+    if args.output_path:
+        Path(args.output_path).write_text(
+            json.dumps({"summary": summary, "commits": records}, indent=2) + "\n",
+            encoding="utf-8",
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
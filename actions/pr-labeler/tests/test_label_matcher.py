@@ -0,0 +1,358 @@
+from pathlib import Path
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import yaml
+
+ACTION_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ACTION_DIR))
+
+import apply_pr_labels  # noqa: E402
+from label_matcher import LabelMatcher  # noqa: E402
+
+
+def glob_matches(pattern, path):
+    return LabelMatcher(
+        {"label": [{"changed-files": [{"any-glob-to-any-file": pattern}]}]}
+    ).evaluate([path]) == ["label"]
+
+
+class GlobTests(unittest.TestCase):
+    def test_globs_follow_minimatch_with_dot_files(self):
+        cases = [
+            ("**/*.md", "README.md", True),
+            ("**/*.md", "docs/guide/index.md", True),
+            ("*.md", "docs/index.md", False),
+            (".github/**", ".github/workflows/ci.yml", True),
+            ("src/*.py", "src/pkg/module.py", False),
+            ("src/**/*.py", "src/module.py", True),
+            ("**/*.{yml,yaml}", "a/b.yaml", True),
+            ("**/.*", "config/.env", True),
+            ("docs/?.md", "docs/a.md", True),
+            ("docs/[!a].md", "docs/a.md", False),
+            ("a/**/b", "a/b", True),
+            ("a/**/b", "ab", False),
+        ]
+        for pattern, path, expected in cases:
+            with self.subTest(pattern=pattern, path=path):
+                self.assertEqual(glob_matches(pattern, path), expected)
+
+    def test_negated_globs_match_files_outside_the_pattern(self):
+        self.assertTrue(glob_matches("!docs/**", "src/main.py"))
+        self.assertFalse(glob_matches("!docs/**", "docs/index.md"))
+
+
+class LabelMatcherTests(unittest.TestCase):
+    def test_changed_files_matchers(self):
+        matcher = LabelMatcher(
+            {
+                "any-any": [
+                    {"changed-files": [{"any-glob-to-any-file": ["**/*.md", "x/**"]}]}
+                ],
+                "any-all": [
+                    {"changed-files": [{"any-glob-to-all-files": ["docs/**", "*.txt"]}]}
+                ],
+                "all-any": [
+                    {
+                        "changed-files": [
+                            {"all-globs-to-any-file": ["docs/**", "!**/*.png"]}
+                        ]
+                    }
+                ],
+                "all-all": [
+                    {
+                        "changed-files": [
+                            {"all-globs-to-all-files": ["docs/**", "!**/*.png"]}
+                        ]
+                    }
+                ],
+            }
+        )
+
+        self.assertEqual(
+            matcher.evaluate(["docs/a.md", "docs/b.png"]),
+            ["all-any", "any-all", "any-any"],
+        )
+        self.assertEqual(
+            matcher.evaluate(["docs/a.md", "docs/b.md"]),
+            ["all-all", "all-any", "any-all", "any-any"],
+        )
+        self.assertEqual(matcher.evaluate(["docs/b.png", "src/c.py"]), [])
+
+    def test_any_glob_to_all_files_needs_each_file_to_match_some_glob(self):
+        matcher = LabelMatcher(
+            {
+                "docs": [
+                    {"changed-files": [{"any-glob-to-all-files": ["docs/**", "*.md"]}]}
+                ],
+                "not-src": [
+                    {
+                        "changed-files": [
+                            {"any-glob-to-all-files": ["*.md", "!src/**"]}
+                        ]
+                    }
+                ],
+            }
+        )
+
+        self.assertEqual(
+            matcher.evaluate(["docs/a.txt", "README.md"]), ["docs", "not-src"]
+        )
+        self.assertEqual(matcher.evaluate(["docs/a.txt", "src/b.py"]), [])
+        self.assertEqual(matcher.evaluate(["README.md", "tests/b.py"]), ["not-src"])
+
+    def test_top_level_entries_are_anded_and_bare_keys_ored(self):
+        matcher = LabelMatcher(
+            {
+                "docs-on-main": [
+                    {"changed-files": [{"any-glob-to-any-file": "**/*.md"}]},
+                    {"head-branch": "^docs"},
+                    {"all": [{"base-branch": "^main$"}]},
+                    {"description": "Ignored metadata"},
+                ],
+                "release": [
+                    {
+                        "any": [
+                            {"head-branch": ["^release", "^hotfix"]},
+                            {"base-branch": "^release/"},
+                        ]
+                    }
+                ],
+                "metadata-only": [{"description": "Never applied"}],
+            }
+        )
+
+        self.assertEqual(
+            matcher.evaluate(["src/a.py"], head_branch="docs/x", base_branch="main"),
+            ["docs-on-main"],
+        )
+        self.assertEqual(
+            matcher.evaluate(["README.md"], head_branch="feat", base_branch="dev"),
+            [],
+        )
+        self.assertEqual(
+            matcher.evaluate([], head_branch="feat", base_branch="release/1.0"),
+            ["release"],
+        )
+
+    def test_bare_keys_join_the_first_preceding_any_entry(self):
+        files_then_branch = [
+            {"any": [{"changed-files": [{"any-glob-to-any-file": "docs/**"}]}]},
+            {"head-branch": ["^doc"]},
+        ]
+        matcher = LabelMatcher(
+            {
+                "files-then-branch": files_then_branch,
+                "branch-then-files": files_then_branch[::-1],
+            }
+        )
+
+        # The branch joins the earlier any; placed first, it starts its own.
+        self.assertEqual(
+            matcher.evaluate(["src/a.py"], head_branch="doc-x"),
+            ["files-then-branch"],
+        )
+        self.assertEqual(
+            matcher.evaluate(["docs/a.md"], head_branch="doc-x"),
+            ["branch-then-files", "files-then-branch"],
+        )
+
+    def test_bundled_config(self):
+        config = yaml.safe_load((ACTION_DIR / "labeler.yml").read_text())
+        matcher = LabelMatcher(config)
+
+        self.assertEqual(
+            matcher.evaluate(
+                ["README.md", ".github/workflows/ci.yml"], head_branch="fix/typo"
+            ),
+            ["bug", "documentation", "maintenance"],
+        )
+
+
+class IncrementalEvaluationTests(unittest.TestCase):
+    def files(self, names, limit):
+        """Yield names, failing the test if more than ``limit`` are read."""
+        for count, name in enumerate(names, start=1):
+            if count > limit:
+                self.fail(f"read {count} files, expected at most {limit}")
+            yield name
+
+    def test_stops_reading_once_every_label_is_decided(self):
+        matcher = LabelMatcher(
+            {
+                "docs": [{"changed-files": [{"any-glob-to-any-file": "**/*.md"}]}],
+                "only-docs": [
+                    {
+                        "all": [
+                            {
+                                "changed-files": [
+                                    {"all-globs-to-all-files": "**/*.md"}
+                                ]
+                            }
+                        ]
+                    }
+                ],
+                "fix": [{"head-branch": "^fix"}],
+            }
+        )
+        evaluation = matcher.evaluation(head_branch="feat/x")
+        evaluation.consume(
+            self.files(["README.md", "src/a.py"] + ["src/b.py"] * 10_000, limit=2)
+        )
+
+        self.assertTrue(evaluation.done)
+        self.assertEqual(evaluation.files, 2)
+        self.assertEqual(evaluation.labels(), ["docs"])
+
+    def test_a_file_outside_every_glob_settles_any_glob_to_all_files(self):
+        matcher = LabelMatcher(
+            {
+                "docs": [
+                    {
+                        "changed-files": [
+                            {"any-glob-to-all-files": ["docs/**", "*.md"]}
+                        ]
+                    }
+                ]
+            }
+        )
+        evaluation = matcher.evaluation()
+        evaluation.consume(
+            self.files(
+                ["docs/a.txt", "README.md", "src/a.py"] + ["docs/b.md"] * 10_000,
+                limit=3,
+            )
+        )
+
+        self.assertTrue(evaluation.done)
+        self.assertEqual(evaluation.files, 3)
+        self.assertEqual(evaluation.labels(), [])
+
+    def test_branch_only_configs_read_no_files(self):
+        matcher = LabelMatcher({"fix": [{"head-branch": "^fix"}]})
+
+        self.assertEqual(
+            matcher.evaluate(self.files(["src/a.py"], limit=0), head_branch="fix/x"),
+            ["fix"],
+        )
+
+    def test_undecided_labels_use_the_complete_file_list(self):
+        matcher = LabelMatcher(
+            {
+                "only-docs": [
+                    {"changed-files": [{"any-glob-to-all-files": "docs/**"}]}
+                ],
+                "touches-docs": [
+                    {"changed-files": [{"any-glob-to-any-file": "docs/**"}]}
+                ],
+            }
+        )
+
+        self.assertEqual(
+            matcher.evaluate(["docs/a.md", "docs/b.md"]), ["only-docs", "touches-docs"]
+        )
+        self.assertEqual(matcher.evaluate([]), ["only-docs"])
+
+    def test_all_changed_files_conditions_need_a_changed_file(self):
+        matcher = LabelMatcher(
+            {
+                "all-docs": [
+                    {
+                        "all": [
+                            {
+                                "changed-files": [
+                                    {"any-glob-to-all-files": "docs/**"}
+                                ]
+                            }
+                        ]
+                    }
+                ],
+            }
+        )
+
+        self.assertEqual(matcher.evaluate([]), [])
+        self.assertEqual(matcher.evaluate(["docs/a.md"]), ["all-docs"])
+
+
+class ApplyPrLabelsTests(unittest.TestCase):
+    def test_main_adds_only_new_labels(self):
+        responses = {
+            "https://api.github.com/repos/owner/repo/pulls/7": {
+                "head": {"ref": "fix/typo"},
+                "base": {"ref": "main"},
+                "labels": [{"name": "bug"}],
+            },
+            "https://api.github.com/repos/owner/repo/pulls/7/files"
+            "?per_page=100&page=1": [{"filename": "docs/index.md"}],
+        }
+        calls = []
+
+        def fake_api(method, url, token, payload=None):
+            calls.append((method, url, payload))
+            return responses.get(url, {})
+
+        args = mock.Mock(
+            config_path=str(ACTION_DIR / "labeler.yml"),
+            repo="owner/repo",
+            pr_number=7,
+            github_token="token",
+            files_source="api",
+            dry_run=False,
+        )
+        with mock.patch.object(
+            apply_pr_labels, "parse_args", return_value=args
+        ), mock.patch.object(
+            apply_pr_labels, "api", side_effect=fake_api
+        ), mock.patch(
+            "builtins.print"
+        ) as print_mock:
+            self.assertEqual(apply_pr_labels.main(), 0)
+
+        self.assertEqual(
+            calls[-1],
+            (
+                "POST",
+                "https://api.github.com/repos/owner/repo/issues/7/labels",
+                {"labels": ["documentation"]},
+            ),
+        )
+        print_mock.assert_any_call("new-labels=documentation")
+        print_mock.assert_any_call("all-labels=bug,documentation")
+        print_mock.assert_any_call("files-evaluated=1")
+
+    def test_git_source_streams_changed_files_and_stops_git(self):
+        with tempfile.TemporaryDirectory() as directory:
+
+            def git(*args):
+                subprocess.run(
+                    ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+                    cwd=directory,
+                    check=True,
+                    capture_output=True,
+                )
+
+            git("init", "-q", "-b", "main")
+            Path(directory, "README.md").write_text("base\n")
+            git("add", ".")
+            git("commit", "-q", "-m", "base")
+            git("checkout", "-q", "-b", "feature")
+            for name in ("a b.md", "src/x.py", "src/y.py"):
+                Path(directory, name).parent.mkdir(exist_ok=True)
+                Path(directory, name).write_text("change\n")
+            git("add", ".")
+            git("commit", "-q", "-m", "change")
+
+            files = list(apply_pr_labels.iter_git_diff_files("main", cwd=directory))
+            partial = apply_pr_labels.iter_git_diff_files("main", cwd=directory)
+            first = next(partial)
+            partial.close()
+
+        self.assertEqual(files, ["a b.md", "src/x.py", "src/y.py"])
+        self.assertEqual(first, "a b.md")
+
+
+if __name__ == "__main__":
+    unittest.main()
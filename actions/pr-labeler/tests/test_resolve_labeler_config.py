@@ -1,3 +1,5 @@
+import json
+import os
 from pathlib import Path
 import subprocess
 import tempfile
@@ -10,7 +12,7 @@ SCRIPT_PATH = Path(__file__).resolve().parents[1] / "resolve_labeler_config.py"
 
 
 class ResolveLabelerConfigTests(unittest.TestCase):
-    def run_resolver(self, configuration):
+    def run_resolver(self, configuration, extra_args=(), env=None):
         with tempfile.TemporaryDirectory() as directory:
             directory_path = Path(directory)
             config_path = directory_path / "config.yml"
@@ -25,10 +27,12 @@ class ResolveLabelerConfigTests(unittest.TestCase):
                     str(config_path),
                     "--output-path",
                     str(output_path),
+                    *extra_args,
                 ],
                 capture_output=True,
                 text=True,
                 check=False,
+                env=env,
             )
             flattened = None
             if output_path.exists():
@@ -74,6 +78,18 @@ bug:
             {"bug": [{"description": "Bug fixes"}, {"color": "d73a4a"}]},
         )
 
+    def test_accepts_label_aliases(self):
+        result, flattened = self.run_resolver(
+            """
+bug:
+  - description: Bug fixes
+  - aliases: [defect, "type: bug"]
+"""
+        )
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(flattened["bug"][1], {"aliases": ["defect", "type: bug"]})
+
     def test_rejects_unknown_labeler_conditions(self):
         result, flattened = self.run_resolver(
             """
@@ -87,6 +103,75 @@ labels:
         self.assertIsNone(flattened)
         self.assertIn("schema validation failed", result.stderr)
 
+    def test_reports_every_schema_violation(self):
+        result, flattened = self.run_resolver(
+            """
+labels:
+  bug:
+    - unknown-condition: true
+  docs:
+    - color: "blue"
+"""
+        )
+
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIsNone(flattened)
+        self.assertIn("  bug.0:", result.stderr)
+        self.assertIn("  docs.0:", result.stderr)
+
+    def test_records_checked_schema_digest_in_cache_dir(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            for _ in range(2):
+                result, flattened = self.run_resolver(
+                    """
+bug:
+  - description: Bug fixes
+""",
+                    extra_args=["--validator-cache-dir", cache_dir],
+                )
+                self.assertEqual(result.returncode, 0, result.stderr)
+            stamps = [path.name for path in Path(cache_dir).iterdir()]
+
+        self.assertEqual(flattened, {"bug": [{"description": "Bug fixes"}]})
+        self.assertEqual(len(stamps), 1)
+        self.assertTrue(stamps[0].endswith(".checked"))
+
+    def test_cache_hit_skips_yaml_and_jsonschema(self):
+        configuration = """
+labels:
+  bug:
+    - description: Bug fixes
+"""
+        with tempfile.TemporaryDirectory() as directory:
+            cache_dir = Path(directory) / "cache"
+            blockers = Path(directory) / "blockers"
+            blockers.mkdir()
+            for module in ("yaml", "jsonschema"):
+                (blockers / f"{module}.py").write_text(
+                    f"raise ImportError('{module} must not be imported')\n",
+                    encoding="utf-8",
+                )
+            args = ["--cache-dir", str(cache_dir)]
+
+            miss, flattened = self.run_resolver(configuration, extra_args=args)
+            hit, cached = self.run_resolver(
+                configuration,
+                extra_args=args,
+                env=dict(os.environ, PYTHONPATH=str(blockers)),
+            )
+            changed, _ = self.run_resolver(
+                configuration.replace("Bug fixes", "Fixes"), extra_args=args
+            )
+            manifest = json.loads((cache_dir / "manifest.json").read_text())
+
+        self.assertEqual(miss.returncode, 0, miss.stderr)
+        self.assertIn("cache-hit=false", miss.stdout)
+        self.assertEqual(hit.returncode, 0, hit.stderr)
+        self.assertIn("cache-hit=true", hit.stdout)
+        self.assertEqual(cached, flattened)
+        self.assertIn("cache-hit=false", changed.stdout)
+        self.assertEqual(len(manifest["entries"]), 2)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,133 @@
+import json
+from pathlib import Path
+import subprocess
+import sys
+import tempfile
+import unittest
+
+ACTION_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ACTION_DIR))
+
+import simulate_labeler  # noqa: E402
+
+LABELS = {
+    "documentation": [{"changed-files": [{"any-glob-to-any-file": "**/*.md"}]}],
+    "bug": [{"head-branch": "^fix"}],
+    "python": [{"changed-files": [{"any-glob-to-any-file": "src/**/*.py"}]}],
+}
+
+
+class SimulateLabelerTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.repo = self.directory.name
+        self.git("init", "-q", "-b", "main")
+        self.commit({"README.md": "base\n"}, "base")
+        self.merge("docs/guide", {"docs/guide.md": "guide\n"})
+        self.merge("fix/parser", {"src/pkg/parser.py": "fix\n"})
+
+    def git(self, *args):
+        subprocess.run(
+            ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+            cwd=self.repo,
+            check=True,
+            capture_output=True,
+        )
+
+    def commit(self, files, message):
+        for name, text in files.items():
+            Path(self.repo, name).parent.mkdir(parents=True, exist_ok=True)
+            Path(self.repo, name).write_text(text)
+        self.git("add", ".")
+        self.git("commit", "-q", "-m", message)
+
+    def merge(self, branch, files):
+        self.git("checkout", "-q", "-b", branch)
+        self.commit(files, f"Change on {branch}")
+        self.git("checkout", "-q", "main")
+        self.git("merge", "-q", "--no-ff", "--no-edit", branch)
+
+    def test_merges_are_labeled_like_pull_requests(self):
+        commits = simulate_labeler.list_commits(self.repo, 10)
+
+        self.assertEqual(
+            [commit["head_branch"] for commit in commits],
+            ["fix/parser", "docs/guide"],
+        )
+        results = simulate_labeler.simulate(
+            LABELS, commits, repo_path=self.repo, base_branch="main"
+        )
+        self.assertEqual(
+            [result["labels"] for result in results],
+            [["bug", "python"], ["documentation"]],
+        )
+        parallel = simulate_labeler.simulate(
+            LABELS, commits, repo_path=self.repo, base_branch="main", jobs=2
+        )
+        self.assertEqual(
+            [result["labels"] for result in parallel],
+            [result["labels"] for result in results],
+        )
+
+    def test_commit_mode_skips_merges_and_the_root_commit(self):
+        commits = simulate_labeler.list_commits(self.repo, 10, mode="commits")
+
+        self.assertEqual(
+            [commit["subject"] for commit in commits],
+            ["Change on fix/parser", "Change on docs/guide"],
+        )
+        self.assertEqual([commit["head_branch"] for commit in commits], [None, None])
+
+    def test_summary_attributes_glob_time_to_labels(self):
+        commits = simulate_labeler.list_commits(self.repo, 10)
+        results = simulate_labeler.simulate(LABELS, commits, repo_path=self.repo)
+        summary = simulate_labeler.summarize(LABELS, results)
+
+        self.assertEqual(summary["commits"], 2)
+        self.assertEqual(
+            {label: stats["count"] for label, stats in summary["labels"].items()},
+            {"documentation": 1, "bug": 1, "python": 1},
+        )
+        self.assertEqual(summary["labels"]["bug"]["seconds"], 0)
+        self.assertGreater(summary["labels"]["documentation"]["seconds"], 0)
+        self.assertEqual(
+            {entry["glob"] for entry in summary["slowest_globs"]},
+            {"**/*.md", "src/**/*.py"},
+        )
+
+    def test_main_prints_report_and_writes_json(self):
+        config_path = Path(self.repo, "labeler.yml")
+        output_path = Path(self.repo, "simulation.json")
+        config_path.write_text(json.dumps(LABELS), encoding="utf-8")
+
+        result = subprocess.run(
+            [
+                sys.executable,
+                str(ACTION_DIR / "simulate_labeler.py"),
+                "--config-path",
+                str(config_path),
+                "--repo-path",
+                self.repo,
+                "--jobs",
+                "2",
+                "--output-path",
+                str(output_path),
+            ],
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn("| documentation | 1 |", result.stdout)
+        self.assertIn("## Slowest globs", result.stdout)
+        data = json.loads(output_path.read_text(encoding="utf-8"))
+        self.assertEqual(
+            [commit["labels"] for commit in data["commits"]],
+            [["bug", "python"], ["documentation"]],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
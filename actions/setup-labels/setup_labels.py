@@ -1,16 +1,42 @@
 #!/usr/bin/env python3
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+import difflib
+import hashlib
+import http.client
 import json
+import os
+import random
 import re
+import sys
+import threading
+import time
 import urllib.parse
-import urllib.request
-from urllib.error import HTTPError, URLError
 
 import yaml
 
 
 COLOR_RE = re.compile(r"^[0-9a-fA-F]{6}$")
 DEFAULT_COLOR = "808080"
+DEFAULT_MAX_CONCURRENCY = 4
+GRAPHQL_URL = "https://api.github.com/graphql"
+LABELS_PAGE_SIZE = 100
+REPOS_PAGE_SIZE = 100
+MUTATION_BATCH_SIZE = 50
+MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 30.0
+# Waits longer than this (for example an exhausted primary rate limit) fail fast.
+MAX_RETRY_WAIT_SECONDS = 120.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Errors raised when a kept-alive connection was closed by the server while idle.
+STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    BrokenPipeError,
+    ConnectionResetError,
+)
+REQUEST_TIMEOUT_SECONDS = 30
+STATE_VERSION = 1
 
 
 class GitHubApiError(RuntimeError):
@@ -22,7 +48,18 @@ def parse_args():
         description="Create or update label metadata from a labeler config."
     )
     parser.add_argument("--config-path", required=True)
-    parser.add_argument("--repo", required=True)
+    parser.add_argument(
+        "--repo",
+        action="append",
+        default=[],
+        help="Repository in owner/repo format. Repeat to sync several repositories.",
+    )
+    parser.add_argument(
+        "--owner",
+        action="append",
+        default=[],
+        help="Sync every non-archived, non-fork repository owned by this account.",
+    )
     parser.add_argument("--github-token", required=True)
     parser.add_argument("--output-path", required=True)
     parser.add_argument(
@@ -30,17 +67,239 @@ def parse_args():
         action="store_true",
         help="Report planned changes without creating or updating labels.",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=DEFAULT_MAX_CONCURRENCY,
+        help="Repositories synced at the same time in multi-repository mode.",
+    )
+    parser.add_argument(
+        "--api",
+        choices=("graphql", "rest"),
+        default="graphql",
+        help=(
+            "graphql lists labels with one paginated query and batches changes "
+            "into aliased mutations; rest uses one request per label change."
+        ),
+    )
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="Delete repository labels that are not in the plan or renamed into it.",
+    )
+    parser.add_argument(
+        "--similarity-threshold",
+        type=float,
+        help=(
+            "Rename the most similar unplanned label (difflib ratio between 0 and "
+            "1) into a missing planned label. Disabled by default."
+        ),
+    )
+    parser.add_argument(
+        "--state-path",
+        help=(
+            "JSON file recording the applied plan digest and label listing ETags "
+            "per repository. Repositories whose plan and labels are unchanged "
+            "are skipped after a conditional request."
+        ),
+    )
+    args = parser.parse_args()
+    if not args.repo and not args.owner:
+        parser.error("at least one --repo or --owner is required")
+    return args
+
+
+class Session:
+    """Keep-alive HTTPS connections, one per thread and host, with retries.
+
+    Responses with a 429 or 5xx status, secondary rate limits, GraphQL
+    RATE_LIMITED errors, and dropped connections are retried. Each retry
+    waits for the Retry-After or X-RateLimit-Reset hint when there is one,
+    and for jittered exponential backoff otherwise. A reused connection that
+    the server closed while idle is reopened at once, without waiting.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_attempts=MAX_ATTEMPTS,
+        timeout=REQUEST_TIMEOUT_SECONDS,
+        clock=time.time,
+        sleep=time.sleep,
+        rng=random.random,
+    ):
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        self.clock = clock
+        self.sleep = sleep
+        self.rng = rng
+        self._local = threading.local()
+        self._open = set()
+        self._lock = threading.Lock()
+
+    @property
+    def last_attempts(self):
+        """Attempts used by this thread's most recent request."""
+        return getattr(self._local, "attempts", 1)
+
+    def _connection(self, scheme, netloc):
+        connections = self._local.__dict__.setdefault("connections", {})
+        key = (scheme, netloc)
+        if key not in connections:
+            connection_class = (
+                http.client.HTTPSConnection
+                if scheme == "https"
+                else http.client.HTTPConnection
+            )
+            connections[key] = connection_class(netloc, timeout=self.timeout)
+            with self._lock:
+                self._open.add(connections[key])
+        return connections[key]
+
+    def _discard(self, scheme, netloc):
+        connection = self._local.__dict__.get("connections", {}).pop(
+            (scheme, netloc), None
+        )
+        if connection is not None:
+            with self._lock:
+                self._open.discard(connection)
+            connection.close()
+
+    def close(self):
+        """Close the connections of every thread; call once requests are done.
+
+        A thread that uses the session again opens new connections.
+        """
+        with self._lock:
+            connections, self._open = self._open, set()
+        for connection in connections:
+            connection.close()
+        self._local.__dict__.pop("connections", None)
+
+    def backoff(self, attempt):
+        ceiling = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** (attempt - 1))
+        return ceiling / 2 + self.rng() * ceiling / 2
+
+    def retry_delay(self, status, headers, body, attempt):
+        """Return how long to wait before retrying, or None to give up."""
+        retry_after = headers.get("Retry-After")
+        remaining = headers.get("X-RateLimit-Remaining")
+        secondary = (
+            status == 403 and "secondary rate limit" in body.lower()
+        ) or (status == 200 and is_graphql_rate_limited(body))
+        if status not in RETRY_STATUSES and not secondary:
+            if status != 403 or (retry_after is None and remaining != "0"):
+                return None
+        if retry_after is not None:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                pass
+        reset = headers.get("X-RateLimit-Reset")
+        if remaining == "0" and reset is not None:
+            try:
+                return max(0.0, float(reset) - self.clock()) + 1.0
+            except ValueError:
+                pass
+        return self.backoff(attempt)
+
+    def request(self, method, url, body=None, headers=None):
+        """Return ``(status, headers, body)`` of the final attempt."""
+        parsed = urllib.parse.urlsplit(url)
+        target = parsed.path + (f"?{parsed.query}" if parsed.query else "")
+        attempt = 0
+        while True:
+            attempt += 1
+            self._local.attempts = attempt
+            connection = self._connection(parsed.scheme, parsed.netloc)
+            reused = getattr(connection, "sock", None) is not None
+            try:
+                connection.request(method, target, body=body, headers=headers or {})
+                response = connection.getresponse()
+                text = response.read().decode("utf-8", errors="replace")
+            except (OSError, http.client.HTTPException) as err:
+                self._discard(parsed.scheme, parsed.netloc)
+                if attempt >= self.max_attempts:
+                    raise GitHubApiError(
+                        f"GitHub API request failed for {method} {url}: {err}"
+                    ) from err
+                if reused and isinstance(err, STALE_CONNECTION_ERRORS):
+                    continue
+                delay = self.backoff(attempt)
+                reason = str(err) or type(err).__name__
+            else:
+                if response.will_close:
+                    self._discard(parsed.scheme, parsed.netloc)
+                delay = self.retry_delay(
+                    response.status, response.headers, text, attempt
+                )
+                if (
+                    delay is None
+                    or attempt >= self.max_attempts
+                    or delay > MAX_RETRY_WAIT_SECONDS
+                ):
+                    return response.status, response.headers, text
+                reason = f"HTTP {response.status}"
+            print(
+                f"{method} {url} failed ({reason}); retrying in {delay:.1f}s",
+                file=sys.stderr,
+            )
+            self.sleep(delay)
+
+
+SESSION = Session()
+
+
+def is_graphql_rate_limited(body):
+    """Whether a successful GraphQL response reports a RATE_LIMITED error."""
+    if "RATE_LIMITED" not in body:
+        return False
+    try:
+        errors = json.loads(body).get("errors") or []
+    except (ValueError, AttributeError):
+        return False
+    return any(
+        isinstance(error, dict) and error.get("type") == "RATE_LIMITED"
+        for error in errors
+    )
+
+
+def is_retried_success(method, url, payload, status, body, attempts):
+    """Whether a retried request failed only because its first attempt worked.
+
+    A retried create that now conflicts, or a retried delete or rename that
+    no longer finds the label under its old name, most likely succeeded
+    before its response was lost.
+    """
+    if attempts < 2:
+        return False
+    if method == "DELETE":
+        return status == 404
+    if method == "PATCH":
+        path = urllib.parse.urlsplit(url).path
+        old_name = urllib.parse.unquote(path.rsplit("/", 1)[-1])
+        new_name = (payload or {}).get("new_name")
+        return status == 404 and new_name is not None and new_name != old_name
+    if method != "POST" or status != 422:
+        return False
+    try:
+        errors = json.loads(body).get("errors") or []
+    except (ValueError, AttributeError):
+        return False
+    return any(
+        isinstance(error, dict) and error.get("code") == "already_exists"
+        for error in errors
+    )
 
 
 def api(method, url, token, payload=None):
     data = None
     if payload is not None:
         data = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(
+    status, headers, body = SESSION.request(
+        method,
         url,
-        data=data,
-        method=method,
+        body=data,
         headers={
             "Authorization": f"Bearer {token}",
             "Accept": "application/vnd.github+json",
@@ -48,32 +307,236 @@ def api(method, url, token, payload=None):
             "Content-Type": "application/json",
         },
     )
-    try:
-        with urllib.request.urlopen(req) as resp:
-            return json.loads(resp.read().decode("utf-8")), resp.headers
-    except HTTPError as err:
-        body = err.read().decode("utf-8", errors="replace")
-        raise GitHubApiError(f"GitHub API error {err.code} for {method} {url}: {body}")
-    except URLError as err:
-        raise GitHubApiError(f"GitHub API request failed for {method} {url}: {err}")
+    if is_retried_success(
+        method, url, payload, status, body, SESSION.last_attempts
+    ):
+        return {}, headers
+    if status >= 400:
+        raise GitHubApiError(f"GitHub API error {status} for {method} {url}: {body}")
+    return (json.loads(body) if body else {}), headers
+
+
+def graphql(query, variables, token):
+    """Run a GraphQL request and return its data and per-alias errors."""
+    payload, _headers = api(
+        "POST",
+        GRAPHQL_URL,
+        token,
+        payload={"query": query, "variables": variables},
+    )
+    data = payload.get("data")
+    errors = payload.get("errors") or []
+    if data is None:
+        messages = "; ".join(error.get("message", "") for error in errors)
+        raise GitHubApiError(f"GitHub GraphQL error: {messages or payload}")
+    alias_errors = {}
+    for error in errors:
+        path = error.get("path") or ["<root>"]
+        alias_errors.setdefault(str(path[0]), []).append(error.get("message", ""))
+    return data, alias_errors
 
 
 def iter_repo_labels(repo, token):
     page = 1
     out = {}
     while True:
-        url = f"https://api.github.com/repos/{repo}/labels?per_page=100&page={page}"
-        labels, _headers = api("GET", url, token)
-        if not labels:
-            break
+        labels, _headers = api("GET", labels_page_url(repo, page), token)
         for label in labels:
             name = label.get("name", "")
             if name:
                 out[name.lower()] = label
+        # A short page is the last one; no need to ask for an empty page.
+        if len(labels) < LABELS_PAGE_SIZE:
+            break
+        page += 1
+    return out
+
+
+REPO_LABELS_QUERY = """
+query($owner: String!, $name: String!, $cursor: String) {
+  repository(owner: $owner, name: $name) {
+    id
+    labels(first: 100, after: $cursor) {
+      nodes {
+        id
+        name
+        color
+        description
+      }
+      pageInfo {
+        hasNextPage
+        endCursor
+      }
+    }
+  }
+}
+"""
+
+
+def fetch_repo_labels_graphql(repo, token):
+    """Return the repository node id and its labels keyed by lowercase name."""
+    owner, name = repo.split("/", 1)
+    cursor = None
+    repository_id = None
+    out = {}
+    while True:
+        data, errors = graphql(
+            REPO_LABELS_QUERY,
+            {"owner": owner, "name": name, "cursor": cursor},
+            token,
+        )
+        repository = data.get("repository")
+        if repository is None:
+            messages = "; ".join(sum(errors.values(), [])) or "not found"
+            raise GitHubApiError(f"GitHub GraphQL error for {repo}: {messages}")
+        repository_id = repository["id"]
+        labels = repository["labels"]
+        for label in labels["nodes"]:
+            out[label["name"].lower()] = label
+        if not labels["pageInfo"]["hasNextPage"]:
+            break
+        cursor = labels["pageInfo"]["endCursor"]
+    return repository_id, out
+
+
+def labels_page_url(repo, page):
+    return (
+        f"https://api.github.com/repos/{repo}/labels"
+        f"?per_page={LABELS_PAGE_SIZE}&page={page}"
+    )
+
+
+def fetch_label_etags(repo, token):
+    """Return the ETag of every page of the REST label listing."""
+    etags = []
+    page = 1
+    while True:
+        labels, headers = api("GET", labels_page_url(repo, page), token)
+        etags.append(headers.get("ETag"))
+        if len(labels) < LABELS_PAGE_SIZE:
+            return etags
+        page += 1
+
+
+def labels_unchanged(repo, token, etags):
+    """Revalidate each listing page; 304 responses do not count against quota."""
+    if not etags or None in etags:
+        return False
+    for page, etag in enumerate(etags, start=1):
+        status, _headers, _body = SESSION.request(
+            "GET",
+            labels_page_url(repo, page),
+            headers={
+                "Authorization": f"Bearer {token}",
+                "Accept": "application/vnd.github+json",
+                "User-Agent": "ci-setup-labels",
+                "If-None-Match": etag,
+            },
+        )
+        if status != 304:
+            return False
+    return True
+
+
+def plan_digest(planned):
+    encoded = json.dumps(planned, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class LabelState:
+    """Plan digests and label listing ETags from the last successful sync."""
+
+    def __init__(self, path):
+        self.path = path
+        self.repositories = {}
+        self._lock = threading.Lock()
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (FileNotFoundError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("version") == STATE_VERSION:
+            self.repositories = data.get("repositories") or {}
+
+    def is_current(self, repo, digest, token):
+        with self._lock:
+            entry = self.repositories.get(repo.lower())
+        if not entry or entry.get("plan_digest") != digest:
+            return False
+        try:
+            return labels_unchanged(repo, token, entry.get("etags"))
+        except GitHubApiError:
+            return False
+
+    def record(self, repo, digest, token):
+        try:
+            etags = fetch_label_etags(repo, token)
+        except GitHubApiError:
+            etags = None
+        with self._lock:
+            if etags is None:
+                self.repositories.pop(repo.lower(), None)
+            else:
+                self.repositories[repo.lower()] = {
+                    "plan_digest": digest,
+                    "etags": etags,
+                }
+
+    def save(self):
+        with self._lock:
+            data = {"version": STATE_VERSION, "repositories": self.repositories}
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as fh:
+            json.dump(data, fh, indent=2, sort_keys=True)
+        os.replace(temp_path, self.path)
+
+
+def iter_owner_repos(owner, token):
+    encoded_owner = urllib.parse.quote(owner, safe="")
+    owner_info, _headers = api(
+        "GET", f"https://api.github.com/users/{encoded_owner}", token
+    )
+    if owner_info.get("type") == "Organization":
+        base = f"https://api.github.com/orgs/{encoded_owner}/repos?type=all"
+    else:
+        base = f"https://api.github.com/users/{encoded_owner}/repos?type=owner"
+
+    page = 1
+    out = []
+    while True:
+        repos, _headers = api(
+            "GET", f"{base}&per_page={REPOS_PAGE_SIZE}&page={page}", token
+        )
+        for repo in repos:
+            if repo.get("archived") or repo.get("fork"):
+                continue
+            out.append(repo["full_name"])
+        if len(repos) < REPOS_PAGE_SIZE:
+            break
         page += 1
     return out
 
 
+def resolve_repos(repos, owners, token):
+    resolved = []
+    errors = []
+    for owner in owners:
+        try:
+            resolved.extend(iter_owner_repos(owner, token))
+        except GitHubApiError as err:
+            errors.append(str(err))
+    resolved.extend(repos)
+
+    seen = set()
+    unique = []
+    for repo in resolved:
+        if repo.lower() not in seen:
+            seen.add(repo.lower())
+            unique.append(repo)
+    return unique, errors
+
+
 def build_label_plan(config_path):
     with open(config_path, "r", encoding="utf-8") as fh:
         labels_cfg = yaml.safe_load(fh) or {}
@@ -90,6 +553,7 @@ def build_label_plan(config_path):
             continue
 
         label_errors = []
+        aliases = []
         description = None
         color = None
         saw_description = False
@@ -103,6 +567,18 @@ def build_label_plan(config_path):
                     description = rule["description"]
                 else:
                     label_errors.append(f"{label_name}: description must be a string")
+            if "aliases" in rule:
+                rule_aliases = rule["aliases"]
+                if isinstance(rule_aliases, str):
+                    rule_aliases = [rule_aliases]
+                if isinstance(rule_aliases, list) and all(
+                    isinstance(alias, str) and alias for alias in rule_aliases
+                ):
+                    aliases.extend(rule_aliases)
+                else:
+                    label_errors.append(
+                        f"{label_name}: aliases must be a string or list of strings"
+                    )
             if "color" in rule:
                 saw_color = True
                 if not isinstance(rule["color"], str):
@@ -131,87 +607,416 @@ def build_label_plan(config_path):
             "description": description,
             "color": color or DEFAULT_COLOR,
         }
+        if aliases:
+            planned[label_name]["aliases"] = aliases
 
     return planned, skipped, errors
 
 
-def apply_labels(repo, token, planned, dry_run=False):
-    created = []
-    updated = []
-    unchanged = []
-    errors = []
+def label_payload(target, current):
+    """Return the REST update payload, or None when the label already matches."""
+    payload = {"new_name": target["name"]}
+    if target["color"] != str(current.get("color", "")).lower():
+        payload["color"] = target["color"]
+    if target["description"] != (current.get("description") or ""):
+        payload["description"] = target["description"]
+    if payload == {"new_name": target["name"]}:
+        return None
+    return payload
 
-    try:
-        existing = iter_repo_labels(repo, token)
-    except GitHubApiError as err:
-        return created, updated, unchanged, [str(err)]
 
+def match_renames(planned, existing, claimed, similarity=None):
+    """Pick existing labels to rename into planned labels missing from the repo.
+
+    Aliases win over similarity. Similarity matching compares lowercase names
+    with difflib and pairs the closest names first.
+    """
+    planned_keys = {name.lower() for name in planned}
+    taken = claimed | planned_keys
+    free = {key for key in existing if key not in taken}
+    renames = {}
+    missing = [name for name in sorted(planned) if name.lower() not in existing]
+    for label_name in missing:
+        for alias in planned[label_name].get("aliases", []):
+            if alias.lower() in free:
+                renames[label_name] = alias.lower()
+                free.discard(alias.lower())
+                break
+
+    if similarity is not None:
+        candidates = sorted(
+            (
+                -difflib.SequenceMatcher(None, label_name.lower(), key).ratio(),
+                label_name,
+                key,
+            )
+            for label_name in missing
+            if label_name not in renames
+            for key in free
+        )
+        for negative_ratio, label_name, key in candidates:
+            if -negative_ratio < similarity:
+                break
+            if label_name in renames or key not in free:
+                continue
+            renames[label_name] = key
+            free.discard(key)
+    return renames
+
+
+def plan_label_edits(planned, existing, prune=False, similarity=None):
+    """Compute the smallest set of label edits that turns existing into planned.
+
+    Returns ``(edits, unchanged)``. Each edit is a ``(kind, label_name, current,
+    payload)`` tuple with kind ``rename``, ``update``, ``create`` or ``delete``,
+    in the order they should be applied. Payloads use the REST field names.
+    Renames keep the existing label, so issues and pull requests stay tagged.
+    """
+    claimed = {name.lower() for name in planned if name.lower() in existing}
+    renames = match_renames(planned, existing, claimed, similarity=similarity)
+    claimed.update(renames.values())
+
+    edits = {"rename": [], "update": [], "create": [], "delete": []}
+    unchanged = []
     for label_name in sorted(planned.keys()):
         target = planned[label_name]
+        if label_name in renames:
+            current = existing[renames[label_name]]
+            edits["rename"].append(
+                (
+                    "rename",
+                    label_name,
+                    current,
+                    label_payload(target, current) or {"new_name": label_name},
+                )
+            )
+            continue
         current = existing.get(label_name.lower())
         if current is None:
-            if dry_run:
-                created.append(label_name)
-                continue
+            edits["create"].append(
+                (
+                    "create",
+                    label_name,
+                    None,
+                    {
+                        "name": target["name"],
+                        "color": target["color"],
+                        "description": target["description"],
+                    },
+                )
+            )
+            continue
+        payload = label_payload(target, current)
+        if payload is None:
+            unchanged.append(label_name)
+        else:
+            edits["update"].append(("update", label_name, current, payload))
+
+    if prune:
+        for key in sorted(existing):
+            if key not in claimed:
+                current = existing[key]
+                edits["delete"].append(("delete", current["name"], current, None))
+
+    ordered = [
+        edit
+        for kind in ("rename", "update", "create", "delete")
+        for edit in edits[kind]
+    ]
+    return ordered, unchanged
 
+
+def edit_label(kind, label_name, current):
+    """Name reported for an edit; renames read ``old->new``."""
+    if kind == "rename":
+        return f"{current['name']}->{label_name}"
+    return label_name
+
+
+def apply_labels_rest(repo, token, edits):
+    applied = []
+    errors = []
+    for kind, label_name, current, payload in edits:
+        if kind == "create":
+            method = "POST"
             url = f"https://api.github.com/repos/{repo}/labels"
-            try:
-                api("POST", url, token, payload=target)
-            except GitHubApiError as err:
-                errors.append(str(err))
-                continue
-            created.append(label_name)
+        else:
+            method = "DELETE" if kind == "delete" else "PATCH"
+            encoded_name = urllib.parse.quote(current["name"], safe="")
+            url = f"https://api.github.com/repos/{repo}/labels/{encoded_name}"
+        try:
+            api(method, url, token, payload=payload)
+        except GitHubApiError as err:
+            errors.append(str(err))
             continue
+        applied.append((kind, label_name, current))
+    return applied, errors
 
-        current_color = str(current.get("color", "")).lower()
-        current_desc = current.get("description") or ""
-        payload = {"new_name": label_name}
 
-        if target["color"] != current_color:
-            payload["color"] = target["color"]
-        if target["description"] != current_desc:
-            payload["description"] = target["description"]
+LABEL_MUTATIONS = {
+    "create": ("createLabel", "CreateLabelInput", "label { id }"),
+    "update": ("updateLabel", "UpdateLabelInput", "label { id }"),
+    "rename": ("updateLabel", "UpdateLabelInput", "label { id }"),
+    "delete": ("deleteLabel", "DeleteLabelInput", "clientMutationId"),
+}
 
-        if payload == {"new_name": label_name}:
-            unchanged.append(label_name)
-            continue
 
-        if dry_run:
-            updated.append(label_name)
-            continue
+def mutation_input(repository_id, kind, current, payload):
+    if kind == "create":
+        return dict(payload, repositoryId=repository_id)
+    if kind == "delete":
+        return {"id": current["id"]}
+    fields = {"id": current["id"], "name": payload["new_name"]}
+    for field in ("color", "description"):
+        if field in payload:
+            fields[field] = payload[field]
+    return fields
+
+
+def build_label_mutation(repository_id, batch):
+    """Build one aliased mutation document and its variables for a batch.
+
+    GitHub runs the fields of a mutation in order, so renames land before
+    creates that might reuse the old names.
+    """
+    declarations = []
+    selections = []
+    variables = {}
+    for index, (kind, _label_name, current, payload) in enumerate(batch):
+        alias = f"label_{index}"
+        mutation, input_type, selection = LABEL_MUTATIONS[kind]
+        declarations.append(f"${alias}: {input_type}!")
+        selections.append(
+            f"  {alias}: {mutation}(input: ${alias}) {{ {selection} }}"
+        )
+        variables[alias] = mutation_input(repository_id, kind, current, payload)
+    query = "mutation({}) {{\n{}\n}}".format(
+        ", ".join(declarations), "\n".join(selections)
+    )
+    return query, variables
 
-        encoded_name = urllib.parse.quote(current["name"], safe="")
-        url = f"https://api.github.com/repos/{repo}/labels/{encoded_name}"
+
+# Per-alias error text of a retried mutation whose first attempt succeeded.
+RETRIED_SUCCESS_MESSAGES = {
+    "create": "already",
+    "delete": "could not resolve to a node",
+}
+
+
+def apply_labels_graphql(repo, token, repository_id, edits):
+    applied = []
+    errors = []
+    for start in range(0, len(edits), MUTATION_BATCH_SIZE):
+        batch = edits[start : start + MUTATION_BATCH_SIZE]
+        query, variables = build_label_mutation(repository_id, batch)
         try:
-            api("PATCH", url, token, payload=payload)
+            data, alias_errors = graphql(query, variables, token)
         except GitHubApiError as err:
-            errors.append(str(err))
+            errors.extend(
+                f"{edit_label(kind, label, current)}: {err}"
+                for kind, label, current, _payload in batch
+            )
             continue
-        updated.append(label_name)
+        retried = SESSION.last_attempts > 1
+        for index, (kind, label_name, current, _payload) in enumerate(batch):
+            alias = f"label_{index}"
+            messages = alias_errors.get(alias, [])
+            marker = RETRIED_SUCCESS_MESSAGES.get(kind)
+            if (
+                retried
+                and marker
+                and messages
+                and all(marker in message.lower() for message in messages)
+            ):
+                # The first attempt applied the edit before the response was lost.
+                applied.append((kind, label_name, current))
+                continue
+            if alias in alias_errors or not data.get(alias):
+                messages = "; ".join(alias_errors.get(alias, [])) or "no result"
+                errors.append(
+                    f"GitHub GraphQL error for {repo} label "
+                    f"{edit_label(kind, label_name, current)}: {messages}"
+                )
+                continue
+            applied.append((kind, label_name, current))
+    return applied, errors
+
 
-    return created, updated, unchanged, errors
+RESULT_KEYS = {
+    "create": "created_labels",
+    "update": "updated_labels",
+    "rename": "renamed_labels",
+    "delete": "deleted_labels",
+}
+
+
+def reconcile_result(applied=(), unchanged=(), errors=()):
+    result = {key: [] for key in RESULT_KEYS.values()}
+    for kind, label_name, current in applied:
+        result[RESULT_KEYS[kind]].append(edit_label(kind, label_name, current))
+    result["unchanged_labels"] = list(unchanged)
+    result["errors"] = list(errors)
+    return result
+
+
+def reconcile_labels(
+    repo,
+    token,
+    planned,
+    dry_run=False,
+    backend="rest",
+    state=None,
+    prune=False,
+    similarity=None,
+):
+    """Rename, update, create and optionally prune labels to match the plan."""
+    digest = None
+    if state is not None and not dry_run:
+        digest = plan_digest(
+            {"labels": planned, "prune": prune, "similarity": similarity}
+        )
+        if state.is_current(repo, digest, token):
+            return reconcile_result(unchanged=sorted(planned.keys()))
+
+    repository_id = None
+    try:
+        if backend == "graphql":
+            repository_id, existing = fetch_repo_labels_graphql(repo, token)
+        else:
+            existing = iter_repo_labels(repo, token)
+    except GitHubApiError as err:
+        return reconcile_result(errors=[str(err)])
+
+    edits, unchanged = plan_label_edits(
+        planned, existing, prune=prune, similarity=similarity
+    )
+    if dry_run:
+        applied = [(kind, label, current) for kind, label, current, _ in edits]
+        return reconcile_result(applied, unchanged)
+
+    if backend == "graphql":
+        applied, errors = apply_labels_graphql(repo, token, repository_id, edits)
+    else:
+        applied, errors = apply_labels_rest(repo, token, edits)
+    if digest is not None and not errors:
+        state.record(repo, digest, token)
+    return reconcile_result(applied, unchanged, errors)
+
+
+def apply_labels(repo, token, planned, dry_run=False, backend="rest", state=None):
+    """Create or update labels; renames through aliases count as updates."""
+    result = reconcile_labels(
+        repo, token, planned, dry_run=dry_run, backend=backend, state=state
+    )
+    updated = result["updated_labels"] + [
+        name.split("->", 1)[1] for name in result["renamed_labels"]
+    ]
+    return (
+        result["created_labels"],
+        sorted(updated),
+        result["unchanged_labels"],
+        result["errors"],
+    )
+
+
+def sync_repos(
+    repos,
+    token,
+    planned,
+    dry_run=False,
+    max_concurrency=DEFAULT_MAX_CONCURRENCY,
+    backend="rest",
+    state=None,
+    prune=False,
+    similarity=None,
+):
+    """Reconcile one label plan in every repository, a few at a time."""
+
+    def sync(repo):
+        return reconcile_labels(
+            repo,
+            token,
+            planned,
+            dry_run=dry_run,
+            backend=backend,
+            state=state,
+            prune=prune,
+            similarity=similarity,
+        )
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as executor:
+            return dict(zip(repos, executor.map(sync, repos)))
+    finally:
+        SESSION.close()
+
+
+def repo_result(result, skipped, errors=()):
+    out = {key: list(value) for key, value in result.items()}
+    out["skipped_labels"] = sorted(skipped)
+    out["errors"] = sorted(list(errors) + result["errors"])
+    return out
+
+
+def build_multi_repo_result(results, skipped, errors):
+    """Summarize per-repository results, prefixing labels with their repository."""
+    repositories = {}
+    combined = repo_result(reconcile_result(), skipped, errors)
+    for repo, result in sorted(results.items(), key=lambda item: item[0].lower()):
+        repositories[repo] = repo_result(result, skipped)
+        for key, names in result.items():
+            if key == "errors":
+                combined[key].extend(f"{repo}: {error}" for error in names)
+            else:
+                combined[key].extend(f"{repo}:{name}" for name in names)
+    combined["errors"].sort()
+    combined["repositories"] = repositories
+    return combined
 
 
 def main():
     args = parse_args()
     planned, skipped, plan_errors = build_label_plan(args.config_path)
 
-    created = []
-    updated = []
-    unchanged = []
-    apply_errors = []
-    if not plan_errors:
-        created, updated, unchanged, apply_errors = apply_labels(
-            args.repo, args.github_token, planned, dry_run=args.dry_run
-        )
+    state = LabelState(args.state_path) if args.state_path else None
+    multi_repo = bool(args.owner) or len(args.repo) > 1
+    if not multi_repo:
+        reconciled = reconcile_result()
+        if not plan_errors:
+            reconciled = reconcile_labels(
+                args.repo[0],
+                args.github_token,
+                planned,
+                dry_run=args.dry_run,
+                backend=args.api,
+                state=state,
+                prune=args.prune,
+                similarity=args.similarity_threshold,
+            )
+        result = repo_result(reconciled, skipped, plan_errors)
+    else:
+        results = {}
+        errors = list(plan_errors)
+        if not plan_errors:
+            repos, owner_errors = resolve_repos(
+                args.repo, args.owner, args.github_token
+            )
+            errors.extend(owner_errors)
+            results = sync_repos(
+                repos,
+                args.github_token,
+                planned,
+                dry_run=args.dry_run,
+                max_concurrency=args.max_concurrency,
+                backend=args.api,
+                state=state,
+                prune=args.prune,
+                similarity=args.similarity_threshold,
+            )
+        result = build_multi_repo_result(results, skipped, errors)
 
-    result = {
-        "created_labels": created,
-        "updated_labels": updated,
-        "unchanged_labels": unchanged,
-        "skipped_labels": sorted(skipped),
-        "errors": sorted(plan_errors + apply_errors),
-    }
+    if state is not None:
+        state.save()
 
     with open(args.output_path, "w", encoding="utf-8") as fh:
         json.dump(result, fh, indent=2, sort_keys=True)
@@ -1,7 +1,9 @@
+import http.client
 import json
 from pathlib import Path
 import sys
 import tempfile
+import threading
 import unittest
 from unittest import mock
 
@@ -11,6 +13,37 @@ sys.path.insert(0, str(ACTION_DIR))
 import setup_labels as setup_labels_module  # noqa: E402
 
 
+class FakeResponse:
+    def __init__(self, status, body, headers=None):
+        self.status = status
+        self.headers = headers or {}
+        self.will_close = False
+        self._body = json.dumps(body).encode("utf-8")
+
+    def read(self):
+        return self._body
+
+
+class FakeConnection:
+    """Replays responses, or raises exceptions, in order."""
+
+    def __init__(self, responses, reused=False):
+        self.responses = list(responses)
+        self.requests = []
+        self.sock = object() if reused else None
+
+    def request(self, method, target, body=None, headers=None):
+        self.requests.append((method, target))
+        if isinstance(self.responses[0], Exception):
+            raise self.responses.pop(0)
+
+    def getresponse(self):
+        return self.responses.pop(0)
+
+    def close(self):
+        pass
+
+
 class SetupLabelsTests(unittest.TestCase):
     def write_file(self, contents: str) -> str:
         with tempfile.NamedTemporaryFile("w", delete=False) as fh:
@@ -43,6 +76,26 @@ empty:
         self.assertIn("invalid-color: color must be a six-character hex value", errors)
         self.assertIn("invalid-description: description must be a string", errors)
 
+    def test_build_label_plan_collects_aliases(self):
+        config_path = self.write_file(
+            """\
+bug:
+  - description: "Bug label"
+  - aliases: defect
+  - aliases: ["type: bug"]
+invalid-aliases:
+  - description: "Invalid"
+  - aliases: [1]
+"""
+        )
+
+        parsed, _skipped, errors = setup_labels_module.build_label_plan(config_path)
+
+        self.assertEqual(parsed["bug"]["aliases"], ["defect", "type: bug"])
+        self.assertEqual(
+            errors, ["invalid-aliases: aliases must be a string or list of strings"]
+        )
+
     def test_apply_labels_updates_existing_label(self):
         desired = {
             "docs": {
@@ -146,6 +199,426 @@ empty:
         self.assertEqual(errors, [])
         api_mock.assert_not_called()
 
+    def test_iter_repo_labels_stops_after_a_short_page(self):
+        full_page = [{"name": f"label-{index}"} for index in range(100)]
+        with mock.patch.object(
+            setup_labels_module,
+            "api",
+            side_effect=[(full_page, {}), ([{"name": "Docs"}], {})],
+        ) as api_mock:
+            labels = setup_labels_module.iter_repo_labels("owner/repo", "token")
+
+        self.assertEqual(len(labels), 101)
+        self.assertIn("docs", labels)
+        self.assertEqual(api_mock.call_count, 2)
+
+    def test_apply_labels_graphql_batches_changes_into_one_mutation(self):
+        desired = {
+            "bug": {"name": "bug", "description": "Bug label", "color": "d73a4a"},
+            "docs": {"name": "docs", "description": "Docs", "color": "1d4ed8"},
+            "new": {"name": "new", "description": "New label", "color": "0e8a16"},
+            "broken": {"name": "broken", "description": "Broken", "color": "000000"},
+        }
+        pages = [
+            {
+                "data": {
+                    "repository": {
+                        "id": "R_1",
+                        "labels": {
+                            "nodes": [
+                                {
+                                    "id": "L_bug",
+                                    "name": "bug",
+                                    "color": "d73a4a",
+                                    "description": "Bug label",
+                                }
+                            ],
+                            "pageInfo": {"hasNextPage": True, "endCursor": "c1"},
+                        },
+                    }
+                }
+            },
+            {
+                "data": {
+                    "repository": {
+                        "id": "R_1",
+                        "labels": {
+                            "nodes": [
+                                {
+                                    "id": "L_docs",
+                                    "name": "Docs",
+                                    "color": "ffffff",
+                                    "description": "Docs",
+                                }
+                            ],
+                            "pageInfo": {"hasNextPage": False, "endCursor": "c2"},
+                        },
+                    }
+                }
+            },
+        ]
+        requests = []
+
+        def fake_api(method, url, token, payload=None):
+            requests.append(payload)
+            if "mutation" not in payload["query"]:
+                return pages[len(requests) - 1], {}
+            return (
+                {
+                    "data": {
+                        "label_0": {"label": {"id": "L_docs"}},
+                        "label_1": None,
+                        "label_2": {"label": {"id": "L_new"}},
+                    },
+                    "errors": [{"path": ["label_1"], "message": "bad label"}],
+                },
+                {},
+            )
+
+        with mock.patch.object(setup_labels_module, "api", side_effect=fake_api):
+            created, updated, unchanged, errors = setup_labels_module.apply_labels(
+                "owner/repo", "token", desired, backend="graphql"
+            )
+
+        self.assertEqual(len(requests), 3)
+        self.assertEqual(requests[1]["variables"]["cursor"], "c1")
+        mutation = requests[2]
+        self.assertIn("label_0: updateLabel(input: $label_0)", mutation["query"])
+        self.assertIn("label_1: createLabel(input: $label_1)", mutation["query"])
+        self.assertEqual(
+            mutation["variables"]["label_0"],
+            {"id": "L_docs", "name": "docs", "color": "1d4ed8"},
+        )
+        self.assertEqual(mutation["variables"]["label_1"]["repositoryId"], "R_1")
+        self.assertEqual(created, ["new"])
+        self.assertEqual(updated, ["docs"])
+        self.assertEqual(unchanged, ["bug"])
+        self.assertEqual(
+            errors,
+            ["GitHub GraphQL error for owner/repo label broken: bad label"],
+        )
+
+    def run_session(self, responses, method="GET", payload=None, reused=False):
+        connection = FakeConnection(responses, reused=reused)
+        sleeps = []
+        session = setup_labels_module.Session(
+            sleep=sleeps.append, clock=lambda: 1000.0, rng=lambda: 0.0
+        )
+        with mock.patch.object(
+            setup_labels_module, "SESSION", session
+        ), mock.patch.object(session, "_connection", return_value=connection):
+            result = setup_labels_module.api(
+                method,
+                "https://api.github.com/repos/owner/repo/labels?per_page=100",
+                "token",
+                payload=payload,
+            )
+        return result, connection, sleeps
+
+    def test_api_retries_server_errors_on_one_connection(self):
+        (labels, _headers), connection, sleeps = self.run_session(
+            [FakeResponse(502, {"message": "Bad gateway"}), FakeResponse(200, [])]
+        )
+
+        self.assertEqual(labels, [])
+        self.assertEqual(sleeps, [0.5])
+        self.assertEqual(
+            connection.requests,
+            [("GET", "/repos/owner/repo/labels?per_page=100")] * 2,
+        )
+
+    def test_api_waits_for_secondary_rate_limit_hints(self):
+        (labels, _headers), _connection, sleeps = self.run_session(
+            [
+                FakeResponse(
+                    403,
+                    {"message": "You have exceeded a secondary rate limit."},
+                    {"Retry-After": "7"},
+                ),
+                FakeResponse(
+                    403,
+                    {"message": "API rate limit exceeded"},
+                    {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "1010"},
+                ),
+                FakeResponse(200, [{"name": "docs"}]),
+            ]
+        )
+
+        self.assertEqual(labels, [{"name": "docs"}])
+        self.assertEqual(sleeps, [7.0, 11.0])
+
+    def test_api_retries_graphql_rate_limited_errors(self):
+        (payload, _headers), connection, sleeps = self.run_session(
+            [
+                FakeResponse(
+                    200,
+                    {"errors": [{"type": "RATE_LIMITED", "message": "slow down"}]},
+                ),
+                FakeResponse(200, {"data": {"repository": None}}),
+            ],
+            method="POST",
+            payload={"query": "query { viewer { login } }"},
+        )
+
+        self.assertEqual(payload, {"data": {"repository": None}})
+        self.assertEqual(len(connection.requests), 2)
+        self.assertEqual(sleeps, [0.5])
+
+    def test_api_reopens_stale_keep_alive_connections_without_waiting(self):
+        (labels, _headers), connection, sleeps = self.run_session(
+            [http.client.RemoteDisconnected("closed"), FakeResponse(200, [])],
+            reused=True,
+        )
+
+        self.assertEqual(labels, [])
+        self.assertEqual(len(connection.requests), 2)
+        self.assertEqual(sleeps, [])
+
+    def test_session_close_closes_connections_of_every_thread(self):
+        session = setup_labels_module.Session()
+        threads = [
+            threading.Thread(
+                target=session._connection, args=("https", "api.github.com")
+            )
+            for _thread in range(2)
+        ]
+        with mock.patch.object(http.client.HTTPSConnection, "close") as close:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            session.close()
+
+        self.assertEqual(close.call_count, 2)
+
+    def test_api_treats_retried_create_conflict_as_success(self):
+        (payload, _headers), connection, sleeps = self.run_session(
+            [
+                ConnectionResetError("reset"),
+                FakeResponse(
+                    422,
+                    {
+                        "message": "Validation Failed",
+                        "errors": [{"resource": "Label", "code": "already_exists"}],
+                    },
+                ),
+            ],
+            method="POST",
+            payload={"name": "docs"},
+        )
+
+        self.assertEqual(payload, {})
+        self.assertEqual(len(connection.requests), 2)
+        self.assertEqual(len(sleeps), 1)
+
+    def test_api_treats_retried_delete_not_found_as_success(self):
+        (payload, _headers), connection, _sleeps = self.run_session(
+            [
+                ConnectionResetError("reset"),
+                FakeResponse(404, {"message": "Not Found"}),
+            ],
+            method="DELETE",
+        )
+
+        self.assertEqual(payload, {})
+        self.assertEqual(len(connection.requests), 2)
+
+    def test_api_treats_retried_rename_not_found_as_success(self):
+        connection = FakeConnection(
+            [
+                ConnectionResetError("reset"),
+                FakeResponse(404, {"message": "Not Found"}),
+                ConnectionResetError("reset"),
+                FakeResponse(404, {"message": "Not Found"}),
+            ]
+        )
+        session = setup_labels_module.Session(sleep=lambda _delay: None)
+        url = "https://api.github.com/repos/owner/repo/labels/old%20name"
+        with mock.patch.object(
+            setup_labels_module, "SESSION", session
+        ), mock.patch.object(session, "_connection", return_value=connection):
+            payload, _headers = setup_labels_module.api(
+                "PATCH", url, "token", payload={"new_name": "new name"}
+            )
+            # An update that keeps its name still reports a missing label.
+            with self.assertRaisesRegex(setup_labels_module.GitHubApiError, "404"):
+                setup_labels_module.api(
+                    "PATCH", url, "token", payload={"new_name": "old name"}
+                )
+
+        self.assertEqual(payload, {})
+
+    def test_graphql_treats_retried_delete_of_missing_node_as_success(self):
+        edits = [
+            ("delete", "stale", {"id": "L1", "name": "stale"}, None),
+            ("update", "docs", {"id": "L2", "name": "docs"}, {"new_name": "docs"}),
+        ]
+        alias_errors = {
+            "label_0": ["Could not resolve to a node with the global id of 'L1'"],
+            "label_1": ["Could not resolve to a node with the global id of 'L2'"],
+        }
+
+        with mock.patch.object(
+            setup_labels_module, "graphql", return_value=({}, alias_errors)
+        ), mock.patch.object(
+            setup_labels_module, "SESSION", mock.Mock(last_attempts=2)
+        ):
+            applied, errors = setup_labels_module.apply_labels_graphql(
+                "owner/repo", "token", "R1", edits
+            )
+
+        self.assertEqual(applied, [("delete", "stale", edits[0][2])])
+        self.assertEqual(len(errors), 1)
+        self.assertIn("label docs", errors[0])
+
+    def test_api_raises_without_retrying_client_errors(self):
+        with self.assertRaisesRegex(setup_labels_module.GitHubApiError, "404"):
+            self.run_session([FakeResponse(404, {"message": "Not Found"})])
+
+        with self.assertRaisesRegex(setup_labels_module.GitHubApiError, "422"):
+            self.run_session(
+                [
+                    FakeResponse(
+                        422,
+                        {"errors": [{"code": "already_exists"}]},
+                    )
+                ],
+                method="POST",
+                payload={"name": "docs"},
+            )
+
+    def test_reconcile_labels_renames_updates_creates_and_prunes(self):
+        desired = {
+            "bug": {
+                "name": "bug",
+                "description": "Bug",
+                "color": "d73a4a",
+                "aliases": ["defect"],
+            },
+            "dependencies": {
+                "name": "dependencies",
+                "description": "Dependency updates",
+                "color": "1d4ed8",
+            },
+            "enhancement": {
+                "name": "enhancement",
+                "description": "Feature",
+                "color": "0f766e",
+            },
+            "security": {
+                "name": "security",
+                "description": "Security",
+                "color": "7f1d1d",
+            },
+        }
+        existing = {
+            "defect": {"name": "Defect", "description": "Bug", "color": "d73a4a"},
+            "dependency": {
+                "name": "dependency",
+                "description": "Dependency updates",
+                "color": "1d4ed8",
+            },
+            "enhancement": {
+                "name": "enhancement",
+                "description": "Old",
+                "color": "0f766e",
+            },
+            "wontfix": {"name": "wontfix", "description": "", "color": "ffffff"},
+        }
+
+        with mock.patch.object(
+            setup_labels_module, "iter_repo_labels", return_value=existing
+        ), mock.patch.object(
+            setup_labels_module, "api", return_value=({}, {})
+        ) as api_mock:
+            result = setup_labels_module.reconcile_labels(
+                "owner/repo", "token", desired, prune=True, similarity=0.8
+            )
+
+        self.assertEqual(
+            result["renamed_labels"], ["Defect->bug", "dependency->dependencies"]
+        )
+        self.assertEqual(result["updated_labels"], ["enhancement"])
+        self.assertEqual(result["created_labels"], ["security"])
+        self.assertEqual(result["deleted_labels"], ["wontfix"])
+        self.assertEqual(result["unchanged_labels"], [])
+        self.assertEqual(result["errors"], [])
+        self.assertEqual(
+            [call.args[:2] for call in api_mock.call_args_list],
+            [
+                ("PATCH", "https://api.github.com/repos/owner/repo/labels/Defect"),
+                ("PATCH", "https://api.github.com/repos/owner/repo/labels/dependency"),
+                ("PATCH", "https://api.github.com/repos/owner/repo/labels/enhancement"),
+                ("POST", "https://api.github.com/repos/owner/repo/labels"),
+                ("DELETE", "https://api.github.com/repos/owner/repo/labels/wontfix"),
+            ],
+        )
+        self.assertEqual(
+            api_mock.call_args_list[0].kwargs["payload"], {"new_name": "bug"}
+        )
+
+    def test_reconcile_labels_leaves_unplanned_labels_by_default(self):
+        desired = {
+            "documentation": {
+                "name": "documentation",
+                "description": "Docs",
+                "color": "64748b",
+            },
+        }
+        existing = {"docs": {"name": "docs", "description": "Docs", "color": "64748b"}}
+
+        edits, unchanged = setup_labels_module.plan_label_edits(desired, existing)
+
+        self.assertEqual([edit[0] for edit in edits], ["create"])
+        self.assertEqual(unchanged, [])
+
+    def test_state_skips_repos_whose_plan_and_labels_are_unchanged(self):
+        desired = {"bug": {"name": "bug", "description": "Bug", "color": "d73a4a"}}
+        existing = {"bug": {"name": "bug", "description": "Bug", "color": "d73a4a"}}
+        with tempfile.TemporaryDirectory() as directory:
+            state_path = str(Path(directory) / "state.json")
+            state = setup_labels_module.LabelState(state_path)
+            with mock.patch.object(
+                setup_labels_module, "iter_repo_labels", return_value=existing
+            ), mock.patch.object(
+                setup_labels_module,
+                "api",
+                return_value=([{"name": "bug"}], {"ETag": 'W/"labels-1"'}),
+            ):
+                first = setup_labels_module.apply_labels(
+                    "Owner/Repo", "token", desired, state=state
+                )
+            state.save()
+
+            state = setup_labels_module.LabelState(state_path)
+            session = mock.Mock()
+            session.request.return_value = (304, {}, "")
+            with mock.patch.object(
+                setup_labels_module, "SESSION", session
+            ), mock.patch.object(
+                setup_labels_module, "iter_repo_labels"
+            ) as labels_mock:
+                second = setup_labels_module.apply_labels(
+                    "owner/repo", "token", desired, state=state
+                )
+                changed_plan = dict(desired, docs=dict(desired["bug"], name="docs"))
+                self.assertFalse(
+                    state.is_current(
+                        "owner/repo",
+                        setup_labels_module.plan_digest(changed_plan),
+                        "token",
+                    )
+                )
+
+        self.assertEqual(first, ([], [], ["bug"], []))
+        self.assertEqual(second, ([], [], ["bug"], []))
+        labels_mock.assert_not_called()
+        session.request.assert_called_once()
+        self.assertEqual(
+            session.request.call_args.kwargs["headers"]["If-None-Match"],
+            'W/"labels-1"',
+        )
+
     def test_main_writes_result_payload(self):
         with tempfile.NamedTemporaryFile("r", delete=False) as fh:
             output_path = fh.name
@@ -153,10 +626,15 @@ empty:
         with mock.patch.object(
             setup_labels_module, "parse_args", return_value=mock.Mock(
                 config_path="config.yml",
-                repo="owner/repo",
+                repo=["owner/repo"],
+                owner=[],
                 github_token="token",
                 output_path=output_path,
                 dry_run=False,
+                state_path=None,
+                prune=False,
+                similarity_threshold=None,
+                api="rest",
             )
         ), mock.patch.object(
             setup_labels_module,
@@ -164,8 +642,11 @@ empty:
             return_value=({"docs": {"name": "docs"}}, ["skip-me"], []),
         ), mock.patch.object(
             setup_labels_module,
-            "apply_labels",
-            return_value=([], ["docs"], [], ["synthetic failure"]),
+            "reconcile_labels",
+            return_value=setup_labels_module.reconcile_result(
+                [("update", "docs", {"name": "docs"})],
+                errors=["synthetic failure"],
+            ),
         ):
             setup_labels_module.main()
 
@@ -174,6 +655,96 @@ empty:
         self.assertEqual(payload["updated_labels"], ["docs"])
         self.assertEqual(payload["errors"], ["synthetic failure"])
         self.assertEqual(payload["skipped_labels"], ["skip-me"])
+        self.assertNotIn("repositories", payload)
+
+    def test_resolve_repos_lists_owner_repos_and_dedupes(self):
+        responses = {
+            "https://api.github.com/users/org": {"type": "Organization"},
+            "https://api.github.com/orgs/org/repos?type=all&per_page=100&page=1": [
+                {"full_name": "org/app", "archived": False, "fork": False},
+                {"full_name": "org/old", "archived": True, "fork": False},
+                {"full_name": "org/copy", "archived": False, "fork": True},
+            ],
+            "https://api.github.com/users/me%2Fyou": {"type": "User"},
+            "https://api.github.com/users/me%2Fyou/repos?type=owner"
+            "&per_page=100&page=1": [],
+        }
+        calls = []
+
+        def fake_api(method, url, token, payload=None):
+            calls.append(url)
+            return responses[url], {}
+
+        with mock.patch.object(setup_labels_module, "api", side_effect=fake_api):
+            repos, errors = setup_labels_module.resolve_repos(
+                ["ORG/app", "other/repo"], ["org", "me/you"], "token"
+            )
+
+        self.assertEqual(repos, ["org/app", "other/repo"])
+        self.assertEqual(errors, [])
+        # Short first pages end the listing without asking for page 2.
+        self.assertEqual(calls, list(responses))
+
+    def test_main_syncs_multiple_repos_with_one_plan(self):
+        with tempfile.NamedTemporaryFile("r", delete=False) as fh:
+            output_path = fh.name
+
+        def fake_reconcile(repo, token, planned, **kwargs):
+            if repo == "owner/broken":
+                return setup_labels_module.reconcile_result(
+                    errors=["synthetic failure"]
+                )
+            return setup_labels_module.reconcile_result(
+                [("create", "docs", None)], ["bug"]
+            )
+
+        with mock.patch.object(
+            setup_labels_module, "parse_args", return_value=mock.Mock(
+                config_path="config.yml",
+                repo=["owner/repo", "owner/broken"],
+                owner=[],
+                github_token="token",
+                output_path=output_path,
+                dry_run=False,
+                max_concurrency=2,
+                state_path=None,
+                prune=False,
+                similarity_threshold=None,
+                api="graphql",
+            )
+        ), mock.patch.object(
+            setup_labels_module,
+            "build_label_plan",
+            return_value=({"docs": {"name": "docs"}}, ["skip-me"], []),
+        ) as plan_mock, mock.patch.object(
+            setup_labels_module, "reconcile_labels", side_effect=fake_reconcile
+        ) as apply_mock:
+            setup_labels_module.main()
+
+        plan_mock.assert_called_once_with("config.yml")
+        self.assertEqual(apply_mock.call_args.kwargs["backend"], "graphql")
+        self.assertEqual(apply_mock.call_count, 2)
+        with open(output_path, "r", encoding="utf-8") as fh:
+            payload = json.load(fh)
+        self.assertEqual(payload["created_labels"], ["owner/repo:docs"])
+        self.assertEqual(payload["unchanged_labels"], ["owner/repo:bug"])
+        self.assertEqual(payload["skipped_labels"], ["skip-me"])
+        self.assertEqual(payload["errors"], ["owner/broken: synthetic failure"])
+        self.assertEqual(
+            payload["repositories"]["owner/repo"],
+            {
+                "created_labels": ["docs"],
+                "updated_labels": [],
+                "renamed_labels": [],
+                "deleted_labels": [],
+                "unchanged_labels": ["bug"],
+                "skipped_labels": ["skip-me"],
+                "errors": [],
+            },
+        )
+        self.assertEqual(
+            payload["repositories"]["owner/broken"]["errors"], ["synthetic failure"]
+        )
 
 
 if __name__ == "__main__":